@@ -0,0 +1,244 @@
+import argparse
+import inspect
+import json
+import multiprocessing
+import os
+import shutil
+import sqlite3
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+import torch
+
+import instrumentation
+from paths import FIFA_DB, data_path
+from preprocessing import (
+    PipelineStats, PreprocessingPipeline, _digest, correct_frame, load_corrections,
+    load_sql_table, source_key, training_arrays,
+)
+from training import DEFAULT_CONFIG, split_cores, train_one
+
+# Rolling-origin evaluation over fifa_version: each fold trains on the
+# versions before its origin (all of them, or the last `window`) and tests on
+# the next `horizon` versions.  The preprocessing pipeline is fitted on the
+# fold's training rows only, so scaler statistics, fill values, one-hot and
+# id vocabularies never see the test versions.  Fold matrices are cached on
+# disk, keyed by the source, the fold and the code that builds them, and the
+# folds train in parallel.
+
+QUERY = "SELECT * FROM prem_name_join"
+BACKTEST_CACHE_DIR = data_path("backtest_cache")
+CACHE_VERSION = 1
+MIN_TRAIN_VERSIONS = 3
+PARTS = ('train', 'test')
+ARRAY_NAMES = ('features', 'targets', 'player_ids', 'club_ids')
+
+
+# --------------------------------------------------------------------------- #
+# ---------------------------------  FOLDS  --------------------------------- #
+# --------------------------------------------------------------------------- #
+def rolling_origin_splits(versions, min_train: int = MIN_TRAIN_VERSIONS, horizon: int = 1,
+                          window: int | None = None) -> list[dict]:
+    """Folds over the sorted distinct versions: expanding (window=None) or rolling.
+
+    rolling_origin_splits(range(15, 24)) →
+        {'fold': 0, 'train': [15, 16, 17], 'test': [18]}, …, {'fold': 5, …, 'test': [23]}
+    """
+    versions = sorted({int(v) for v in versions})
+    folds = []
+    for origin in range(min_train, len(versions) - horizon + 1):
+        start = 0 if window is None else max(0, origin - window)
+        folds.append({'fold': len(folds), 'train': versions[start:origin],
+                      'test': versions[origin:origin + horizon]})
+    return folds
+
+
+def fold_matrices(df: pd.DataFrame, fold: dict) -> tuple[dict, dict]:
+    """(meta, arrays) of one fold, with the pipeline fitted on its training rows.
+
+    Ids the training window has never seen (-1) get the extra last row of
+    each embedding table; `_run_fold` sets it to the mean embedding.
+    """
+    versions = df['fifa_version'].to_numpy()
+    parts = {part: df[np.isin(versions, fold[part])] for part in PARTS}
+    pipeline = PreprocessingPipeline.fit(parts['train'])
+    vocab = {'player_ids': len(pipeline.player_ids) + 1, 'club_ids': len(pipeline.club_ids) + 1}
+    arrays, rows = {}, {}
+    for part, frame in parts.items():
+        feature_cols, arr = training_arrays(pipeline.transform_frame(frame))
+        for name in ARRAY_NAMES:
+            values = arr[name]
+            if name in vocab:
+                values = np.where(values < 0, vocab[name] - 1, values)
+            arrays[f'{part}_{name}'] = values
+        rows[part] = len(arr['features'])
+    meta = {**fold, 'rows': rows, 'feature_columns': feature_cols,
+            'target_columns': ['goals', 'assists'],
+            'player_vocab_size': vocab['player_ids'], 'club_vocab_size': vocab['club_ids']}
+    return meta, arrays
+
+
+def fold_key(source: str, fold: dict) -> str:
+    code = [inspect.getsource(f) for f in (PreprocessingPipeline, PipelineStats, training_arrays,
+                                           correct_frame, fold_matrices)]
+    return _digest(source, fold['train'], fold['test'], CACHE_VERSION, code)
+
+
+def save_fold(path: str, meta: dict, arrays: dict):
+    """One .npy per array plus meta.json; written to a temp dir, then renamed."""
+    tmp = f"{path}.tmp{os.getpid()}"
+    os.makedirs(tmp, exist_ok=True)
+    for name, arr in arrays.items():
+        np.save(os.path.join(tmp, f"{name}.npy"), np.ascontiguousarray(arr))
+    with open(os.path.join(tmp, "meta.json"), "w") as f:
+        json.dump(meta, f)
+    try:
+        os.replace(tmp, path)
+    except OSError:                     # another run cached the same fold first
+        shutil.rmtree(tmp, ignore_errors=True)
+
+
+def load_fold(path: str) -> tuple[dict, dict]:
+    with open(os.path.join(path, "meta.json")) as f:
+        meta = json.load(f)
+    arrays = {f"{part}_{name}": np.load(os.path.join(path, f"{part}_{name}.npy"), mmap_mode='c')
+              for part in PARTS for name in ARRAY_NAMES}
+    return meta, arrays
+
+
+def load_corrected(sql_path: str, query: str) -> pd.DataFrame:
+    """The query's rows with the goal/assist corrections applied, as in `preprocess_all`."""
+    conn = sqlite3.connect(sql_path)
+    corrections = load_corrections(conn)
+    conn.close()
+    return correct_frame(load_sql_table(sql_path, query), corrections)
+
+
+def prepare_folds(folds: list[dict], sql_path: str = FIFA_DB, query: str = QUERY,
+                  cache_dir: str = BACKTEST_CACHE_DIR) -> tuple[list[str], int]:
+    """Fold directories (building the missing ones) and how many were cache hits.
+
+    The table is only read when at least one fold is missing.
+    """
+    os.makedirs(cache_dir, exist_ok=True)
+    source = source_key(sql_path, query)
+    paths = [os.path.join(cache_dir, f"fold-{fold_key(source, fold)}") for fold in folds]
+    missing = [(fold, path) for fold, path in zip(folds, paths) if not os.path.isdir(path)]
+    if missing:
+        with instrumentation.stage("backtest.load") as span:
+            df = load_corrected(sql_path, query)
+            span.add(rows_out=len(df))
+        for fold, path in missing:
+            with instrumentation.stage("backtest.matrices") as span:
+                meta, arrays = fold_matrices(df, fold)
+                save_fold(path, meta, arrays)
+                span.add(rows_in=sum(meta['rows'].values()))
+    return paths, len(folds) - len(missing)
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------  TRAINING  ------------------------------- #
+# --------------------------------------------------------------------------- #
+def _run_fold(path: str, config: dict, threads: int) -> dict:
+    """Train one fold from its cached matrices; returns its error row."""
+    meta, arrays = load_fold(path)
+
+    def tensors(part):
+        return (torch.from_numpy(arrays[f'{part}_features']),
+                torch.from_numpy(arrays[f'{part}_targets']),
+                torch.from_numpy(arrays[f'{part}_player_ids'].astype(np.int64)),
+                torch.from_numpy(arrays[f'{part}_club_ids'].astype(np.int64)))
+
+    test = tensors('test')
+    result = train_one(config, meta, tensors('train'), test, threads=threads)
+    model = result['model']
+    with torch.no_grad():
+        for name in ('player_emb', 'club_emb'):
+            if hasattr(model, name):        # unseen ids → mean embedding
+                table = getattr(model, name).weight
+                table[-1] = table[:-1].mean(0)
+        pred = model(test[0], test[2], test[3]).numpy()
+
+    err = pred - test[1].numpy()
+    row = {'fold': meta['fold'], 'train': f"{meta['train'][0]}-{meta['train'][-1]}",
+           'test': f"{meta['test'][0]}-{meta['test'][-1]}" if len(meta['test']) > 1 else str(meta['test'][0]),
+           'n_train': meta['rows']['train'], 'n_test': meta['rows']['test']}
+    for i, target in enumerate(meta['target_columns']):
+        row[f'{target}_mae'] = float(np.abs(err[:, i]).mean()) if len(err) else np.nan
+        row[f'{target}_rmse'] = float(np.sqrt((err[:, i] ** 2).mean())) if len(err) else np.nan
+    row['wall_s'] = result['wall_s']
+    return row
+
+
+def error_table(rows: list[dict]) -> pd.DataFrame:
+    """Per-fold rows plus an 'all' row pooled over every test row."""
+    table = pd.DataFrame(rows).sort_values('fold').reset_index(drop=True)
+    n = table['n_test'].to_numpy(dtype=float)
+    total = {'fold': 'all', 'train': '', 'test': '', 'n_train': int(table['n_train'].sum()),
+             'n_test': int(n.sum()), 'wall_s': table['wall_s'].sum()}
+    for col in table.columns:
+        if col.endswith('_mae'):
+            total[col] = float(np.average(table[col], weights=n))
+        elif col.endswith('_rmse'):
+            total[col] = float(np.sqrt(np.average(table[col] ** 2, weights=n)))
+    return pd.concat([table, pd.DataFrame([total])], ignore_index=True)
+
+
+def run_backtest(folds: list[dict], config: dict | None = None, sql_path: str = FIFA_DB,
+                 query: str = QUERY, workers: int | None = None,
+                 cache_dir: str = BACKTEST_CACHE_DIR) -> pd.DataFrame:
+    """Prepare (or reuse) every fold's matrices, train the folds across a process
+    pool and return `error_table`.  Cores are split as in `training.run_sweep`."""
+    config = {**DEFAULT_CONFIG, **(config or {})}
+    t0 = time.perf_counter()
+    paths, hits = prepare_folds(folds, sql_path, query, cache_dir)
+    t_prepare = time.perf_counter() - t0
+    workers, threads = split_cores(min(workers or os.cpu_count() or 1, len(paths)))
+
+    rows = []
+    if workers == 1:
+        for path in paths:
+            with instrumentation.stage("backtest.train"):
+                rows.append(_run_fold(path, config, threads))
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx) as pool:
+            futures = [pool.submit(_run_fold, path, config, threads) for path in paths]
+            for fut in as_completed(futures):
+                rows.append(fut.result())
+    print(f"{len(folds)} folds ({hits} cached, prepared in {t_prepare:.1f} s), "
+          f"{workers} processes × {threads} threads, {time.perf_counter() - t0:.1f} s total")
+    return error_table(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="rolling-origin backtest over fifa_version")
+    parser.add_argument("--db", default=FIFA_DB)
+    parser.add_argument("--query", default=QUERY)
+    parser.add_argument("--window", type=int, default=None,
+                        help="train on the last N versions (default: all earlier versions)")
+    parser.add_argument("--min-train", type=int, default=MIN_TRAIN_VERSIONS,
+                        help="versions before the first origin")
+    parser.add_argument("--horizon", type=int, default=1, help="versions tested per fold")
+    parser.add_argument("--versions", nargs="+", type=int, default=list(range(15, 24)))
+    parser.add_argument("--model", default=DEFAULT_CONFIG['model'], choices=["plain", "embedded"])
+    parser.add_argument("--lr", type=float, default=DEFAULT_CONFIG['lr'])
+    parser.add_argument("--epochs", type=int, default=DEFAULT_CONFIG['epochs'])
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_CONFIG['batch_size'], help="0 = full batch")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--cache-dir", default=BACKTEST_CACHE_DIR)
+    parser.add_argument("--out", default=None, metavar="CSV", help="also write the error table")
+    args = parser.parse_args()
+
+    folds = rolling_origin_splits(args.versions, args.min_train, args.horizon, args.window)
+    if not folds:
+        parser.error("no folds: fewer versions than --min-train + --horizon")
+    config = {'model': args.model, 'lr': args.lr, 'epochs': args.epochs,
+              'batch_size': args.batch_size or None}
+    table = run_backtest(folds, config, args.db, args.query, args.workers, args.cache_dir)
+    print(table.to_string(index=False, float_format=lambda v: f"{v:.4f}"))
+    if args.out:
+        table.to_csv(args.out, index=False)
+        print(f"✅ Saved to {args.out}")
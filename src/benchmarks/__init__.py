@@ -0,0 +1,9 @@
+"""Benchmarks for the scraper, ingest, preprocessing, models and serving paths.
+
+    python -m benchmarks [scenario ...]      # or: python cli.py bench ...
+
+synthetic   generated list pages, male_players.csv and prem_name_join inputs
+measure     timing and peak-RSS helpers
+scraping, ingest, preprocess, models, queries   one module per area of scenarios
+suite       the hot-path regression suite and its baseline check
+"""
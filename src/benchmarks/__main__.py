@@ -0,0 +1,83 @@
+"""Command line: `python -m benchmarks [scenario ...]`; see --help."""
+import argparse, json, sys
+
+from paths import data_path
+
+from .ingest import bench_columnar, bench_incremental, bench_ingest
+from .models import bench_backtest, bench_inference, bench_sweep
+from .preprocess import (bench_chunked, bench_compact, bench_preprocess, bench_stage_cache,
+                         bench_transform)
+from .queries import bench_aggregates, bench_queries, bench_similarity
+from .scraping import bench_db_writes, bench_instrumentation, bench_parse, bench_scrape_season
+from .suite import SUITE_SIZES, SUITE_THRESHOLD, bench_suite
+
+SCENARIOS = {
+    "scrape": bench_scrape_season,
+    "parse": bench_parse,
+    "db": bench_db_writes,
+    "ingest": bench_ingest,
+    "incremental": bench_incremental,
+    "columnar": bench_columnar,
+    "preprocess": bench_preprocess,
+    "transform": bench_transform,
+    "stage_cache": bench_stage_cache,
+    "compact": bench_compact,
+    "chunked": bench_chunked,
+    "sweep": bench_sweep,
+    "backtest": bench_backtest,
+    "inference": bench_inference,
+    "instrumentation": bench_instrumentation,
+    "aggregates": bench_aggregates,
+    "queries": bench_queries,
+    "similarity": bench_similarity,
+    "suite": bench_suite,
+}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(prog="benchmarks", description="offline performance benchmarks")
+    parser.add_argument("scenarios", nargs="*", default=list(SCENARIOS),
+                        choices=list(SCENARIOS))
+    parser.add_argument("--size-mb", type=float, default=512,
+                        help="synthetic male_players.csv size for ingest / columnar / suite")
+    parser.add_argument("--size-gb", type=float, default=None, help="same, in GB (overrides --size-mb)")
+    parser.add_argument("--pages", type=int, default=SUITE_SIZES["pages"],
+                        help="suite: generated list pages")
+    parser.add_argument("--page-rows", type=int, default=SUITE_SIZES["page_rows"],
+                        help="suite: rows per list page")
+    parser.add_argument("--join-rows", type=int, default=SUITE_SIZES["join_rows"],
+                        help="suite: prem_name_join rows for preprocess_all")
+    parser.add_argument("--repeat", type=int, default=3, help="suite: runs per hot path")
+    parser.add_argument("--json", default=None, metavar="PATH", help="write all results as JSON")
+    parser.add_argument("--baseline", default=data_path("benchmark_baseline.json"),
+                        help="suite: baseline JSON to compare against")
+    parser.add_argument("--save-baseline", action="store_true",
+                        help="suite: store this run as the baseline instead of comparing")
+    parser.add_argument("--threshold", type=float, default=SUITE_THRESHOLD,
+                        help="suite: allowed relative slowdown / memory growth")
+    parser.add_argument("--require-baseline", action="store_true",
+                        help="suite: exit 2 when the baseline check is skipped (for CI)")
+    args = parser.parse_args()
+    size_mb = args.size_gb * 1024 if args.size_gb else args.size_mb
+
+    results, code = {}, 0
+    for name in args.scenarios:
+        if name in ("ingest", "columnar"):
+            results[name] = SCENARIOS[name](size_mb=size_mb)
+        elif name == "suite":
+            results[name] = bench_suite(
+                args.repeat, {"pages": args.pages, "page_rows": args.page_rows,
+                              "csv_mb": size_mb, "join_rows": args.join_rows},
+                baseline_path=args.baseline, threshold=args.threshold,
+                save_baseline=args.save_baseline)
+            if results[name]["regressions"]:
+                code = 1
+            elif results[name]["baseline"] == "skipped" and args.require_baseline:
+                code = 2
+        else:
+            results[name] = SCENARIOS[name]()
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2, default=float)
+        print(f"\nresults → {args.json}")
+    sys.exit(code)
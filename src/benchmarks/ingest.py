@@ -0,0 +1,110 @@
+"""male_players.csv ingest scenarios: parallel, incremental and columnar."""
+import os, sqlite3, tempfile, time
+
+import pandas as pd
+
+import columnar_store
+import load_csv_sql_db as ingest
+
+from .measure import measure
+from .synthetic import make_players_csv, synthetic_release
+
+def legacy_ingest(csv_path: str, db_path: str, league_ids=(13,), fifa_updates=(1,)):
+    """The original single‑core chunked `read_csv` + `to_sql` loop."""
+    conn = sqlite3.connect(db_path)
+    for chunk in pd.read_csv(csv_path, chunksize=100000, usecols=ingest.COLUMNS_TO_KEEP):
+        filt = chunk[(chunk['league_id'].isin(league_ids)) & (chunk['fifa_update'].isin(fifa_updates))]
+        filt.to_sql("test", conn, if_exists='append', index=False)
+    conn.close()
+
+
+def bench_ingest(size_mb: float = 512, workers: int | None = None):
+    """Original chunked loop vs parallel byte‑range `ingest_csv`."""
+    workers = workers or os.cpu_count()
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = make_players_csv(f"{tmp}/male_players.csv", size_mb)
+        t0 = time.perf_counter()
+        legacy_ingest(csv_path, f"{tmp}/legacy.db")
+        t_legacy = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        n = ingest.ingest_csv(csv_path, f"{tmp}/parallel.db", workers=workers,
+                              league_ids=[13], fifa_updates=[1])
+        t_parallel = time.perf_counter() - t0
+
+        legacy_n = sqlite3.connect(f"{tmp}/legacy.db").execute("SELECT COUNT(*) FROM test").fetchone()[0]
+        assert legacy_n == n, f"row counts differ: {legacy_n} vs {n}"
+
+    print(f"\ningest  {size_mb:.0f} MB CSV → {n:,} PL first‑update rows")
+    print(f"  legacy           {t_legacy:7.2f} s")
+    print(f"  workers={workers:<3} ({ingest.CSV_ENGINE}) {t_parallel:7.2f} s   "
+          f"({t_legacy / t_parallel:.1f}× faster)")
+    return {"legacy_s": t_legacy, "parallel_s": t_parallel}
+
+
+def bench_incremental(n_versions: int = 8, release_rows: int = 60_000, workers: int | None = None):
+    """Watermarked `incremental_ingest`: rerun, +1 release vs reloading everything."""
+    result = {}
+    filters = {"league_ids": None, "fifa_updates": None}
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path, db = f"{tmp}/male_players.csv", f"{tmp}/players.db"
+        versions = list(range(24 - n_versions, 24))
+        for i, v in enumerate(versions):
+            synthetic_release(v, release_rows).to_csv(csv_path, mode="a", header=i == 0, index=False)
+        first = ingest.incremental_ingest(csv_path, db, workers=workers, **filters)
+        result["first_load_s"] = first["seconds"]
+        rerun = ingest.incremental_ingest(csv_path, db, workers=workers, **filters)
+        assert rerun["rows"] == 0, rerun
+        result["rerun_s"] = rerun["seconds"]
+
+        synthetic_release(24, release_rows).to_csv(csv_path, mode="a", header=False, index=False)
+        new = ingest.incremental_ingest(csv_path, db, workers=workers, **filters)
+        assert new["mode"] == "appended" and new["partitions"] == [(24, 1), (24, 2)], new
+        result["new_release_s"] = new["seconds"]
+
+        t0 = time.perf_counter()
+        n = ingest.ingest_csv(csv_path, f"{tmp}/reload.db", workers=workers, **filters)
+        result["full_reload_s"] = time.perf_counter() - t0
+        rows = sqlite3.connect(db).execute("SELECT COUNT(*) FROM test").fetchone()[0]
+        assert rows == n == (n_versions + 1) * release_rows, (rows, n)
+
+    print(f"\nincremental ingest  {n_versions} releases × {release_rows:,} rows, then FIFA 24")
+    print(f"  first load         {result['first_load_s']:7.2f} s")
+    print(f"  rerun (no-op)      {result['rerun_s'] * 1e3:7.1f} ms")
+    print(f"  +1 release         {result['new_release_s']:7.2f} s   "
+          f"(full reload {result['full_reload_s']:.2f} s)")
+    return result
+
+
+def csv_scan(csv_path: str, **filters) -> pd.DataFrame:
+    """The notebooks' approach: chunked default‑parser scan of the whole CSV."""
+    frames = [ingest.apply_filters(chunk, **filters)
+              for chunk in pd.read_csv(csv_path, chunksize=100_000,
+                                       usecols=ingest.COLUMNS_TO_KEEP)]
+    return pd.concat(frames, ignore_index=True)
+
+
+def bench_columnar(size_mb: float = 512):
+    """CSV scan vs partitioned Parquet `load_players` for the PL and Championship subsets."""
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = make_players_csv(f"{tmp}/male_players.csv", size_mb)
+        t0 = time.perf_counter()
+        columnar_store.convert_csv_to_parquet(csv_path, f"{tmp}/parquet")
+        t_convert = time.perf_counter() - t0
+
+        champ_clubs = csv_scan(csv_path, league_ids=[14], fifa_versions=[15])['club_team_id'].unique()
+        subsets = {
+            "PL": dict(league_ids=[13], fifa_updates=[1]),
+            "Champ15 clubs": dict(club_team_ids=champ_clubs.tolist(), fifa_updates=[2]),
+        }
+        print(f"\ncolumnar  {size_mb:.0f} MB CSV, one‑time conversion {t_convert:.1f} s")
+        result = {"convert_s": t_convert}
+        for label, filters in subsets.items():
+            t_csv, mem_csv, n_csv = measure(csv_scan, csv_path, **filters)
+            t_pq, mem_pq, n_pq = measure(columnar_store.load_players, f"{tmp}/parquet", **filters)
+            assert n_csv == n_pq, f"{label}: {n_csv} vs {n_pq} rows"
+            print(f"  {label:<14} csv {t_csv:6.2f} s {mem_csv:6.0f} MB │ "
+                  f"parquet {t_pq:6.3f} s {mem_pq:6.0f} MB │ {n_pq:,} rows")
+            result[label] = {"csv_s": t_csv, "csv_peak_mb": mem_csv,
+                             "parquet_s": t_pq, "parquet_peak_mb": mem_pq}
+    return result
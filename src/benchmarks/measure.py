@@ -0,0 +1,58 @@
+"""Time and peak-RSS measurement, in this process or a fresh one."""
+import multiprocessing, resource, time
+from concurrent.futures import ProcessPoolExecutor
+
+def peak_rss_mb() -> float:
+    """High‑water RSS of this process (VmHWM; ru_maxrss survives exec on Linux)."""
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def _timed_call(fn, args, kwargs, preload=()):
+    for module in preload:                # imports that shouldn't count as work
+        __import__(module)
+    t0 = time.perf_counter()
+    out = fn(*args, **kwargs)
+    elapsed = time.perf_counter() - t0
+    peak_mb = peak_rss_mb()
+    return elapsed, peak_mb, len(out) if hasattr(out, "__len__") else out
+
+
+def measure(fn, *args, preload=(), **kwargs):
+    """(seconds, peak RSS in MB, len(result)) of `fn` run in a fresh process.
+
+    Modules in `preload` are imported before the clock starts (still in RSS).
+    """
+    ctx = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+        return pool.submit(_timed_call, fn, args, kwargs, preload).result()
+
+
+def current_rss_mb() -> float:
+    with open("/proc/self/status") as f:
+        for line in f:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1]) / 1024
+    return peak_rss_mb()
+
+
+def reset_peak_rss() -> bool:
+    """Reset VmHWM to the current RSS (Linux ≥ 4.0); False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+def _seconds(fn, *args) -> float:
+    t0 = time.perf_counter()
+    fn(*args)
+    return time.perf_counter() - t0
@@ -0,0 +1,160 @@
+"""Model scenarios: training sweeps, backtest folds and inference paths."""
+import json, os, subprocess, sys, tempfile, time
+
+import numpy as np
+
+import preprocessing
+from paths import SRC_DIR
+
+from .synthetic import PL_JOIN_ROWS, make_join_db, synthetic_join_frame
+
+def bench_sweep(n_configs: int = 8, epochs: int = 20, n_rows: int = PL_JOIN_ROWS):
+    """Serial vs process-pool `run_sweep` over a small lr/gamma grid."""
+    import training
+    configs = training.grid(lr=[1e-3, 1e-4], gamma=[0.075, 0.3, 0.6, 0.9][:max(1, n_configs // 2)],
+                            epochs=[epochs])
+    cores = os.cpu_count()
+    workers, threads = training.split_cores(cores)
+    result = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        preprocessing.write_training_arrays(
+            preprocessing.preprocess_frame(synthetic_join_frame(n_rows)), f"{tmp}/arrays")
+        for label, n_workers in (("serial", 1), ("pool", workers)):
+            t0 = time.perf_counter()
+            runs = training.run_sweep(configs, f"{tmp}/arrays", n_workers, f"{tmp}/runs.db", label)
+            result[f"{label}_s"] = time.perf_counter() - t0
+        n_runs = len(training.load_results(f"{tmp}/runs.db", sweep="pool"))
+
+    print(f"\nsweep  {len(configs)} configs × {epochs} epochs, {cores} cores "
+          f"→ {workers} processes × {threads} threads; {n_runs} pool runs recorded")
+    print(f"  serial {result['serial_s']:7.1f} s │ pool {result['pool_s']:7.1f} s")
+    if workers == 1:
+        print("  (single core: the pool falls back to in-process training)")
+    return result
+
+
+def bench_backtest(n_rows: int = 4 * PL_JOIN_ROWS, epochs: int = 10):
+    """Rolling-origin backtest: rebuild + train each fold serially vs cached matrices + pool."""
+    import backtest
+    folds = backtest.rolling_origin_splits(range(15, 24))
+    config = {**backtest.DEFAULT_CONFIG, 'epochs': epochs}
+    workers, threads = backtest.split_cores(len(folds))
+    result = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_join_db(f"{tmp}/join.db", n_rows)
+
+        t0 = time.perf_counter()        # one experiment per fold, each rebuilding its matrices
+        rows = []
+        for fold in folds:
+            (path,), _ = backtest.prepare_folds([fold], db, cache_dir=f"{tmp}/cold-{fold['fold']}")
+            rows.append(backtest._run_fold(path, config, os.cpu_count() or 1))
+        serial = backtest.error_table(rows)
+        result["serial_s"] = time.perf_counter() - t0
+
+        backtest.prepare_folds(folds, db, cache_dir=f"{tmp}/cache")    # an earlier run's cache
+        t0 = time.perf_counter()
+        pooled = backtest.run_backtest(folds, config, db, workers=workers, cache_dir=f"{tmp}/cache")
+        result["cached_pool_s"] = time.perf_counter() - t0
+    cols = ["goals_mae", "assists_mae"]
+    assert np.allclose(serial[cols].to_numpy(float), pooled[cols].to_numpy(float), atol=1e-4), \
+        "pooled folds differ from serial folds"
+
+    print(f"\nbacktest  {len(folds)} expanding folds over FIFA 15-23, {n_rows:,} rows, {epochs} epochs; "
+          f"{workers} processes × {threads} threads")
+    print(f"  rebuild + serial   {result['serial_s']:7.1f} s")
+    print(f"  cached + pool      {result['cached_pool_s']:7.1f} s")
+    if workers == 1:
+        print("  (single core: the pool falls back to in-process training)")
+    return result
+
+
+TORCH_SCORER = """
+import json, sys
+from prediction_service import Predictor
+predictor = Predictor.load(sys.argv[1], sys.argv[2])
+records = json.load(open(sys.argv[3]))
+print(len(predictor.forward(predictor.pipeline.transform(records))))
+"""
+
+# Runs a script as __main__ and writes its own VmHWM (kB) to stderr on exit;
+# ru_maxrss of a child would include the high-water mark inherited from us.
+CHILD_RSS_WRAPPER = """
+import atexit, runpy, sys
+def report():
+    hwm = [line for line in open('/proc/self/status') if line.startswith('VmHWM:')]
+    sys.stderr.write(hwm[0].split()[1])
+atexit.register(report)
+sys.argv = sys.argv[1:]
+runpy.run_path(sys.argv[0], run_name='__main__')
+"""
+
+
+def _run_child(script: str, *args: str) -> tuple[float, float]:
+    """(wall seconds, peak RSS in MB) of a fresh interpreter running `script`."""
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-c", CHILD_RSS_WRAPPER, script, *args],
+                          cwd=SRC_DIR,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=True)
+    return time.perf_counter() - t0, int(proc.stderr.strip().splitlines()[-1]) / 1024
+
+
+def bench_inference(n_rows: int = PL_JOIN_ROWS, epochs: int = 5, cli_rows: int = 100,
+                    batch_rows: int = 100_000):
+    """NumPy forward pass vs torch: accuracy per weight dtype, CLI startup, throughput."""
+    import torch
+    import numpy_inference
+    import training
+    from prediction_service import Predictor
+
+    corrected = preprocessing.correct_frame(synthetic_join_frame(n_rows))
+    pipeline = preprocessing.PreprocessingPipeline.fit(corrected)
+    X = pipeline.transform_frame(corrected).to_numpy(dtype=np.float64)
+    result = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        preprocessing.write_training_arrays(preprocessing.build_features(corrected.copy()), f"{tmp}/arrays")
+        schema, train, test = training.load_split(f"{tmp}/arrays")
+        run = training.train_one({'epochs': epochs}, schema, train, test)
+        training.save_checkpoint(run['model'], run['config'], schema, f"{tmp}/model.pt")
+        pipeline.save(f"{tmp}/pipeline.json")
+        torch_predictor = Predictor.load(f"{tmp}/model.pt", f"{tmp}/pipeline.json")
+        expected = torch_predictor.forward(X)
+        ok = ~np.isnan(expected).any(axis=1)
+
+        for dtype in numpy_inference.TOLERANCE:
+            path = f"{tmp}/model_{dtype}.npz"
+            training.export_numpy(run['model'], run['config'], schema, path, dtype)
+            got = numpy_inference.NumpyPredictor(numpy_inference.NumpyModel.load(path),
+                                                 pipeline.columns).forward(X)
+            result[f"{dtype}_max_abs_diff"] = float(np.abs(got[ok] - expected[ok]).max())
+            result[f"{dtype}_kb"] = os.path.getsize(path) / 1024
+            assert result[f"{dtype}_max_abs_diff"] <= numpy_inference.TOLERANCE[dtype], dtype
+
+        with open(f"{tmp}/records.json", "w") as f:
+            json.dump(corrected.head(cli_rows).to_dict('records'), f, default=str)
+        with open(f"{tmp}/torch_scorer.py", "w") as f:
+            f.write(TORCH_SCORER)
+        result["cli_numpy_s"], result["cli_numpy_mb"] = _run_child(
+            "predict.py", f"{tmp}/records.json",
+            "--weights", f"{tmp}/model_float32.npz", "--pipeline", f"{tmp}/pipeline.json")
+        result["cli_torch_s"], result["cli_torch_mb"] = _run_child(
+            f"{tmp}/torch_scorer.py", f"{tmp}/model.pt", f"{tmp}/pipeline.json", f"{tmp}/records.json")
+
+        numpy_predictor = numpy_inference.NumpyPredictor(
+            numpy_inference.NumpyModel.load(f"{tmp}/model_float32.npz"), pipeline.columns)
+        big = X[np.arange(batch_rows) % len(X)]
+        for label, forward in (("torch", torch_predictor.forward), ("numpy", numpy_predictor.forward)):
+            forward(big[:1024])
+            t0 = time.perf_counter()
+            forward(big)
+            result[f"{label}_rows_per_s"] = batch_rows / (time.perf_counter() - t0)
+
+    print(f"\ninference  EmbeddedModel after {epochs} epochs on {n_rows:,} rows "
+          f"(torch {torch.__version__}, {torch.get_num_threads()} threads)")
+    for dtype, tol in numpy_inference.TOLERANCE.items():
+        print(f"  {dtype:<8} {result[f'{dtype}_kb']:7.1f} KB  max |Δ| vs torch "
+              f"{result[f'{dtype}_max_abs_diff']:.2e}  (tolerance {tol:g})")
+    print(f"  {cli_rows}-record CLI  numpy {result['cli_numpy_s']:6.2f} s, {result['cli_numpy_mb']:5.0f} MB │ "
+          f"torch {result['cli_torch_s']:6.2f} s, {result['cli_torch_mb']:5.0f} MB")
+    print(f"  batch scoring      numpy {result['numpy_rows_per_s']:,.0f} rows/s │ "
+          f"torch {result['torch_rows_per_s']:,.0f} rows/s")
+    return result
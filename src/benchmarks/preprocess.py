@@ -0,0 +1,214 @@
+"""Preprocessing scenarios: vectorized stages, fitted transform, stage cache,
+compact arrays and chunked mode."""
+import os, sqlite3, tempfile, time
+
+import numpy as np
+import pandas as pd
+from sklearn.preprocessing import OneHotEncoder
+
+import preprocessing
+
+from .measure import measure
+from .synthetic import PL_JOIN_ROWS, make_join_db, synthetic_join_frame
+
+def legacy_corrections(df: pd.DataFrame) -> pd.DataFrame:
+    """The original positional `df.loc` loop + drop."""
+    for idx, (goals, assists) in preprocessing.LEGACY_CORRECTIONS.items():
+        df.loc[idx, ['goals', 'assists']] = [goals, assists]
+    return df.drop(index=preprocessing.LEGACY_DROP_INDICES, errors='ignore')
+
+
+def legacy_feature_engineering(df: pd.DataFrame) -> pd.DataFrame:
+    df['primary_position'] = df['player_positions'].apply(lambda x: x.split(',')[0].strip())
+    df['has_multiple_positions'] = df['player_positions'].apply(lambda x: ',' in x).astype(int)
+    df['primary_position_mapped'] = df['primary_position'].map(preprocessing.POSITION_MAP)
+    df['club_position_mapped'] = df['club_position'].map(preprocessing.POSITION_MAP)
+    df['years_remaining'] = df['club_contract_valid_until_year'] - 2000 - df['fifa_version']
+    return df
+
+
+def legacy_encode_categorical(df: pd.DataFrame) -> pd.DataFrame:
+    ohe = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
+    for col in ['work_rate', 'body_type']:
+        encoded = ohe.fit_transform(df[[col]])
+        encoded_df = pd.DataFrame(encoded, columns=ohe.get_feature_names_out([col]))
+        df = pd.concat([df.reset_index(drop=True), encoded_df.reset_index(drop=True)], axis=1)
+        df.drop(columns=[col], inplace=True)
+    return df
+
+
+def legacy_preprocess(df: pd.DataFrame) -> pd.DataFrame:
+    df = df[df['fifa_update'].notna()]
+    df = legacy_corrections(df)
+    df = legacy_feature_engineering(df)
+    df = preprocessing.handle_missing_and_log_transform(df)
+    df = preprocessing.normalize_numeric_features(df)
+    df = legacy_encode_categorical(df)
+    df = preprocessing.encode_ids(df)
+    return preprocessing.select_columns(df)
+
+
+def bench_preprocess(scale: int = 100, repeat: int = 1):
+    """Original row‑wise stages vs the vectorized `preprocess_frame` (+ equivalence)."""
+    raw = synthetic_join_frame(PL_JOIN_ROWS * scale)
+    corrections = preprocessing.legacy_corrections_table(raw)
+    result = {}
+    for label, fn in (("legacy", legacy_preprocess),
+                      ("vectorized", lambda df: preprocessing.preprocess_frame(df, corrections))):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            out = fn(raw.copy())
+        result[label] = out
+        result[f"{label}_s"] = (time.perf_counter() - t0) / repeat
+
+    pd.testing.assert_frame_equal(result.pop("legacy"), result.pop("vectorized"))
+    print(f"\npreprocess  {len(raw):,} joined rows ({scale}× PL), outputs identical")
+    for label in ("legacy", "vectorized"):
+        print(f"  {label:<10} {result[f'{label}_s']:7.2f} s")
+    return result
+
+
+def bench_transform(n_rows: int = PL_JOIN_ROWS, n_calls: int = 5_000, batch: int = 64):
+    """µs/row of the fitted `PreprocessingPipeline` vs rerunning the whole pipeline."""
+    corrected = preprocessing.correct_frame(synthetic_join_frame(n_rows))
+    t0 = time.perf_counter()
+    reference = preprocessing.build_features(corrected.copy())
+    t_full = time.perf_counter() - t0
+
+    pipeline = preprocessing.PreprocessingPipeline.fit(corrected)
+    records = corrected.to_dict('records')
+    np.testing.assert_allclose(pipeline.transform(records), reference.to_numpy(dtype=float),
+                               rtol=1e-12, atol=1e-12, equal_nan=True)
+
+    rows = [records[i % len(records)] for i in range(n_calls)]
+    t0 = time.perf_counter()
+    for row in rows:
+        pipeline.transform(row)
+    t_single = (time.perf_counter() - t0) / n_calls
+
+    batches = [rows[i:i + batch] for i in range(0, n_calls, batch)]
+    t0 = time.perf_counter()
+    for rows_batch in batches:
+        pipeline.transform(rows_batch)
+    t_batch = (time.perf_counter() - t0) / n_calls
+
+    result = {"full_rerun_s": t_full, "single_us_per_row": t_single * 1e6,
+              "batch_us_per_row": t_batch * 1e6}
+    print(f"\ntransform  pipeline fitted on {len(corrected):,} rows, outputs match preprocess")
+    print(f"  full rerun (old way)  {t_full * 1e3:9.1f} ms")
+    print(f"  single row            {t_single * 1e6:9.1f} µs/row")
+    print(f"  batch of {batch:<3}          {t_batch * 1e6:9.1f} µs/row")
+    return result
+
+
+def bench_stage_cache(scale: int = 1):
+    """`preprocess_all` cold, fully cached, and after invalidating only `select`."""
+    result = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = f"{tmp}/fifa_players.db"
+        conn = sqlite3.connect(db)
+        synthetic_join_frame(PL_JOIN_ROWS * scale).to_sql("prem_name_join", conn, index=False)
+        conn.close()
+        query = "SELECT * FROM prem_name_join"
+        reference = preprocessing.preprocess_all(db, query)
+
+        cache = preprocessing.StageCache(f"{tmp}/stage_cache")
+        for label, invalidate in (("cold", None), ("warm", None), ("select_changed", "select")):
+            t0 = time.perf_counter()
+            out = preprocessing.preprocess_all(db, query, cache=cache, invalidate=invalidate)
+            result[f"{label}_s"] = time.perf_counter() - t0
+            pd.testing.assert_frame_equal(out, reference)
+
+    print(f"\nstage cache  {PL_JOIN_ROWS * scale:,} joined rows, outputs identical")
+    for label in ("cold", "warm", "select_changed"):
+        print(f"  {label:<15} {result[f'{label}_s'] * 1e3:9.1f} ms")
+    return result
+
+
+ALL_LEAGUES_ROWS = 180_000                # FIFA 15–23, every league, one update
+
+
+def torch_import(_path: str):
+    """Memory baseline for the two loaders below: torch imported, nothing loaded."""
+    import torch
+    return torch.zeros(0)
+
+
+def csv_training_load(csv_path: str):
+    """The notebook's path: parse the cleaned CSV, copy into FloatTensors."""
+    import torch
+    df = pd.read_csv(csv_path).dropna()     # the notebook's pace filter, for any column
+    x = torch.FloatTensor(df.drop(['fifa_version', 'goals', 'assists', 'player_id',
+                                   'club_team_id'], axis=1).values)
+    y = torch.FloatTensor(df[['goals', 'assists']].values)
+    float(x.sum() + y.sum())              # touch everything
+    return x
+
+
+def memmap_training_load(arrays_dir: str):
+    """Memory-map the compact arrays and wrap them as tensors without copying."""
+    import torch
+    _, arrays = preprocessing.load_training_arrays(arrays_dir)
+    x = torch.from_numpy(arrays['features'])
+    y = torch.from_numpy(arrays['targets'])
+    float(x.sum() + y.sum())
+    return x
+
+
+def bench_compact(n_rows: int = ALL_LEAGUES_ROWS):
+    """CSV + FloatTensor vs memory-mapped compact arrays, at all-leagues size."""
+    df = preprocessing.preprocess_frame(synthetic_join_frame(n_rows))
+    result = {"frame_mb": df.memory_usage(deep=True).sum() / 2**20,
+              "compact_frame_mb": preprocessing.compact_dtypes(df).memory_usage(deep=True).sum() / 2**20}
+    with tempfile.TemporaryDirectory() as tmp:
+        df.to_csv(f"{tmp}/cleaned.csv", index=False)
+        preprocessing.write_training_arrays(df, f"{tmp}/arrays")
+        result["csv_disk_mb"] = os.path.getsize(f"{tmp}/cleaned.csv") / 2**20
+        result["arrays_disk_mb"] = sum(e.stat().st_size for e in os.scandir(f"{tmp}/arrays")) / 2**20
+        for label, fn, path in (("import", torch_import, ""),
+                                ("csv", csv_training_load, f"{tmp}/cleaned.csv"),
+                                ("memmap", memmap_training_load, f"{tmp}/arrays")):
+            t, peak, n = measure(fn, path, preload=("torch",))
+            result[f"{label}_load_s"], result[f"{label}_peak_mb"], result[f"{label}_rows"] = t, peak, n
+    assert result["csv_rows"] == result["memmap_rows"]
+    del result["import_rows"]
+
+    print(f"\ncompact  {n_rows:,} joined rows → {result['memmap_rows']:,} training rows")
+    print(f"  in-memory frame   {result['frame_mb']:8.1f} MB → {result['compact_frame_mb']:8.1f} MB compact")
+    print(f"  on disk           {result['csv_disk_mb']:8.1f} MB csv → {result['arrays_disk_mb']:8.1f} MB arrays")
+    base_mb = result["import_peak_mb"]
+    print(f"  (fresh process with torch imported: {base_mb:.0f} MB, subtracted below)")
+    for label in ("csv", "memmap"):
+        print(f"  {label:<7} load {result[f'{label}_load_s']:7.3f} s, "
+              f"peak RSS +{result[f'{label}_peak_mb'] - base_mb:5.0f} MB")
+    return result
+
+
+def bench_chunked(sizes=(25_000, 100_000, 400_000), chunksize: int = 50_000):
+    """Peak RSS / time of in-memory vs chunked `preprocess_all` as the table grows."""
+    query = "SELECT * FROM prem_name_join"
+    result = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows in sizes:
+            db = make_join_db(f"{tmp}/join_{n_rows}.db", n_rows)
+            t_mem, rss_mem, _ = measure(preprocessing.preprocess_all, db, query,
+                                        out_path=f"{tmp}/mem.csv", arrays_dir=f"{tmp}/mem_arrays")
+            t_chk, rss_chk, _ = measure(preprocessing.preprocess_chunked, db, query, chunksize,
+                                        out_path=f"{tmp}/chk.csv", arrays_dir=f"{tmp}/chk_arrays")
+            if n_rows == sizes[0]:
+                np.testing.assert_allclose(pd.read_csv(f"{tmp}/chk.csv").to_numpy(dtype=float),
+                                           pd.read_csv(f"{tmp}/mem.csv").to_numpy(dtype=float),
+                                           rtol=1e-9, atol=1e-9, equal_nan=True)
+                _, mem_arrays = preprocessing.load_training_arrays(f"{tmp}/mem_arrays")
+                _, chk_arrays = preprocessing.load_training_arrays(f"{tmp}/chk_arrays")
+                for name, arr in mem_arrays.items():
+                    np.testing.assert_allclose(chk_arrays[name], arr, rtol=1e-6)
+            result[n_rows] = {"in_memory_s": t_mem, "in_memory_peak_mb": rss_mem,
+                              "chunked_s": t_chk, "chunked_peak_mb": rss_chk}
+            os.remove(db)
+
+    print(f"\nchunked preprocess  (chunksize {chunksize:,}; outputs match at {sizes[0]:,} rows)")
+    for n_rows, r in result.items():
+        print(f"  {n_rows:>9,} rows │ in-memory {r['in_memory_s']:6.1f} s {r['in_memory_peak_mb']:6.0f} MB │ "
+              f"chunked {r['chunked_s']:6.1f} s {r['chunked_peak_mb']:6.0f} MB")
+    return result
@@ -0,0 +1,165 @@
+"""Read-side scenarios: club aggregates, similar-player search, data access."""
+import sqlite3, tempfile, time
+
+import numpy as np
+import pandas as pd
+
+import load_csv_sql_db as ingest
+
+from .measure import _seconds, measure
+from .synthetic import PL_JOIN_ROWS, make_players_db, synthetic_players_frame
+
+def notebook_timelines(db: str, club_ids, table: str = "test") -> dict:
+    """championship_analysis.ipynb's way: load the players, regroup per club."""
+    with sqlite3.connect(db) as conn:
+        df = pd.read_sql_query(f"SELECT club_team_id, fifa_version, value_eur FROM {table}", conn)
+    return {c: df[df['club_team_id'] == c].groupby('fifa_version')['value_eur'].sum()
+            for c in club_ids}
+
+
+def bench_aggregates(n_rows: int = 500_000, n_clubs: int = 24):
+    """Club-season aggregates: full build, incremental refresh, timeline queries."""
+    import club_aggregates
+    result = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_players_db(f"{tmp}/players.db", n_rows)
+        club_ids = list(range(1, n_clubs + 1))
+
+        t0 = time.perf_counter()
+        expected = notebook_timelines(db, club_ids)
+        result["notebook_s"] = time.perf_counter() - t0
+
+        with club_aggregates.ClubAggregates(db) as agg:
+            full = agg.refresh(full=True)
+            result["full_refresh_s"], n_partitions = full["seconds"], len(full["refreshed"])
+            result["noop_refresh_s"] = agg.refresh()["seconds"]
+
+            t0 = time.perf_counter()
+            timelines = {c: agg.timeline(c, columns=["fifa_version", "fifa_update", "value_total"])
+                         for c in club_ids}
+            result["timeline_ms"] = (time.perf_counter() - t0) / n_clubs * 1e3
+            for c, frame in timelines.items():
+                got = frame.groupby("fifa_version")["value_total"].sum()
+                assert np.allclose(got.to_numpy(), expected[c].to_numpy()), f"club {c} differs"
+
+            new = synthetic_players_frame(n_rows // n_partitions, seed=99)
+            new["fifa_version"], new["fifa_update"] = 24, 1
+            with sqlite3.connect(db) as conn:
+                conn.executemany(f"INSERT INTO test VALUES ({', '.join('?' * len(ingest.COLUMNS_TO_KEEP))})",
+                                 ingest.frame_records(new[ingest.COLUMNS_TO_KEEP]))
+            incremental = agg.refresh()
+            assert incremental["refreshed"] == [(24, 1)], incremental["refreshed"]
+            result["incremental_refresh_s"] = incremental["seconds"]
+
+    print(f"\nclub aggregates  {n_rows:,} player rows, {n_partitions} (version, update) partitions")
+    print(f"  notebook regroup   {result['notebook_s']:7.2f} s for {n_clubs} club timelines")
+    print(f"  full refresh       {result['full_refresh_s']:7.2f} s")
+    print(f"  +1 partition       {result['incremental_refresh_s']:7.2f} s   "
+          f"(no-op check {result['noop_refresh_s'] * 1e3:.0f} ms)")
+    print(f"  timeline query     {result['timeline_ms']:7.2f} ms per club")
+    return result
+
+
+def bench_similarity(sizes=(PL_JOIN_ROWS, 60_000, 600_000), n_queries: int = 256, k: int = 10):
+    """Similar-player index build / latency / throughput as the population grows."""
+    import similarity
+    result = {}
+    print(f"\nsimilarity  top-{k}; latency = one player, throughput = batches of {n_queries}")
+    print(f"  {'players':>9} {'build':>7} {'pandas scan':>12} {'1 query':>9} {'1 query v22':>12} "
+          f"{'batch q/s':>10} {'batch v22 q/s':>14}")
+    for n in sizes:
+        df = synthetic_players_frame(n)[ingest.COLUMNS_TO_KEEP]
+        t0 = time.perf_counter()
+        index = similarity.SimilarityIndex.build(df)
+        build_s = time.perf_counter() - t0
+        rng = np.random.default_rng(0)
+        rows = rng.integers(0, len(index.vectors), n_queries)
+        queries = index.vectors[rows]
+
+        frame = pd.DataFrame(index.vectors, columns=index.info["columns"])   # the pandas way
+        t0 = time.perf_counter()
+        for r in rows[:5]:
+            ((frame - frame.iloc[r]) ** 2).sum(axis=1).nsmallest(k + 1)
+        scan_ms = (time.perf_counter() - t0) / 5 * 1e3
+
+        def per_query_ms(**filters):
+            t0 = time.perf_counter()
+            for r in rows[:50]:
+                index.query(index.vectors[r], k, exclude=[r], **filters)
+            return (time.perf_counter() - t0) / 50 * 1e3
+
+        def batch_qps(**filters):
+            t0 = time.perf_counter()
+            index.query(queries, k, exclude=rows, **filters)
+            return n_queries / (time.perf_counter() - t0)
+
+        row = {"players": len(index.vectors), "build_s": build_s, "pandas_scan_ms": scan_ms,
+               "query_ms": per_query_ms(), "query_v22_ms": per_query_ms(fifa_version=22),
+               "batch_qps": batch_qps(), "batch_v22_qps": batch_qps(fifa_version=22)}
+        result[str(n)] = row
+        print(f"  {row['players']:>9,} {build_s:6.2f}s {scan_ms:10.1f}ms {row['query_ms']:7.2f}ms "
+              f"{row['query_v22_ms']:10.2f}ms {row['batch_qps']:10,.0f} {row['batch_v22_qps']:14,.0f}")
+    return result
+
+
+def legacy_load_sql_table(path: str, query: str) -> pd.DataFrame:
+    """The original `preprocessing.load_sql_table`: connect, read, close per call."""
+    conn = sqlite3.connect(path)
+    df = pd.read_sql_query(query, conn)
+    conn.close()
+    return df
+
+
+def typed_full_read(path: str, query: str) -> dict:
+    import data_access
+    return data_access.query_columns(path, query)
+
+
+def bench_queries(n_rows: int = 500_000, n_lookups: int = 500, repeat: int = 3):
+    """Small slice lookups and full-table reads: connect-per-query vs `data_access`."""
+    import data_access
+    result = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        db = make_players_db(f"{tmp}/players.db", n_rows)
+        rng = np.random.default_rng(0)
+        clubs = rng.integers(1, 2000, n_lookups).tolist()
+        versions = rng.integers(15, 24, n_lookups).tolist()
+        cols = ", ".join(data_access.SUMMARY_COLUMNS)
+        legacy_sql = [f"SELECT {cols} FROM test WHERE club_team_id = {c} AND fifa_version = {v} "
+                      f"AND fifa_update = 1" for c, v in zip(clubs, versions)]
+
+        def legacy(n):
+            for sql in legacy_sql[:n]:
+                legacy_load_sql_table(db, sql)
+
+        def pooled(n):
+            for c, v in zip(clubs[:n], versions[:n]):
+                data_access.club(c, v, 1, db=db, columns=data_access.SUMMARY_COLUMNS)
+
+        lookups = {}
+        for indexed in (False, True):
+            # without an index every lookup is a table scan: a tenth of them, once
+            n, runs = (n_lookups, repeat) if indexed else (max(n_lookups // 10, 1), 1)
+            if indexed:
+                data_access.ensure_indexes(db)
+            data_access.close_pools()
+            for label, fn in (("legacy", legacy), ("pooled", pooled)):
+                best = min(_seconds(fn, n) for _ in range(runs))
+                lookups[label, indexed] = best / n * 1e3
+                result[f"{label}_lookup_ms{'_indexed' if indexed else ''}"] = lookups[label, indexed]
+
+        full = {}
+        for label, fn in (("legacy", legacy_load_sql_table), ("typed", typed_full_read)):
+            full[label] = measure(fn, db, "SELECT * FROM test",
+                                  preload=("pandas", "numpy", "data_access"))[:2]
+            result[f"{label}_full_s"], result[f"{label}_full_peak_mb"] = full[label]
+        data_access.close_pools()
+
+    print(f"\nqueries  {n_rows:,} players; {n_lookups} club-season lookups, best of {repeat}")
+    for indexed in (False, True):
+        print(f"  lookup {'covering index' if indexed else 'no index':<15} "
+              f"connect-per-query {lookups['legacy', indexed]:6.2f} ms │ "
+              f"pooled + typed {lookups['pooled', indexed]:6.3f} ms")
+    for label, (seconds, peak) in full.items():
+        print(f"  full table  {label:<7} {seconds:6.2f} s   peak {peak:7.0f} MB")
+    return result
@@ -0,0 +1,142 @@
+"""Scraper scenarios: pooled season fetch, page parsing, DB writes, instrumentation."""
+import pathlib, sqlite3, tempfile, time
+
+import pandas as pd
+
+import scraper_with_adjustments as scraper
+
+from .synthetic import StubTransfermarkt, make_list_page, synthetic_stats_frame
+
+def bench_scrape_season(n_pages: int = 8, workers: int = 8, latency: float = 0.25):
+    """Serial vs pooled `scrape_season` against the stub server."""
+    with StubTransfermarkt(n_pages=n_pages, latency=latency) as stub:
+        scraper.configure_rate_limit(stub.url.split("//")[1], rate=4.0, burst=4)
+
+        t0 = time.perf_counter()
+        serial = scraper.scrape_season("goals", 2014, workers=1, base=stub.url)
+        t_serial = time.perf_counter() - t0
+
+        t0 = time.perf_counter()
+        pooled = scraper.scrape_season("goals", 2014, workers=workers, base=stub.url)
+        t_pooled = time.perf_counter() - t0
+
+    assert serial.equals(pooled), "pooled scrape differs from serial scrape"
+    print(f"\nscrape_season  {n_pages} pages, {len(serial)} rows")
+    print(f"  serial        {t_serial:6.2f} s")
+    print(f"  workers={workers:<4} {t_pooled:6.2f} s   ({t_serial / t_pooled:.1f}× faster)")
+    return {"serial_s": t_serial, "pooled_s": t_pooled}
+
+
+def load_fixture_pages(fixtures: str | None = None, n_pages: int = 20,
+                       n_rows: int = 25) -> list[str]:
+    """Saved list pages (*.html in `fixtures`) or freshly generated ones."""
+    if fixtures:
+        return [p.read_text(encoding="utf-8")
+                for p in sorted(pathlib.Path(fixtures).glob("*.html"))]
+    return [make_list_page(n_rows, n_pages, p) for p in range(1, n_pages + 1)]
+
+
+def bench_parse(fixtures: str | None = None, repeat: int = 3):
+    """pages/sec of the "full" vs "fast" `parse_page` backends (+ equivalence)."""
+    pages = load_fixture_pages(fixtures)
+    for html in pages:
+        full, fast = scraper.parse_page(html, "full"), scraper.parse_page(html, "fast")
+        assert scraper.extract_stats_from_page(full, 2014).equals(
+            scraper.extract_stats_from_page(fast, 2014)), "parser backends disagree"
+        assert scraper.get_paginated_urls(full) == scraper.get_paginated_urls(fast)
+
+    print(f"\nextract_stats_from_page  {len(pages)} pages × {repeat}")
+    result = {}
+    for backend in ("full", "fast"):
+        t0 = time.perf_counter()
+        for _ in range(repeat):
+            for html in pages:
+                scraper.extract_stats_from_page(scraper.parse_page(html, backend), 2014)
+        rate = repeat * len(pages) / (time.perf_counter() - t0)
+        result[f"{backend}_pages_per_s"] = rate
+        print(f"  {backend:<5} {rate:8.1f} pages/s")
+    return result
+
+
+def legacy_insert_df(df: pd.DataFrame, db: str, table: str):
+    """The pre‑StatsWriter insert path: new connection + full‑table dedupe per call."""
+    df = scraper.pythonify(df)
+    with sqlite3.connect(db) as conn:
+        cur = conn.cursor()
+        scraper.ensure_table(cur, table)
+        cur.execute(f"""DELETE FROM {table} WHERE rowid NOT IN (
+                        SELECT MIN(rowid) FROM {table} GROUP BY name, season)""")
+        cur.executemany(scraper.UPSERT_SQL.format(table=table),
+                        list(df.itertuples(index=False, name=None)))
+        conn.commit()
+
+
+def bench_db_writes(prefill: int = 1_000_000, batches: int = 10, batch_size: int = 500):
+    """rows/sec of `legacy_insert_df` vs `StatsWriter` on a pre‑filled table."""
+    result = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        for label in ("legacy", "writer"):
+            db = f"{tmp}/{label}.db"
+            with sqlite3.connect(db) as conn:
+                scraper.ensure_table(conn.cursor(), "goals_plus")
+                conn.executemany(
+                    "INSERT INTO goals_plus VALUES (?, ?, ?, ?, ?)",
+                    ((f"Filler {i}", i % 30, 15 + i % 9, "England", 20 + i % 15)
+                     for i in range(prefill)),
+                )
+            frames = [synthetic_stats_frame(batch_size, seed=b) for b in range(batches)]
+
+            t0 = time.perf_counter()
+            if label == "legacy":
+                for df in frames:
+                    legacy_insert_df(df, db, "goals_plus")
+            else:
+                with scraper.StatsWriter(db) as writer:
+                    for df in frames:
+                        writer.write_df("goals_plus", df)
+            rate = batches * batch_size / (time.perf_counter() - t0)
+            result[f"{label}_rows_per_s"] = rate
+
+    print(f"\ninsert  {batches}×{batch_size} rows into a {prefill:,}-row table")
+    for key, rate in result.items():
+        print(f"  {key.split('_')[0]:<7} {rate:12,.0f} rows/s")
+    return result
+
+
+def bench_instrumentation(n_spans: int = 20_000, n_pages: int = 40, repeat: int = 5):
+    """Cost of an `instrumentation.stage` span disabled / enabled, and on parsing."""
+    import instrumentation
+    result = {}
+    for label, memory in (("disabled", None), ("enabled_no_memory", False), ("enabled", True)):
+        if memory is not None:
+            instrumentation.enable("bench", track_memory=memory)
+        t0 = time.perf_counter()
+        for _ in range(n_spans):
+            with instrumentation.stage("noop") as span:
+                span.add(rows_out=1)
+        result[f"{label}_us_per_span"] = (time.perf_counter() - t0) / n_spans * 1e6
+        instrumentation.disable()
+
+    pages = [make_list_page(25, n_pages, p) for p in range(1, n_pages + 1)]
+
+    def parse_all():
+        t0 = time.perf_counter()
+        for html in pages:
+            scraper.extract_stats_from_page(scraper.parse_page(html), 2014)
+        return time.perf_counter() - t0
+
+    parse_all()
+    times = {"disabled": [], "enabled": []}
+    for _ in range(repeat):             # interleaved, so machine drift hits both alike
+        times["disabled"].append(parse_all())
+        instrumentation.enable("bench")
+        times["enabled"].append(parse_all())
+        instrumentation.disable()
+    result["parse_disabled_s"], result["parse_enabled_s"] = min(times["disabled"]), min(times["enabled"])
+
+    print(f"\ninstrumentation  {n_spans:,} empty spans; {n_pages} pages parsed, best of {repeat}")
+    for label in ("disabled", "enabled_no_memory", "enabled"):
+        print(f"  {label:<18} {result[f'{label}_us_per_span']:7.1f} µs/span")
+    print(f"  parse + extract    disabled {result['parse_disabled_s'] * 1e3:7.1f} ms │ "
+          f"enabled {result['parse_enabled_s'] * 1e3:7.1f} ms")
+    return result
@@ -0,0 +1,202 @@
+"""Hot-path regression suite: timed, memory-profiled runs checked against a baseline."""
+import json, multiprocessing, os, pathlib, sqlite3, subprocess, sys, tempfile, time
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import load_csv_sql_db as ingest
+import preprocessing
+import scraper_with_adjustments as scraper
+from paths import SRC_DIR
+
+from .measure import current_rss_mb, peak_rss_mb, reset_peak_rss
+from .synthetic import (PL_JOIN_ROWS, make_join_db, make_list_page, make_players_csv,
+                        synthetic_stats_frame)
+
+# --------------------------------------------------------------------------- #
+# ----------------------------  REGRESSION SUITE  --------------------------- #
+# --------------------------------------------------------------------------- #
+# One timed, memory-profiled scenario per hot path.  Inputs are generated once
+# in a temp dir; each run happens in a fresh process whose setup (reading or
+# copying inputs) is excluded from both the clock and the peak-RSS figure.
+SUITE_THRESHOLD = 0.15                    # > 15 % slower / more memory = regression
+SUITE_MIN_DELTA = {"seconds": 0.05, "delta_mb": 8.0}   # ignore changes below these
+SUITE_METRICS = ("seconds", "delta_mb")   # lower is better
+SUITE_SIZES = {"pages": 40, "page_rows": 25, "insert_prefill": 200_000, "insert_batches": 20,
+               "insert_rows": 500, "csv_mb": 512, "join_rows": 10 * PL_JOIN_ROWS}
+
+
+def _hot_parse(inputs: dict):
+    pages = [p.read_text(encoding="utf-8") for p in sorted(pathlib.Path(inputs["pages"]).glob("*.html"))]
+
+    def run():
+        return sum(len(scraper.extract_stats_from_page(scraper.parse_page(html), 2014))
+                   for html in pages)
+    return run
+
+
+def _hot_insert(inputs: dict):
+    import shutil
+    db = shutil.copy(inputs["insert_db"], f"{inputs['tmp']}/insert_run.db")
+    frames = [synthetic_stats_frame(inputs["insert_rows"], seed=b)
+              for b in range(inputs["insert_batches"])]
+
+    def run():
+        for df in frames:                 # one call per scraped page, as in scrape_and_save
+            scraper.insert_df(df, db, "goals_plus")
+        return len(frames) * inputs["insert_rows"]
+    return run
+
+
+def _hot_ingest(inputs: dict):
+    db = f"{inputs['tmp']}/ingest_run.db"
+    if os.path.exists(db):
+        os.remove(db)
+
+    def run():
+        return ingest.intial_creation_of_database(inputs["csv"], db)
+    return run
+
+
+def _hot_preprocess(inputs: dict):
+    def run():
+        return len(preprocessing.preprocess_all(inputs["join_db"], "SELECT * FROM prem_name_join"))
+    return run
+
+
+HOT_PATHS = {
+    "extract_stats_from_page": _hot_parse,
+    "insert_df": _hot_insert,
+    "intial_creation_of_database": _hot_ingest,
+    "preprocess_all": _hot_preprocess,
+}
+
+
+def _profile_hot_path(name: str, inputs: dict) -> dict:
+    """Runs in a fresh process: setup, then time + peak RSS of the hot path only."""
+    run = HOT_PATHS[name](inputs)
+    exact = reset_peak_rss()
+    base = current_rss_mb()
+    t0 = time.perf_counter()
+    rows = run()
+    seconds = time.perf_counter() - t0
+    peak = peak_rss_mb()
+    return {"seconds": seconds, "peak_mb": peak, "delta_mb": peak - base if exact else None,
+            "rows": rows}
+
+
+def make_suite_inputs(tmp: str, sizes: dict) -> dict:
+    """Generate every suite input once: list pages, a pre-filled stats DB,
+    a male_players.csv of `csv_mb`, and a prem_name_join DB."""
+    pages = pathlib.Path(tmp, "pages")
+    pages.mkdir()
+    for p in range(1, sizes["pages"] + 1):
+        (pages / f"page_{p:04d}.html").write_text(
+            make_list_page(sizes["page_rows"], sizes["pages"], p), encoding="utf-8")
+    insert_db = f"{tmp}/insert.db"
+    with sqlite3.connect(insert_db) as conn:
+        scraper.ensure_table(conn.cursor(), "goals_plus")
+        conn.executemany("INSERT INTO goals_plus VALUES (?, ?, ?, ?, ?)",
+                         ((f"Filler {i}", i % 30, 15 + i % 9, "England", 20 + i % 15)
+                          for i in range(sizes["insert_prefill"])))
+    conn.close()
+    return {"tmp": tmp, "pages": str(pages), "insert_db": insert_db,
+            "insert_rows": sizes["insert_rows"], "insert_batches": sizes["insert_batches"],
+            "csv": make_players_csv(f"{tmp}/male_players.csv", sizes["csv_mb"]),
+            "join_db": make_join_db(f"{tmp}/join.db", sizes["join_rows"])}
+
+
+def suite_meta() -> dict:
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, cwd=SRC_DIR).stdout.strip()
+    except OSError:
+        commit = None
+    return {"created": time.strftime("%Y-%m-%dT%H:%M:%S"), "commit": commit or None,
+            "python": sys.version.split()[0], "pandas": pd.__version__, "numpy": np.__version__,
+            "cpus": os.cpu_count(), "platform": sys.platform}
+
+
+def compare_to_baseline(results: dict, baseline: dict, threshold: float = SUITE_THRESHOLD) -> list[str]:
+    """Regressions of `results` against `baseline` (same layout and sizes), as messages."""
+    regressions = []
+    for name, now in results["results"].items():
+        before = baseline["results"].get(name)
+        if not before:
+            continue
+        for metric in SUITE_METRICS:
+            old, new = before.get(metric), now.get(metric)
+            if old is None or new is None:
+                continue
+            if new - old > max(threshold * old, SUITE_MIN_DELTA[metric]):
+                regressions.append(f"{name}: {metric} {old:.3f} → {new:.3f} "
+                                   f"(+{(new - old) / old:.0%})" if old else f"{name}: {metric} {new:.3f}")
+    return regressions
+
+
+def bench_suite(repeat: int = 3, sizes: dict | None = None, json_path: str | None = None,
+                baseline_path: str | None = None, threshold: float = SUITE_THRESHOLD,
+                save_baseline: bool = False):
+    """Time + peak RSS of each hot path; JSON results, optional baseline check.
+
+    The fastest of `repeat` runs is kept for time, the largest for memory.
+    `results["baseline"]` says what happened to the check: "compared",
+    "saved", or "skipped" (no baseline file, or one recorded at other sizes).
+    """
+    sizes = {**SUITE_SIZES, **(sizes or {})}
+    results = {"meta": suite_meta(), "sizes": sizes, "results": {}}
+    with tempfile.TemporaryDirectory() as tmp:
+        t0 = time.perf_counter()
+        inputs = make_suite_inputs(tmp, sizes)
+        print(f"\nsuite  inputs generated in {time.perf_counter() - t0:.1f} s "
+              f"({sizes['pages']} pages × {sizes['page_rows']} rows, {sizes['csv_mb']:,.0f} MB csv, "
+              f"{sizes['join_rows']:,} join rows); best of {repeat}")
+        ctx = multiprocessing.get_context("spawn")
+        for name in HOT_PATHS:
+            runs = []
+            for _ in range(repeat):
+                with ProcessPoolExecutor(max_workers=1, mp_context=ctx) as pool:
+                    runs.append(pool.submit(_profile_hot_path, name, inputs).result())
+            deltas = [r["delta_mb"] for r in runs if r["delta_mb"] is not None]
+            entry = {"seconds": min(r["seconds"] for r in runs),
+                     "peak_mb": max(r["peak_mb"] for r in runs),
+                     "delta_mb": max(deltas) if deltas else None,
+                     "rows": runs[0]["rows"]}
+            results["results"][name] = entry
+            delta = f"+{entry['delta_mb']:6.1f} MB" if entry["delta_mb"] is not None else "     n/a"
+            print(f"  {name:<28} {entry['seconds']:8.3f} s  peak {entry['peak_mb']:7.1f} MB "
+                  f"({delta})  {entry['rows']:>10,} rows")
+
+    if json_path:
+        with open(json_path, "w") as f:
+            json.dump(results, f, indent=2)
+        print(f"  results → {json_path}")
+    regressions, status = [], None
+    if baseline_path and save_baseline:
+        os.makedirs(os.path.dirname(os.path.abspath(baseline_path)), exist_ok=True)
+        with open(baseline_path, "w") as f:
+            json.dump(results, f, indent=2)
+        status = "saved"
+        print(f"  baseline saved → {baseline_path}")
+    elif baseline_path and os.path.exists(baseline_path):
+        with open(baseline_path) as f:
+            baseline = json.load(f)
+        if baseline.get("sizes") != sizes:
+            status = "skipped"
+            print(f"  SKIPPED baseline check: {baseline_path} was recorded at sizes "
+                  f"{baseline.get('sizes')}, this run used {sizes}")
+        else:
+            status = "compared"
+            regressions = compare_to_baseline(results, baseline, threshold)
+            print(f"  vs baseline {baseline_path} (threshold {threshold:.0%}): "
+                  + ("no regressions" if not regressions else f"{len(regressions)} regression(s)"))
+            for message in regressions:
+                print(f"    ✗ {message}")
+    elif baseline_path:
+        status = "skipped"
+        print(f"  SKIPPED baseline check: no baseline at {baseline_path} "
+              f"(record one with --save-baseline)")
+    results["baseline"] = status
+    results["regressions"] = regressions
+    return results
@@ -0,0 +1,244 @@
+"""Synthetic inputs shared by the scenarios: list pages, players, joins, DBs."""
+import random, sqlite3, threading, time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import pandas as pd
+
+import load_csv_sql_db as ingest
+import preprocessing
+
+# --------------------------------------------------------------------------- #
+# -----------------------  CANNED TRANSFERMARKT PAGES  ---------------------- #
+# --------------------------------------------------------------------------- #
+FIRST_NAMES = ["Harry", "Mohamed", "Kevin", "Bukayo", "Son", "Bruno", "Jamie",
+               "Raheem", "Marcus", "Ollie", "Jarrod", "Callum", "Ivan", "Diogo"]
+LAST_NAMES = ["Kane", "Salah", "De Bruyne", "Saka", "Heung-min", "Fernandes",
+              "Vardy", "Sterling", "Rashford", "Watkins", "Bowen", "Wilson",
+              "Toney", "Jota"]
+NATIONS = ["England", "Egypt", "Belgium", "Korea, South", "Portugal", "Jamaica",
+           "Brazil", "France", "Ireland"]
+
+
+def make_list_page(n_rows: int, n_pages: int = 1, page: int = 1,
+                   season: int = 2014, seed: int = 0) -> str:
+    """HTML shaped like a Transfermarkt goals/assists list page."""
+    rng = random.Random(seed * 1000 + page)
+    rows = []
+    for i in range(n_rows):
+        rank = (page - 1) * n_rows + i + 1
+        name = f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)} {rank}"
+        flags = "".join(
+            f'<img src="/flagge/{n}.png" title="{n}" alt="{n}" class="flaggenrahmen">'
+            for n in rng.sample(NATIONS, rng.choice([1, 1, 1, 2]))
+        )
+        rows.append(
+            f'<tr class="{"odd" if i % 2 else "even"}">'
+            f'<td class="zentriert">{rank}</td>'
+            f'<td class="posrela"><table class="inline-table"><tr>'
+            f'<td rowspan="2"><img src="/portrait/{rank}.jpg" title="{name}"></td>'
+            f'<td class="hauptlink"><a title="{name}" href="/spieler/profil/{rank}">{name}</a></td>'
+            f'</tr><tr><td>Centre-Forward</td></tr></table></td>'
+            f'<td class="zentriert">{flags}</td>'
+            f'<td class="zentriert">{rng.randint(17, 38)}</td>'
+            f'<td class="zentriert"><a title="Club"><img src="/wappen/{rank % 20}.png"></a></td>'
+            f'<td class="zentriert">{rng.randint(1, 38)}</td>'
+            f'<td class="zentriert">{rng.randint(0, 30)}</td>'
+            f'</tr>'
+        )
+    pager = ['<li class="tm-pagination__list-item tm-pagination__list-item--active">'
+             '<a href="#">1</a></li>']
+    pager += [f'<li class="tm-pagination__list-item"><a href="/page/{p}?saison_id={season}">{p}</a></li>'
+              for p in range(2, n_pages + 1)]
+    return (
+        "<!DOCTYPE html><html><head><title>Top goalscorers</title>"
+        + "<script>var x = 1;</script>" * 20
+        # real pages carry ~4× more navigation/footer markup than table markup
+        + "</head><body><div class='header'><ul>"
+        + '<li class="nav"><a href="/wettbewerbe/national">Competitions</a></li>' * 1500
+        + "</ul></div>"
+        + '<div class="responsive-table"><table class="items"><thead><tr>'
+        + "<th>#</th><th>Player</th><th>Nat.</th><th>Age</th><th>Club</th><th>Apps</th><th>Goals</th>"
+        + "</tr></thead><tbody>" + "".join(rows) + "</tbody></table></div>"
+        + '<ul class="tm-pagination">' + "".join(pager) + "</ul>"
+        + "<div class='footer'>" + '<p class="small"><a href="/impressum">footer</a></p>' * 800
+        + "</div></body></html>"
+    )
+
+
+class StubTransfermarkt:
+    """Local HTTP server serving `n_pages` canned list pages with a fixed latency."""
+
+    def __init__(self, n_pages: int = 8, n_rows: int = 25, latency: float = 0.25):
+        pages = {p: make_list_page(n_rows, n_pages, p).encode() for p in range(1, n_pages + 1)}
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                time.sleep(latency)
+                page = int(self.path.split("/page/")[1].split("?")[0]) if "/page/" in self.path else 1
+                body = pages.get(page)
+                self.send_response(200 if body else 404)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(body or b"")))
+                self.end_headers()
+                self.wfile.write(body or b"")
+
+            def log_message(self, *args):
+                pass
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_port}"
+
+    def __enter__(self):
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def synthetic_stats_frame(n_rows: int, season: int = 15, seed: int = 0) -> pd.DataFrame:
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        "name": [f"Player {seed}-{i}" for i in range(n_rows)],
+        "value": rng.integers(0, 30, n_rows),
+        "season": np.full(n_rows, season),
+        "nationality": rng.choice(NATIONS, n_rows),
+        "age": rng.integers(17, 38, n_rows),
+    })
+
+
+LEAGUES = [(13, "Premier League", 1), (14, "Championship", 2), (16, "Ligue 1", 1),
+           (19, "Bundesliga", 1), (31, "Serie A", 1), (53, "La Liga", 1),
+           (60, "League One", 3), (None, None, None)]
+POSITIONS = ["ST", "CM, CDM", "CB", "LW, ST", "GK", "RB, RWB", "CAM, CM", "LB"]
+N_FILLER_COLUMNS = 71                     # the real export has 110 columns
+
+
+def synthetic_players_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """Rows with the `COLUMNS_TO_KEEP` schema plus filler columns."""
+    rng = np.random.default_rng(seed)
+    league = [LEAGUES[i] for i in rng.integers(0, len(LEAGUES), n_rows)]
+    has_club = np.array([l[0] is not None for l in league])
+    club = np.where(has_club, rng.integers(1, 2000, n_rows).astype(float), np.nan)
+    outfield = rng.random(n_rows) > 0.1
+    value = rng.integers(5, 2000, n_rows) * 50_000.0
+
+    def maybe(arr, keep):
+        return np.where(keep, arr, np.nan)
+
+    df = pd.DataFrame({
+        "player_id": rng.integers(1, 270_000, n_rows),
+        "fifa_version": rng.integers(15, 24, n_rows),
+        "fifa_update": rng.integers(1, 6, n_rows),
+        "short_name": [f"P. {rng.choice(LAST_NAMES)}" for _ in range(n_rows)],
+        "long_name": [f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}" for _ in range(n_rows)],
+        "player_positions": rng.choice(POSITIONS, n_rows),
+        "overall": rng.integers(45, 93, n_rows),
+        "potential": rng.integers(50, 95, n_rows),
+        "value_eur": maybe(value, has_club),
+        "wage_eur": maybe(value / 400, has_club),
+        "age": rng.integers(16, 41, n_rows),
+        "dob": [f"{y}-0{m}-1{d}" for y, m, d in zip(rng.integers(1980, 2006, n_rows),
+                                                    rng.integers(1, 10, n_rows),
+                                                    rng.integers(0, 10, n_rows))],
+        "height_cm": rng.integers(160, 205, n_rows),
+        "weight_kg": rng.integers(55, 100, n_rows),
+        "league_id": [l[0] for l in league],
+        "league_name": [l[1] for l in league],
+        "league_level": [l[2] for l in league],
+        "club_team_id": club,
+        "club_name": [f"Club {int(c)}" if c == c else None for c in club],
+        "club_position": rng.choice(["SUB", "RES", "ST", "LCB", "GK", "RCM"], n_rows),
+        "club_jersey_number": maybe(rng.integers(1, 40, n_rows), has_club),
+        "club_contract_valid_until_year": maybe(rng.integers(2015, 2029, n_rows), has_club),
+        "nationality_name": rng.choice(NATIONS, n_rows),
+        "nation_jersey_number": maybe(rng.integers(1, 24, n_rows), rng.random(n_rows) > 0.9),
+        "preferred_foot": rng.choice(["Right", "Left"], n_rows),
+        "weak_foot": rng.integers(1, 6, n_rows),
+        "skill_moves": rng.integers(1, 6, n_rows),
+        "international_reputation": rng.integers(1, 6, n_rows),
+        "work_rate": rng.choice(["Medium/Medium", "High/Medium", "High/High", "Low/High"], n_rows),
+        "body_type": rng.choice(["Normal (170-185)", "Lean (185+)", "Stocky (170-)", "Unique"], n_rows),
+        "release_clause_eur": maybe(value * 1.9, has_club),
+        **{c: maybe(rng.integers(25, 95, n_rows), outfield)
+           for c in ["pace", "shooting", "passing", "dribbling", "defending", "physic"]},
+        "attacking_crossing": rng.integers(10, 95, n_rows),
+        "attacking_finishing": rng.integers(10, 95, n_rows),
+    })
+    for i in range(N_FILLER_COLUMNS):
+        df[f"attr_{i}"] = rng.integers(10, 99, n_rows)
+    return df
+
+
+def make_players_csv(path: str, size_mb: float, block_rows: int = 20_000) -> str:
+    """Write a male_players.csv‑shaped file of roughly `size_mb` megabytes."""
+    blocks = [synthetic_players_frame(block_rows, seed=s).to_csv(index=False, header=False)
+              for s in range(4)]
+    header = ",".join(synthetic_players_frame(1).columns) + "\n"
+    target, written = size_mb * 2**20, 0
+    with open(path, "w") as f:
+        f.write(header)
+        while written < target:
+            block = blocks[written // len(blocks[0]) % len(blocks)]
+            f.write(block)
+            written += len(block)
+    return path
+
+
+def synthetic_release(fifa_version: int, n_rows: int, updates: int = 2) -> pd.DataFrame:
+    """One FIFA release: unique player ids spread over `updates` roster updates."""
+    df = synthetic_players_frame(n_rows, seed=fifa_version)
+    df["player_id"] = np.arange(n_rows) // updates + 1
+    df["fifa_version"] = fifa_version
+    df["fifa_update"] = np.arange(n_rows) % updates + 1
+    return df
+
+
+PL_JOIN_ROWS = 5_900                      # prem_name_join is ~5.9k rows
+
+
+def synthetic_join_frame(n_rows: int, seed: int = 0) -> pd.DataFrame:
+    """prem_name_join‑shaped rows: FIFA columns + Transfermarkt name/goals/assists.
+
+    Keys are unique except for a few join duplicates (same player_id and
+    fifa_version, different name) placed on the legacy drop indices.
+    """
+    rng = np.random.default_rng(seed)
+    df = synthetic_players_frame(n_rows, seed)[ingest.COLUMNS_TO_KEEP]
+    df["player_id"] = rng.permutation(n_rows) + 1
+    df["name"] = df["long_name"] + " " + df.index.astype(str)
+    df["goals"] = rng.poisson(2, n_rows).astype(float)
+    df["assists"] = rng.poisson(1, n_rows).astype(float)
+    for i in [i for i in preprocessing.LEGACY_DROP_INDICES[::3] if i < n_rows]:
+        df.loc[i, ["player_id", "fifa_version"]] = df.loc[i - 1, ["player_id", "fifa_version"]].to_numpy()
+    return df
+
+
+def make_join_db(path: str, n_rows: int, block_rows: int = 100_000) -> str:
+    """SQLite file with a synthetic prem_name_join and its corrections table."""
+    conn = sqlite3.connect(path)
+    for start in range(0, n_rows, block_rows):
+        df = synthetic_join_frame(min(block_rows, n_rows - start), seed=start)
+        if start == 0:
+            preprocessing.legacy_corrections_table(df).to_sql(
+                preprocessing.CORRECTIONS_TABLE, conn, index=False)
+        df["player_id"] += start
+        df.to_sql("prem_name_join", conn, if_exists="append", index=False)
+    conn.close()
+    return path
+
+
+def make_players_db(path: str, n_rows: int, table: str = "test", seed: int = 0,
+                    block_rows: int = 100_000) -> str:
+    """An ingested players table (`COLUMNS_TO_KEEP` schema) of synthetic rows."""
+    conn = sqlite3.connect(path)
+    ingest.create_players_table(conn, table)
+    insert = f"INSERT INTO {table} VALUES ({', '.join('?' * len(ingest.COLUMNS_TO_KEEP))})"
+    for start in range(0, n_rows, block_rows):
+        df = synthetic_players_frame(min(block_rows, n_rows - start), seed=seed + start)
+        conn.executemany(insert, ingest.frame_records(df[ingest.COLUMNS_TO_KEEP]))
+    conn.commit()
+    conn.close()
+    return path
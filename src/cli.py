@@ -0,0 +1,205 @@
+import argparse
+import os
+import runpy
+import sqlite3
+import subprocess
+import sys
+import time
+
+# One entry point for every tool in src/.  Only the standard library is
+# imported here; each subcommand runs its module's own `__main__` block, so
+# pandas / torch / bs4 load only for the subcommand that needs them, and
+# `--help` and `status` stay cheap enough for cron.
+
+COMMANDS = {
+    'ingest': ('load_csv_sql_db', "male_players.csv → SQLite"),
+    'columnar': ('columnar_store', "male_players.csv → partitioned Parquet"),
+    'scrape': ('scraper_with_adjustments', "Transfermarkt goals / assists"),
+    'match': ('name_matching', "join Transfermarkt names to FIFA players"),
+    'query': ('data_access', "player / club slices; create covering indexes"),
+    'aggregates': ('club_aggregates', "refresh / query club-season aggregate tables"),
+    'preprocess': ('preprocessing', "prem_name_join → model-ready CSV / arrays"),
+    'train': ('training', "train, sweep or export models"),
+    'backtest': ('backtest', "rolling-origin backtest over fifa_version"),
+    'predict': ('predict', "score JSON records with the exported NumPy weights"),
+    'similar': ('similarity', "build / query the similar-player index"),
+    'serve': ('prediction_service', "HTTP prediction service"),
+    'bench': ('benchmarks', "offline performance benchmarks"),
+}
+PROFILE_TOP = 15
+SQLITE_HEADER = b"SQLite format 3\x00"
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------  STATUS  --------------------------------- #
+# --------------------------------------------------------------------------- #
+def _size(path: str) -> int:
+    if os.path.isdir(path):
+        return sum(os.path.getsize(os.path.join(root, f))
+                   for root, _, files in os.walk(path) for f in files)
+    return os.path.getsize(path)
+
+
+def _describe(path: str) -> str:
+    if not os.path.exists(path):
+        return "missing"
+    modified = time.strftime("%Y-%m-%d %H:%M", time.localtime(os.path.getmtime(path)))
+    return f"{_size(path) / 2**20:9.1f} MB  {modified}"
+
+
+def table_rows(db: str) -> dict:
+    """Approximate rows per table (max rowid: no full scans, safe from cron)."""
+    conn = sqlite3.connect(f"file:{db}?mode=ro", uri=True)
+    try:
+        rows = {}
+        for (name,) in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table' "
+                                    "AND name NOT LIKE 'sqlite_%' ORDER BY name"):
+            try:
+                rows[name] = conn.execute(f'SELECT MAX(rowid) FROM "{name}"').fetchone()[0] or 0
+            except sqlite3.OperationalError:            # WITHOUT ROWID table
+                rows[name] = None
+        return rows
+    finally:
+        conn.close()
+
+
+def status():
+    """Data files, their sizes and ages, and table sizes; standard library only."""
+    from paths import DATA_DIR, FIFA_DB, HTTP_CACHE_DB, PARQUET_DIR, PLAYERS_CSV, data_path
+
+    print(f"data dir  {DATA_DIR}")
+    files = [("players csv", PLAYERS_CSV), ("parquet", PARQUET_DIR), ("database", FIFA_DB),
+             ("http cache", HTTP_CACHE_DB),
+             ("stage cache", data_path("stage_cache")),
+             ("arrays", data_path("training_arrays")),
+             ("folds", data_path("backtest_cache")),
+             ("similarity", data_path("similarity_index")),
+             ("pipeline", data_path("preprocessing_pipeline.json")),
+             ("model", data_path("embedded_model.pt")),
+             ("weights", data_path("embedded_model.npz"))]
+    for label, path in files:
+        shown = os.path.relpath(path, DATA_DIR) if path.startswith(DATA_DIR) else path
+        print(f"  {label:<12} {_describe(path)}  {shown}")
+
+    if not os.path.isfile(FIFA_DB):
+        return
+    with open(FIFA_DB, "rb") as f:
+        if f.read(len(SQLITE_HEADER)) != SQLITE_HEADER:
+            print("  database is not SQLite (a Git LFS pointer? run `git lfs pull`)")
+            return
+    print("tables (≈ rows)")
+    for name, n in table_rows(FIFA_DB).items():
+        print(f"  {name:<28} {'?' if n is None else f'{n:,}':>12}")
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------  PROFILE  -------------------------------- #
+# --------------------------------------------------------------------------- #
+def parse_importtime(lines) -> list[tuple[str, int, int, int]]:
+    """(module, depth, self µs, cumulative µs) from `python -X importtime` output."""
+    out = []
+    for line in lines:
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        out.append((name.strip(), depth, int(self_us), int(cumulative)))
+    return out
+
+
+def profile_startup(argv: list[str]) -> int:
+    """Run `cli.py argv` under `-X importtime`; report the slowest top-level imports.
+
+    Combine with --help (e.g. `--profile-startup train --help`) to measure a
+    subcommand's import cost without running it.
+    """
+    t0 = time.perf_counter()
+    proc = subprocess.Popen([sys.executable, "-X", "importtime", os.path.abspath(__file__), *argv],
+                            stderr=subprocess.PIPE, text=True)
+    imports = []
+    for line in proc.stderr:            # pass the command's own stderr through
+        if line.startswith("import time:"):
+            imports.append(line)
+        else:
+            sys.stderr.write(line)
+    code = proc.wait()
+    wall = time.perf_counter() - t0
+
+    top = [m for m in parse_importtime(imports) if m[1] == 0]
+    total = sum(m[3] for m in top)
+    print(f"\nstartup profile: {len(imports)} modules imported in {total / 1e3:.1f} ms "
+          f"(process wall time {wall * 1e3:.0f} ms)", file=sys.stderr)
+    for name, _, _, cumulative in sorted(top, key=lambda m: -m[3])[:PROFILE_TOP]:
+        print(f"  {cumulative / 1e3:9.1f} ms  {name}", file=sys.stderr)
+    return code
+
+
+# --------------------------------------------------------------------------- #
+# ---------------------------------  CLI  ----------------------------------- #
+# --------------------------------------------------------------------------- #
+def run_command(name: str, args: list[str]):
+    """Run the module behind `name` as if it were `python <module>.py args`."""
+    module = COMMANDS[name][0]
+    sys.argv = [module, *args]          # alter_sys swaps argv[0] for the module's path
+    # alter_sys also makes the module __main__ for the run, so process pools
+    # (training, ingest) can pickle its functions.
+    runpy.run_module(module, run_name="__main__", alter_sys=True)
+
+
+def run_instrumented(name: str, args: list[str], report: str | None, prometheus: str | None) -> int:
+    """`run_command` with instrumentation enabled; reports are written even on failure."""
+    import instrumentation
+    recorder = instrumentation.enable(name)
+    code = 1
+    try:
+        run_command(name, args)
+        code = 0
+    except SystemExit as exc:
+        code = exc.code if isinstance(exc.code, int) else (0 if exc.code is None else 1)
+        raise
+    finally:
+        instrumentation.disable()
+        extra = {"command": [name, *args], "exit_code": code}
+        if report:
+            recorder.write_json(report, **extra)
+        if prometheus:
+            recorder.write_prometheus(prometheus, **extra)
+    return code
+
+
+def main(argv: list[str] | None = None) -> int:
+    argv = sys.argv[1:] if argv is None else argv
+    width = max(map(len, COMMANDS))
+    parser = argparse.ArgumentParser(
+        description="fifa-score-analysis tools",
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog="commands:\n" + "\n".join(f"  {name:<{width}}  {help_}"
+                                         for name, (_, help_) in COMMANDS.items())
+               + f"\n  {'status':<{width}}  data files and table sizes\n\n"
+               "`cli.py COMMAND --help` shows a command's own options.")
+    parser.add_argument("--data-dir", default=None, help="data directory (sets FIFA_DATA_DIR)")
+    parser.add_argument("--profile-startup", action="store_true",
+                        help="report import time per module after the command")
+    parser.add_argument("--report", default=None, metavar="PATH",
+                        help="write a JSON run report (per-stage time, memory, I/O, rows)")
+    parser.add_argument("--prometheus", default=None, metavar="PATH",
+                        help="write the run metrics in Prometheus text format")
+    parser.add_argument("command", choices=[*COMMANDS, "status"], metavar="COMMAND")
+    parser.add_argument("args", nargs=argparse.REMAINDER, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.data_dir:
+        os.environ["FIFA_DATA_DIR"] = os.path.abspath(args.data_dir)
+    if args.profile_startup:
+        return profile_startup([args.command, *args.args])
+    if args.command == "status":
+        status()
+    elif args.report or args.prometheus:
+        return run_instrumented(args.command, args.args, args.report, args.prometheus)
+    else:
+        run_command(args.command, args.args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
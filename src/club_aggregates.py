@@ -0,0 +1,249 @@
+import argparse
+import sqlite3
+import time
+
+import numpy as np
+import pandas as pd
+
+import instrumentation
+from load_csv_sql_db import frame_records
+from paths import FIFA_DB
+
+# Club-season rollups of the ingested player rows, kept in SQLite so the
+# Championship charts (value / wage bills per club, value timelines) read a
+# few pre-aggregated rows instead of regrouping raw players every time.
+#
+# Rows are aggregated per (club_team_id, fifa_version, fifa_update).  Each
+# (fifa_version, fifa_update) pair of the source table is a partition; its
+# signature (row count and max rowid) is stored after every
+# refresh, so a later refresh only recomputes partitions whose source rows
+# changed.
+
+SOURCE_TABLE = "test"                     # load_csv_sql_db's default table
+AGG_TABLE = "club_season_stats"
+STATE_TABLE = "club_season_sources"
+METRICS = {'wage': 'wage_eur', 'value': 'value_eur', 'overall': 'overall'}
+QUANTILES = {'p25': 0.25, 'median': 0.5, 'p75': 0.75}
+STATS = ['total', 'mean', 'min', *QUANTILES, 'max']
+AGG_COLUMNS = (['club_team_id', 'fifa_version', 'fifa_update', 'club_name', 'league_id',
+                'league_name', 'squad_size']
+               + [f'{m}_{s}' for m in METRICS for s in STATS])
+
+
+def partition_signatures(conn: sqlite3.Connection, table: str) -> dict:
+    """(fifa_version, fifa_update) → (row count, max rowid).
+
+    Covered by the (fifa_version, fifa_update) index, so it never reads the
+    rows themselves.  Appends and deletes change it; an in-place UPDATE does
+    not - pass such partitions to `ClubAggregates.refresh` explicitly.
+    """
+    rows = conn.execute(f"SELECT fifa_version, fifa_update, COUNT(*), MAX(rowid) FROM {table} "
+                        "GROUP BY fifa_version, fifa_update").fetchall()
+    return {(v, u): tuple(sig) for v, u, *sig in rows}
+
+
+def group_stats(values: np.ndarray, group: np.ndarray, starts: np.ndarray) -> dict:
+    """STATS of `values` per group, like pandas' NaN-skipping sum / mean / quantile.
+
+    `group` holds contiguous ascending group numbers and `starts` each group's
+    first position; one lexsort orders every group's values, so min, max and
+    the (linearly interpolated) quantiles are plain fancy-indexing.
+    """
+    n_groups = len(starts)
+    present = ~np.isnan(values)
+    count = np.bincount(group, weights=present, minlength=n_groups).astype(np.int64)
+    total = np.bincount(group, weights=np.where(present, values, 0.0), minlength=n_groups)
+    ordered = values[np.lexsort((values, group))]          # NaNs last within each group
+    empty = count == 0
+    last = starts + np.maximum(count - 1, 0)
+
+    def pick(pos):
+        return np.where(empty, np.nan, ordered[pos])
+
+    stats = {'total': total, 'mean': np.where(empty, np.nan, total / np.maximum(count, 1)),
+             'min': pick(starts)}
+    for name, q in QUANTILES.items():
+        pos = starts + q * np.maximum(count - 1, 0)
+        lo, hi = np.floor(pos).astype(np.int64), np.ceil(pos).astype(np.int64)
+        stats[name] = np.where(empty, np.nan, ordered[lo] + (ordered[hi] - ordered[lo]) * (pos - lo))
+    stats['max'] = pick(last)
+    return stats
+
+
+def aggregate_players(df: pd.DataFrame) -> pd.DataFrame:
+    """Club-season rows (AGG_COLUMNS) from player rows; players without a club are skipped."""
+    keys = ['club_team_id', 'fifa_version', 'fifa_update']
+    df = df[df['club_team_id'].notna()].sort_values(keys, kind='stable')
+    k = df[keys].to_numpy(np.int64)
+    new_group = np.ones(len(k), dtype=bool)
+    new_group[1:] = (k[1:] != k[:-1]).any(axis=1)
+    starts = np.flatnonzero(new_group)
+    group = np.cumsum(new_group) - 1
+
+    out = pd.DataFrame(k[starts], columns=keys)
+    for col in ('club_name', 'league_id', 'league_name'):
+        out[col] = df[col].to_numpy()[starts]
+    out['squad_size'] = np.diff(np.append(starts, len(k)))
+    for prefix, col in METRICS.items():
+        for name, values in group_stats(df[col].to_numpy(np.float64), group, starts).items():
+            out[f'{prefix}_{name}'] = values
+    return out[AGG_COLUMNS]
+
+
+class ClubAggregates:
+    """The aggregate table of one database: refresh it, and query it.
+
+        with ClubAggregates(db) as agg:
+            agg.refresh()                       # only partitions that changed
+            agg.timeline(club_id, fifa_update=2)
+    """
+
+    def __init__(self, db: str = FIFA_DB, source: str = SOURCE_TABLE):
+        self.db = db
+        self.source = source
+        self.conn = sqlite3.connect(db)
+        self.conn.execute("PRAGMA journal_mode = WAL")
+        self.conn.execute("PRAGMA synchronous = NORMAL")
+        self.ensure()
+
+    def ensure(self):
+        types = {'club_name': 'TEXT', 'league_name': 'TEXT', 'club_team_id': 'INTEGER',
+                 'fifa_version': 'INTEGER', 'fifa_update': 'INTEGER', 'league_id': 'INTEGER',
+                 'squad_size': 'INTEGER'}
+        cols = ",\n    ".join(f"{c} {types.get(c, 'REAL')}" for c in AGG_COLUMNS)
+        with self.conn:
+            # the primary key doubles as the (club_team_id, fifa_version) index
+            self.conn.execute(f"""CREATE TABLE IF NOT EXISTS {AGG_TABLE} (
+    {cols},
+    PRIMARY KEY (club_team_id, fifa_version, fifa_update)
+)""")
+            self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{AGG_TABLE}_partition "
+                              f"ON {AGG_TABLE} (fifa_version, fifa_update)")
+            self.conn.execute(f"""CREATE TABLE IF NOT EXISTS {STATE_TABLE} (
+    source TEXT, fifa_version INTEGER, fifa_update INTEGER, signature TEXT, refreshed_at REAL,
+    PRIMARY KEY (source, fifa_version, fifa_update)
+)""")
+            if self._source_exists():
+                # partition reads and signatures become index range scans
+                self.conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.source}_version_update "
+                                  f"ON {self.source} (fifa_version, fifa_update)")
+
+    def _source_exists(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                                 (self.source,)).fetchone() is not None
+
+    # ----------------------------------------------------------------- refresh
+    def stale_partitions(self, current: dict | None = None) -> tuple[list, list]:
+        """(partitions whose source rows changed or are new, partitions gone from the source)."""
+        if current is None:
+            current = partition_signatures(self.conn, self.source) if self._source_exists() else {}
+        stored = {(v, u): sig for v, u, sig in self.conn.execute(
+            f"SELECT fifa_version, fifa_update, signature FROM {STATE_TABLE} WHERE source = ?",
+            (self.source,))}
+        changed = sorted(p for p, sig in current.items() if stored.get(p) != repr(sig))
+        removed = sorted(p for p in stored if p not in current)
+        return changed, removed
+
+    def refresh(self, partitions=None, full: bool = False) -> dict:
+        """Recompute stale partitions, or the given (version, update) pairs, or all.
+
+        Stale partitions are read in one query and replaced, together with
+        their new signatures, in one transaction: readers never see a
+        half-refreshed table.
+        """
+        t0 = time.perf_counter()
+        current = partition_signatures(self.conn, self.source) if self._source_exists() else {}
+        changed, removed = self.stale_partitions(current)
+        if full:
+            changed = sorted(current)
+        elif partitions is not None:
+            wanted = {tuple(p) for p in partitions}
+            changed = sorted(p for p in wanted if p in current)
+            removed = sorted(p for p in wanted if p not in current)
+        agg = pd.DataFrame(columns=AGG_COLUMNS)
+        with instrumentation.stage("aggregates.refresh") as span:
+            if changed:
+                query = (f"SELECT club_team_id, fifa_version, fifa_update, club_name, league_id, "
+                         f"league_name, {', '.join(METRICS.values())} FROM {self.source}")
+                params = []
+                if len(changed) < len(current):      # else one sequential scan is cheaper
+                    query += (" WHERE (fifa_version, fifa_update) IN (VALUES "
+                              + ", ".join("(?, ?)" for _ in changed) + ")")
+                    params = [x for p in changed for x in p]
+                players = pd.read_sql_query(query, self.conn, params=params)
+                agg = aggregate_players(players)
+                span.add(rows_in=len(players), rows_out=len(agg))
+            insert = (f"INSERT INTO {AGG_TABLE} ({', '.join(AGG_COLUMNS)}) "
+                      f"VALUES ({', '.join('?' * len(AGG_COLUMNS))})")
+            now = time.time()
+            with self.conn:
+                for version, update in changed + removed:
+                    self.conn.execute(f"DELETE FROM {AGG_TABLE} WHERE fifa_version = ? AND fifa_update = ?",
+                                      (version, update))
+                self.conn.executemany(insert, frame_records(agg))
+                self.conn.executemany(f"INSERT OR REPLACE INTO {STATE_TABLE} VALUES (?, ?, ?, ?, ?)",
+                                      [(self.source, v, u, repr(current[v, u]), now) for v, u in changed])
+                self.conn.executemany(f"DELETE FROM {STATE_TABLE} WHERE source = ? AND fifa_version = ? "
+                                      "AND fifa_update = ?", [(self.source, v, u) for v, u in removed])
+        n_rows = len(agg)
+        return {'refreshed': changed, 'removed': removed, 'rows': n_rows,
+                'seconds': time.perf_counter() - t0}
+
+    # ------------------------------------------------------------------- query
+    def timeline(self, club_team_id: int, fifa_update: int | None = None,
+                 first: int | None = None, last: int | None = None,
+                 columns: list[str] | None = None) -> pd.DataFrame:
+        """One club's rows ordered by fifa_version (a primary-key range scan)."""
+        where, params = ["club_team_id = ?"], [int(club_team_id)]
+        for cond, value in (("fifa_update = ?", fifa_update), ("fifa_version >= ?", first),
+                            ("fifa_version <= ?", last)):
+            if value is not None:
+                where.append(cond)
+                params.append(value)
+        cols = ", ".join(columns or AGG_COLUMNS)
+        return pd.read_sql_query(
+            f"SELECT {cols} FROM {AGG_TABLE} WHERE {' AND '.join(where)} "
+            f"ORDER BY fifa_version, fifa_update", self.conn, params=params)
+
+    def season(self, fifa_version: int, fifa_update: int, league_id: int | None = None,
+               order_by: str = 'value_total') -> pd.DataFrame:
+        """Every club of one (version, update), e.g. the per-club value / wage bar charts."""
+        if order_by not in AGG_COLUMNS:
+            raise ValueError(f"unknown column {order_by!r}")
+        query = f"SELECT * FROM {AGG_TABLE} WHERE fifa_version = ? AND fifa_update = ?"
+        params = [fifa_version, fifa_update]
+        if league_id is not None:
+            query += " AND league_id = ?"
+            params.append(league_id)
+        return pd.read_sql_query(query + f" ORDER BY {order_by} DESC", self.conn, params=params)
+
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="club-season aggregate tables (incremental refresh)")
+    parser.add_argument("--db", default=FIFA_DB)
+    parser.add_argument("--source", default=SOURCE_TABLE, help="ingested player table")
+    parser.add_argument("--full", action="store_true", help="recompute every partition")
+    parser.add_argument("--status", action="store_true", help="list stale partitions and exit")
+    parser.add_argument("--club", type=int, default=None, help="print this club's timeline")
+    parser.add_argument("--update", type=int, default=None, help="fifa_update for --club")
+    args = parser.parse_args()
+
+    with ClubAggregates(args.db, args.source) as agg:
+        if args.status:
+            changed, removed = agg.stale_partitions()
+            print(f"stale: {changed or 'none'}; removed from source: {removed or 'none'}")
+        elif args.club is not None:
+            print(agg.timeline(args.club, args.update).to_string(index=False))
+        else:
+            result = agg.refresh(full=args.full)
+            print(f"✅ {len(result['refreshed'])} partitions refreshed ({result['rows']:,} club rows), "
+                  f"{len(result['removed'])} removed in {result['seconds']:.2f} s")
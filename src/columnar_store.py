@@ -0,0 +1,91 @@
+import argparse
+import pandas as pd
+import pyarrow as pa
+import pyarrow.compute as pc
+import pyarrow.dataset as ds
+
+from paths import PARQUET_DIR, PLAYERS_CSV
+from load_csv_sql_db import COLUMNS_TO_KEEP, DTYPES, CHUNK_BYTES, iter_filtered_chunks
+
+# Low‑cardinality text columns are stored dictionary‑encoded and come back
+# from `load_players` as pandas categoricals.
+DICTIONARY_COLUMNS = [
+    'league_name', 'club_name', 'club_position', 'nationality_name',
+    'preferred_foot', 'work_rate', 'body_type',
+]
+PARTITION_SCHEMA = pa.schema([('fifa_version', pa.int8()), ('league_id', pa.int16())])
+ROWS_PER_GROUP = 64_000
+
+
+def arrow_schema() -> pa.Schema:
+    fields = []
+    for col in COLUMNS_TO_KEEP:
+        if col in PARTITION_SCHEMA.names:
+            fields.append(PARTITION_SCHEMA.field(col))
+        elif col in DICTIONARY_COLUMNS:
+            fields.append(pa.field(col, pa.dictionary(pa.int32(), pa.string())))
+        elif DTYPES[col] == 'str':
+            fields.append(pa.field(col, pa.string()))
+        else:
+            fields.append(pa.field(col, pa.from_numpy_dtype(DTYPES[col])))
+    return pa.schema(fields)
+
+
+def _record_batches(csv_path: str, workers: int | None, chunk_bytes: int):
+    schema = arrow_schema()
+    for chunk in iter_filtered_chunks(csv_path, workers, chunk_bytes):
+        # sorted chunks give tight per‑row‑group min/max for update/club filters
+        chunk = chunk.sort_values(['fifa_update', 'club_team_id'])
+        chunk['league_id'] = chunk['league_id'].astype('Int16')
+        chunk['fifa_version'] = chunk['fifa_version'].astype('int8')
+        yield from pa.Table.from_pandas(chunk, schema=schema, preserve_index=False).to_batches()
+
+
+def convert_csv_to_parquet(csv_path: str, out_dir: str, workers: int | None = None,
+                           chunk_bytes: int = CHUNK_BYTES):
+    """One‑time conversion of male_players.csv into a hive‑partitioned Parquet set.
+
+    Layout: out_dir/fifa_version=23/league_id=13/part-0.parquet.  All CSV ranges
+    stream through a single writer, so each partition ends up in one file.
+    """
+    ds.write_dataset(
+        _record_batches(csv_path, workers, chunk_bytes),
+        out_dir,
+        schema=arrow_schema(),
+        format="parquet",
+        partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"),
+        existing_data_behavior="delete_matching",
+        min_rows_per_group=ROWS_PER_GROUP // 4,
+        max_rows_per_group=ROWS_PER_GROUP,
+    )
+
+
+def players_dataset(root: str) -> ds.Dataset:
+    return ds.dataset(root, format="parquet",
+                      partitioning=ds.partitioning(PARTITION_SCHEMA, flavor="hive"))
+
+
+def load_players(root: str, columns: list[str] | None = None, league_ids=None,
+                 fifa_versions=None, fifa_updates=None, club_team_ids=None) -> pd.DataFrame:
+    """Read only the partitions / row groups matching the filters.
+
+    League and version filters prune whole directories; update and club
+    filters are pushed down to Parquet row‑group statistics.
+    """
+    expr = None
+    for col, values in (('league_id', league_ids), ('fifa_version', fifa_versions),
+                        ('fifa_update', fifa_updates), ('club_team_id', club_team_ids)):
+        if values is not None:
+            cond = pc.field(col).isin(list(values))
+            expr = cond if expr is None else expr & cond
+    table = players_dataset(root).to_table(columns=columns, filter=expr)
+    return table.to_pandas()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="male_players.csv → partitioned Parquet")
+    parser.add_argument("csv", nargs="?", default=PLAYERS_CSV)
+    parser.add_argument("out", nargs="?", default=PARQUET_DIR)
+    parser.add_argument("--workers", type=int, default=None)
+    args = parser.parse_args()
+    convert_csv_to_parquet(args.csv, args.out, args.workers)
@@ -0,0 +1,265 @@
+import argparse
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+import numpy as np
+import pandas as pd
+
+from load_csv_sql_db import DTYPES
+from paths import FIFA_DB
+
+# Read-side access to the players database.  Connections are opened once per
+# database file, read-only, with a large page cache and memory-mapped I/O, and
+# handed out from a small pool instead of reconnecting on every query.  The
+# common slices (one player's history, a season, a club, a league) are fixed
+# parameterized statements, so each pooled connection prepares them once.
+# `fetch_columns` returns typed NumPy arrays straight from the cursor rows,
+# skipping pandas' per-column type inference.
+
+PLAYERS_TABLE = "test"                    # load_csv_sql_db's default table
+POOL_SIZE = 4
+MMAP_BYTES = 1 << 30
+CACHE_KIB = 64 * 1024
+FETCH_BLOCK_ROWS = 50_000
+
+QUERIES = {
+    'player_history': "SELECT {columns} FROM {table} WHERE player_id = ? "
+                      "ORDER BY fifa_version, fifa_update",
+    'season': "SELECT {columns} FROM {table} WHERE fifa_version = ? AND fifa_update = ?",
+    'club': "SELECT {columns} FROM {table} WHERE club_team_id = ? "
+            "ORDER BY fifa_version, fifa_update",
+    'club_season': "SELECT {columns} FROM {table} WHERE club_team_id = ? AND fifa_version = ? "
+                   "AND fifa_update = ?",
+    'league_season': "SELECT {columns} FROM {table} WHERE league_id = ? AND fifa_version = ? "
+                     "AND fifa_update = ?",
+}
+
+# Columns of the slim projections (timelines, squad values, …).  Each index
+# keys one access pattern and carries the rest of these columns, so a query
+# for SUMMARY_COLUMNS is answered from the index without touching the table.
+SUMMARY_COLUMNS = ['player_id', 'fifa_version', 'fifa_update', 'club_team_id', 'league_id',
+                   'overall', 'potential', 'value_eur', 'wage_eur']
+INDEX_KEYS = {
+    'player': ['player_id', 'fifa_version', 'fifa_update'],
+    'club': ['club_team_id', 'fifa_version', 'fifa_update'],
+    'league': ['league_id', 'fifa_version', 'fifa_update'],
+    'season': ['fifa_version', 'fifa_update', 'league_id', 'club_team_id'],
+}
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------  POOLING  -------------------------------- #
+# --------------------------------------------------------------------------- #
+def connect_readonly(db: str, mmap_bytes: int = MMAP_BYTES, cache_kib: int = CACHE_KIB) -> sqlite3.Connection:
+    conn = sqlite3.connect(f"file:{os.path.abspath(db)}?mode=ro", uri=True,
+                           check_same_thread=False, cached_statements=256)
+    conn.execute(f"PRAGMA mmap_size = {int(mmap_bytes)}")
+    conn.execute(f"PRAGMA cache_size = -{int(cache_kib)}")
+    conn.execute("PRAGMA temp_store = MEMORY")
+    return conn
+
+
+class ConnectionPool:
+    """Up to `size` read-only connections to one database, opened on demand."""
+
+    def __init__(self, db: str, size: int = POOL_SIZE):
+        self.db = db
+        self.size = size
+        self._idle = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def connection(self):
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            with self._lock:
+                grow = self._opened < self.size
+                self._opened += grow
+            conn = connect_readonly(self.db) if grow else self._idle.get()
+        try:
+            yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
+        with self._lock:
+            self._opened = 0
+
+
+_POOLS: dict[tuple, ConnectionPool] = {}
+_POOLS_LOCK = threading.Lock()
+
+
+def read_pool(db: str = FIFA_DB) -> ConnectionPool:
+    """The shared pool for `db`; a file replaced on disk gets a fresh pool."""
+    path = os.path.abspath(db)
+    key = (path, os.stat(path).st_ino)
+    with _POOLS_LOCK:
+        pool = _POOLS.get(key)
+        if pool is None:
+            for stale in [k for k in _POOLS if k[0] == path]:
+                _POOLS.pop(stale).close()
+            pool = _POOLS[key] = ConnectionPool(path)
+    return pool
+
+
+def close_pools():
+    with _POOLS_LOCK:
+        for pool in _POOLS.values():
+            pool.close()
+        _POOLS.clear()
+
+
+# --------------------------------------------------------------------------- #
+# ------------------------------  TYPED FETCH  ------------------------------ #
+# --------------------------------------------------------------------------- #
+def _column_array(values: tuple, dtype: str | None) -> np.ndarray:
+    """One result column as a typed array; NULLs make integer columns float64,
+    and values too wide for the integer `dtype` fall back to inference.
+
+    Without a `dtype`, numbers become int64 / float64 as NumPy infers them
+    and anything else an object array.
+    """
+    if dtype is None:
+        if all(v is None for v in values):
+            return np.full(len(values), None, dtype=object)   # typed by _concat
+        arr = np.array(values)
+        if arr.dtype.kind in 'iuf':
+            return arr
+        try:                              # numbers with NULLs
+            return np.array(values, dtype=np.float64)
+        except (TypeError, ValueError):
+            dtype = 'object'
+    kind = np.dtype(dtype).kind
+    if kind in 'iu':
+        try:
+            return np.array(values, dtype=dtype)
+        except TypeError:                 # a NULL in an integer column
+            return np.array(values, dtype=np.float64)
+        except OverflowError:             # values wider than the schema's dtype
+            return _column_array(values, None)
+    if kind == 'f':
+        return np.array(values, dtype=dtype)       # None → NaN
+    out = np.empty(len(values), dtype=object)
+    out[:] = values
+    return out
+
+
+def _concat(blocks: list[np.ndarray]) -> np.ndarray:
+    if len(blocks) == 1:
+        return blocks[0]
+    numeric = [b for b in blocks if b.dtype != object]
+    if numeric and all(b.dtype != object or all(v is None for v in b) for b in blocks):
+        dtype = np.result_type(np.float64, *numeric)      # numbers with all-NULL blocks
+        blocks = [b if b.dtype != object else np.full(len(b), np.nan, dtype=dtype) for b in blocks]
+    return np.concatenate(blocks)
+
+
+def fetch_columns(cursor: sqlite3.Cursor, dtypes: dict | None = None,
+                  block_rows: int = FETCH_BLOCK_ROWS) -> dict[str, np.ndarray]:
+    """All rows of an executed query as {column: array}, typed from `dtypes`
+    (default: the ingest schema's DTYPES, else inferred from the first value).
+
+    Rows are converted `block_rows` at a time, so at most one block of Python
+    row tuples is alive at once.
+    """
+    dtypes = DTYPES if dtypes is None else dtypes
+    names = [d[0] for d in cursor.description]
+    types = [None if dtypes.get(n, 'str') == 'str' else dtypes[n] for n in names]
+    blocks = [[] for _ in names]
+    while rows := cursor.fetchmany(block_rows):
+        for out, dtype, col in zip(blocks, types, zip(*rows)):
+            out.append(_column_array(col, dtype))
+    return {n: _concat(b) if b else np.array([], dtype=t or object)
+            for n, t, b in zip(names, types, blocks)}
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------  QUERIES  -------------------------------- #
+# --------------------------------------------------------------------------- #
+def query_columns(db: str, sql: str, params=(), dtypes: dict | None = None) -> dict[str, np.ndarray]:
+    with read_pool(db).connection() as conn:
+        return fetch_columns(conn.execute(sql, params), dtypes)
+
+
+def query_frame(db: str, sql: str, params=(), dtypes: dict | None = None) -> pd.DataFrame:
+    return pd.DataFrame(query_columns(db, sql, params, dtypes), copy=False)
+
+
+def named_query(name: str, params, db: str = FIFA_DB, table: str = PLAYERS_TABLE,
+                columns: list[str] | None = None) -> dict[str, np.ndarray]:
+    """Run one of QUERIES, e.g. named_query('club', (1802,), columns=SUMMARY_COLUMNS)."""
+    sql = QUERIES[name].format(columns=", ".join(columns) if columns else "*", table=table)
+    return query_columns(db, sql, params)
+
+
+def player_history(player_id: int, **kw) -> dict[str, np.ndarray]:
+    return named_query('player_history', (int(player_id),), **kw)
+
+
+def season(fifa_version: int, fifa_update: int, **kw) -> dict[str, np.ndarray]:
+    return named_query('season', (int(fifa_version), int(fifa_update)), **kw)
+
+
+def club(club_team_id: int, fifa_version: int | None = None, fifa_update: int = 1,
+         **kw) -> dict[str, np.ndarray]:
+    if fifa_version is None:
+        return named_query('club', (int(club_team_id),), **kw)
+    return named_query('club_season', (int(club_team_id), int(fifa_version), int(fifa_update)), **kw)
+
+
+def league(league_id: int, fifa_version: int, fifa_update: int = 1, **kw) -> dict[str, np.ndarray]:
+    return named_query('league_season', (int(league_id), int(fifa_version), int(fifa_update)), **kw)
+
+
+def ensure_indexes(db: str = FIFA_DB, table: str = PLAYERS_TABLE) -> list[str]:
+    """Create the covering indexes (needs a writable connection); returns their names."""
+    names = []
+    conn = sqlite3.connect(db)
+    try:
+        with conn:
+            for name, keys in INDEX_KEYS.items():
+                cols = keys + [c for c in SUMMARY_COLUMNS if c not in keys]
+                conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{table}_{name}_cover "
+                             f"ON {table} ({', '.join(cols)})")
+                names.append(f"idx_{table}_{name}_cover")
+        conn.execute("ANALYZE")
+    finally:
+        conn.close()
+    return names
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="pooled read-only queries on the players table")
+    parser.add_argument("--db", default=FIFA_DB)
+    parser.add_argument("--table", default=PLAYERS_TABLE)
+    parser.add_argument("--index", action="store_true", help="create the covering indexes")
+    parser.add_argument("--player", type=int, default=None, help="print a player's history")
+    parser.add_argument("--club", type=int, default=None, help="print a club's players")
+    parser.add_argument("--version", type=int, default=None, help="fifa_version for --club")
+    parser.add_argument("--update", type=int, default=1, help="fifa_update for --club")
+    args = parser.parse_args()
+
+    if args.index:
+        for name in ensure_indexes(args.db, args.table):
+            print(f"✅ {name}")
+    slices = {}
+    if args.player is not None:
+        slices['player'] = player_history(args.player, db=args.db, table=args.table,
+                                          columns=SUMMARY_COLUMNS)
+    if args.club is not None:
+        slices['club'] = club(args.club, args.version, args.update, db=args.db, table=args.table,
+                              columns=SUMMARY_COLUMNS)
+    for label, cols in slices.items():
+        print(f"{label}:")
+        print(pd.DataFrame(cols).to_string(index=False))
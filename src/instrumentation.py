@@ -0,0 +1,258 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# Per-stage run metrics for scrapes, ingests and preprocessing runs.
+#
+#     with stage("fetch") as span:
+#         ...
+#         span.add(bytes_down=len(body), retries=n)
+#
+# While no `Recorder` is enabled, `stage` hands back a shared no-op span, so
+# instrumented code costs one global lookup and an empty `with` per call.
+# Standard library only: `cli.py` enables it without importing anything heavy.
+
+COUNTERS = ("rows_in", "rows_out", "bytes_down", "bytes_read", "retries", "sleep_s", "cache_hits")
+PROM_PREFIX = "fifa"
+
+
+def _status_kb(field: str) -> int | None:
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith(field):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    return None
+
+
+def peak_rss_mb() -> float | None:
+    kb = _status_kb("VmHWM:")
+    if kb is None:
+        try:
+            import resource
+            return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+        except ImportError:
+            return None
+    return kb / 1024
+
+
+def reset_peak_rss() -> bool:
+    """Reset VmHWM to the current RSS (Linux); False where unsupported."""
+    try:
+        with open("/proc/self/clear_refs", "w") as f:
+            f.write("5")
+        return True
+    except OSError:
+        return False
+
+
+class StageStats:
+    __slots__ = ("calls", "wall_s", "cpu_s", "peak_rss_mb", *COUNTERS)
+
+    def __init__(self):
+        self.calls = 0
+        self.wall_s = self.cpu_s = 0.0
+        self.peak_rss_mb = None
+        for name in COUNTERS:
+            setattr(self, name, 0)
+
+    def to_dict(self) -> dict:
+        return {name: getattr(self, name) for name in self.__slots__}
+
+
+class Span:
+    """Counters of one stage call; folded into the recorder on exit."""
+
+    __slots__ = ("counts",)
+
+    def __init__(self):
+        self.counts = {}
+
+    def add(self, **counts):
+        for name, value in counts.items():
+            self.counts[name] = self.counts.get(name, 0) + value
+
+
+class _NullSpan:
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def add(self, **counts):
+        pass
+
+
+NULL_SPAN = _NullSpan()
+
+
+class Recorder:
+    """Thread-safe per-stage totals for one run.
+
+    Wall and CPU (calling thread) time are summed over calls; peak RSS is
+    the process high-water mark seen when a call ends.  Spans opened with
+    `own_peak` reset that mark first (a page-table walk, ~1 ms on a large
+    process), so long sequential stages such as the preprocess steps each
+    report their own peak instead of the run's.
+    """
+
+    def __init__(self, run: str, track_memory: bool = True):
+        self.run = run
+        self.started = time.time()
+        self._t0 = time.perf_counter()
+        self.stages: dict[str, StageStats] = {}
+        self.track_memory = track_memory
+        self._run_peak = 0.0
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def stage(self, name: str, own_peak: bool = False):
+        if own_peak and self.track_memory:
+            self._run_peak = max(self._run_peak, peak_rss_mb() or 0.0)   # before it is reset
+            reset_peak_rss()
+        span = Span()
+        t0, c0 = time.perf_counter(), time.thread_time()
+        try:
+            yield span
+        finally:
+            wall, cpu = time.perf_counter() - t0, time.thread_time() - c0
+            peak = peak_rss_mb() if self.track_memory else None
+            with self._lock:
+                stats = self.stages.get(name)
+                if stats is None:
+                    stats = self.stages[name] = StageStats()
+                stats.calls += 1
+                stats.wall_s += wall
+                stats.cpu_s += cpu
+                if peak is not None and (stats.peak_rss_mb is None or peak > stats.peak_rss_mb):
+                    stats.peak_rss_mb = peak
+                for key, value in span.counts.items():
+                    setattr(stats, key, getattr(stats, key) + value)
+
+    def count(self, name: str, **counts):
+        """Add counters to a stage without timing anything."""
+        with self._lock:
+            stats = self.stages.get(name)
+            if stats is None:
+                stats = self.stages[name] = StageStats()
+            for key, value in counts.items():
+                setattr(stats, key, getattr(stats, key) + value)
+
+    def report(self, **extra) -> dict:
+        with self._lock:
+            stages = {name: s.to_dict() for name, s in self.stages.items()}
+        return {"run": self.run, "pid": os.getpid(),
+                "started": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+                "started_unix": self.started,
+                "wall_s": time.perf_counter() - self._t0,
+                "peak_rss_mb": max(self._run_peak, peak_rss_mb() or 0.0) or None,
+                **extra, "stages": stages}
+
+    def write_json(self, path: str, **extra) -> dict:
+        report = self.report(**extra)
+        _atomic_write(path, json.dumps(report, indent=2))
+        return report
+
+    def write_prometheus(self, path: str, **extra):
+        """Text exposition format, e.g. for node_exporter's textfile collector."""
+        _atomic_write(path, prometheus_text(self.report(**extra)))
+
+
+def prometheus_text(report: dict) -> str:
+    run = _label(report["run"])
+    lines = []
+
+    def metric(name: str, help_: str, samples):
+        lines.append(f"# HELP {PROM_PREFIX}_{name} {help_}")
+        lines.append(f"# TYPE {PROM_PREFIX}_{name} gauge")
+        for labels, value in samples:
+            if value is not None:
+                lines.append(f"{PROM_PREFIX}_{name}{{{labels}}} {float(value):.15g}")
+
+    metric("run_wall_seconds", "Wall time of the whole run.", [(f'run="{run}"', report["wall_s"])])
+    metric("run_peak_rss_megabytes", "Peak RSS of the run's process.",
+           [(f'run="{run}"', report["peak_rss_mb"])])
+    metric("run_started_timestamp_seconds", "Unix time the run started.",
+           [(f'run="{run}"', report["started_unix"])])
+    if "exit_code" in report:
+        metric("run_exit_code", "Exit status of the run (0 = success).",
+               [(f'run="{run}"', report["exit_code"])])
+    fields = [("calls", "stage_calls", "Calls of the stage."),
+              ("wall_s", "stage_wall_seconds", "Wall time spent in the stage."),
+              ("cpu_s", "stage_cpu_seconds", "CPU time of the calling thread in the stage."),
+              ("peak_rss_mb", "stage_peak_rss_megabytes", "Highest peak RSS seen by the stage."),
+              ("rows_in", "stage_rows_in", "Rows into the stage."),
+              ("rows_out", "stage_rows_out", "Rows out of the stage."),
+              ("bytes_down", "stage_downloaded_bytes", "Bytes downloaded."),
+              ("bytes_read", "stage_read_bytes", "Bytes read from disk."),
+              ("retries", "stage_retries", "HTTP retries."),
+              ("sleep_s", "stage_sleep_seconds", "Time slept in rate limiting."),
+              ("cache_hits", "stage_cache_hits", "Calls answered from a cache.")]
+    for key, name, help_ in fields:
+        metric(name, help_, [(f'run="{run}",stage="{_label(stage)}"', stats[key])
+                             for stage, stats in sorted(report["stages"].items())])
+    return "\n".join(lines) + "\n"
+
+
+def _label(value: str) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _atomic_write(path: str, text: str):
+    tmp = f"{path}.tmp{os.getpid()}"
+    with open(tmp, "w") as f:
+        f.write(text)
+    os.replace(tmp, path)
+
+
+# --------------------------------------------------------------------------- #
+# -----------------------------  MODULE SWITCH  ----------------------------- #
+# --------------------------------------------------------------------------- #
+RECORDER: Recorder | None = None
+
+
+def enable(run: str, track_memory: bool = True) -> Recorder:
+    global RECORDER
+    RECORDER = Recorder(run, track_memory)
+    return RECORDER
+
+
+def disable() -> Recorder | None:
+    global RECORDER
+    recorder, RECORDER = RECORDER, None
+    return recorder
+
+
+def stage(name: str, own_peak: bool = False):
+    """Context manager timing one call of stage `name` (no-op when disabled)."""
+    return NULL_SPAN if RECORDER is None else RECORDER.stage(name, own_peak)
+
+
+def count(name: str, **counts):
+    if RECORDER is not None:
+        RECORDER.count(name, **counts)
+
+
+def timed_iter(name: str, iterable):
+    """Yield from `iterable`, timing each step (e.g. reading the next chunk) as
+    a call of stage `name`; items with a length count as rows_out."""
+    if RECORDER is None:
+        yield from iterable
+        return
+    it = iter(iterable)
+    while True:
+        with stage(name) as span:
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            if hasattr(item, "__len__"):
+                span.add(rows_out=len(item))
+        yield item
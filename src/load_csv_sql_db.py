@@ -1,37 +1,432 @@
+import argparse
 import pandas as pd
+import numpy as np
 import sqlite3
+import os
+import io
+import hashlib
+import json
+import time
+import importlib.util
+from concurrent.futures import ProcessPoolExecutor, as_completed
 
-def intial_creation_of_database():
-    columns_to_keep = [
-        'player_id', 'fifa_version', 'fifa_update', 'short_name', 'long_name',
-        'player_positions', 'overall', 'potential', 'value_eur', 'wage_eur',
-        'age', 'dob', 'height_cm', 'weight_kg', 'league_id', 'league_name',
-        'league_level', 'club_team_id', 'club_name', 'club_position',
-        'club_jersey_number', 'club_contract_valid_until_year', 'nationality_name',
-        'nation_jersey_number', 'preferred_foot', 'weak_foot', 'skill_moves',
-        'international_reputation', 'work_rate', 'body_type', 'release_clause_eur',
-        'pace', 'shooting', 'passing', 'dribbling', 'defending', 'physic',
-        'attacking_crossing', 'attacking_finishing'
-    ]
+import instrumentation
+from paths import FIFA_DB, PLAYERS_CSV
 
-    # Creates Database and connects us to it
-    conn = sqlite3.connect("../data/fifa_players.db")
+COLUMNS_TO_KEEP = [
+    'player_id', 'fifa_version', 'fifa_update', 'short_name', 'long_name',
+    'player_positions', 'overall', 'potential', 'value_eur', 'wage_eur',
+    'age', 'dob', 'height_cm', 'weight_kg', 'league_id', 'league_name',
+    'league_level', 'club_team_id', 'club_name', 'club_position',
+    'club_jersey_number', 'club_contract_valid_until_year', 'nationality_name',
+    'nation_jersey_number', 'preferred_foot', 'weak_foot', 'skill_moves',
+    'international_reputation', 'work_rate', 'body_type', 'release_clause_eur',
+    'pace', 'shooting', 'passing', 'dribbling', 'defending', 'physic',
+    'attacking_crossing', 'attacking_finishing'
+]
 
+# Explicit dtypes so chunks don't each re-infer; columns that can be missing
+# (free agents, goalkeepers' outfield stats, …) are floats.
+DTYPES = {
+    'player_id': 'int32', 'fifa_version': 'int8', 'fifa_update': 'int8',
+    'short_name': 'str', 'long_name': 'str', 'player_positions': 'str',
+    'overall': 'int8', 'potential': 'int8',
+    'value_eur': 'float64', 'wage_eur': 'float64',
+    'age': 'int8', 'dob': 'str', 'height_cm': 'int16', 'weight_kg': 'int16',
+    'league_id': 'float32', 'league_name': 'str', 'league_level': 'float32',
+    'club_team_id': 'float32', 'club_name': 'str', 'club_position': 'str',
+    'club_jersey_number': 'float32', 'club_contract_valid_until_year': 'float32',
+    'nationality_name': 'str', 'nation_jersey_number': 'float32',
+    'preferred_foot': 'str', 'weak_foot': 'int8', 'skill_moves': 'int8',
+    'international_reputation': 'int8', 'work_rate': 'str', 'body_type': 'str',
+    'release_clause_eur': 'float64',
+    'pace': 'float32', 'shooting': 'float32', 'passing': 'float32',
+    'dribbling': 'float32', 'defending': 'float32', 'physic': 'float32',
+    'attacking_crossing': 'int8', 'attacking_finishing': 'int8',
+}
 
-    # Chunksize declaration to help parse the csv
-    chunksize = 100000
+CSV_ENGINE = "pyarrow" if importlib.util.find_spec("pyarrow") else "c"
+CHUNK_BYTES = 64 * 2**20
+HASH_BLOCK = 8 * 2**20
 
+# Incremental ingest state: which (fifa_version, fifa_update) slices each
+# table holds, and the size / hash of the CSV they came from.
+WATERMARK_TABLE = "ingest_watermark"
+SOURCE_STATE_TABLE = "ingest_sources"
+ROW_KEY = ['player_id', 'fifa_version', 'fifa_update']
+JOIN_TABLE = "player_name_join"           # name_matching's materialized join
 
-    # Parse the CSV with the columns above
-    for chunk in pd.read_csv("../../male_players.csv", chunksize=chunksize, usecols=columns_to_keep):
-        # Filters the dataframe to only PL players
-        filter = chunk[(chunk['league_id'] == 13) & (chunk['fifa_update'] == 1)]
 
-        # Creates the table filled with prem players
-        filter.to_sql("test", conn, if_exists='append', index=False)
+# --------------------------------------------------------------------------- #
+# ---------------------------  PARALLEL CSV READ  --------------------------- #
+# --------------------------------------------------------------------------- #
+def byte_ranges(csv_path: str, chunk_bytes: int = CHUNK_BYTES, start: int | None = None):
+    """Split the file body into ~chunk_bytes ranges that end on a newline.
 
+    Returns (header_bytes, [(start, end), ...]).  `start` (a line start)
+    skips the body before it.  Assumes no quoted field contains a newline,
+    which holds for the FIFA player exports.
+    """
+    size = os.path.getsize(csv_path)
+    with open(csv_path, "rb") as f:
+        header = f.readline()
+        bounds = [max(start, f.tell()) if start is not None else f.tell()]
+        while bounds[-1] + chunk_bytes < size:
+            f.seek(bounds[-1] + chunk_bytes)
+            f.readline()
+            bounds.append(f.tell())
+    if bounds[-1] < size:
+        bounds.append(size)
+    return header, list(zip(bounds, bounds[1:]))
+
+
+def partition_codes(versions, updates) -> np.ndarray:
+    """(fifa_version, fifa_update) pairs packed into one int64 each."""
+    return np.asarray(versions, dtype=np.int64) * 1000 + np.asarray(updates, dtype=np.int64)
+
+
+def apply_filters(df: pd.DataFrame, league_ids=None, fifa_updates=None,
+                  fifa_versions=None, club_team_ids=None, skip_partitions=None) -> pd.DataFrame:
+    """Keep rows matching every filter that is given (None = no filter).
+
+    `skip_partitions` drops rows of the listed (fifa_version, fifa_update) pairs.
+    """
+    mask = np.ones(len(df), dtype=bool)
+    for col, values in (('league_id', league_ids), ('fifa_update', fifa_updates),
+                        ('fifa_version', fifa_versions), ('club_team_id', club_team_ids)):
+        if values is not None:
+            mask &= df[col].isin(list(values)).to_numpy()
+    if skip_partitions:
+        skip = partition_codes(*zip(*skip_partitions))
+        mask &= ~np.isin(partition_codes(df['fifa_version'], df['fifa_update']), skip)
+    return df[mask]
+
+
+def read_range(csv_path: str, header: bytes, start: int, end: int,
+               filters: dict, engine: str = CSV_ENGINE) -> pd.DataFrame:
+    """Parse one byte range of the CSV and filter it before returning."""
+    with open(csv_path, "rb") as f:
+        f.seek(start)
+        data = f.read(end - start)
+    chunk = pd.read_csv(io.BytesIO(header + data), usecols=COLUMNS_TO_KEEP,
+                        dtype=DTYPES, engine=engine)
+    return apply_filters(chunk, **filters)[COLUMNS_TO_KEEP]
+
+
+def _init_parser(threads: int):
+    """Pool initializer: size pyarrow's CSV thread pool to this process's share of the cores."""
+    if CSV_ENGINE == "pyarrow":
+        import pyarrow
+        pyarrow.set_cpu_count(threads)
+
+
+def iter_filtered_chunks(csv_path: str, workers: int | None = None,
+                         chunk_bytes: int = CHUNK_BYTES, start: int | None = None, **filters):
+    """Yield filtered frames for each byte range, as soon as each is parsed.
+
+    Ranges are handed to a process pool (`workers` processes, default one
+    per core, each letting pyarrow use cores // workers threads);
+    `workers=1` parses them in‑process.  `start` parses only the
+    body from that byte offset on.
+    """
+    header, ranges = byte_ranges(csv_path, chunk_bytes, start)
+    workers = workers or os.cpu_count()
+    if workers == 1:
+        for start, end in ranges:
+            yield read_range(csv_path, header, start, end, filters)
+        return
+
+    threads = max(1, (os.cpu_count() or 1) // workers)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_parser,
+                             initargs=(threads,)) as pool:
+        futures = [pool.submit(read_range, csv_path, header, start, end, filters)
+                   for start, end in ranges]
+        for fut in as_completed(futures):
+            yield fut.result()
+
+
+def extract_players(csv_path: str, workers: int | None = None, **filters) -> pd.DataFrame:
+    """Filtered player rows as one frame, e.g. league_ids=[14], fifa_updates=[2]."""
+    frames = list(iter_filtered_chunks(csv_path, workers, **filters))
+    return pd.concat(frames, ignore_index=True) if frames else \
+        pd.DataFrame({c: pd.Series(dtype=t) for c, t in DTYPES.items()})
+
+
+# --------------------------------------------------------------------------- #
+# ------------------------------  SQLITE LOAD  ------------------------------ #
+# --------------------------------------------------------------------------- #
+def sqlite_type(dtype: str) -> str:
+    return {'i': 'INTEGER', 'f': 'REAL'}.get(np.dtype(dtype).kind, 'TEXT')
+
+
+def frame_records(df: pd.DataFrame) -> list[tuple]:
+    """Rows as native Python tuples (NumPy `tolist`, NaN → None)."""
+    cols = []
+    for col in df.columns:
+        vals = df[col].to_numpy()
+        if vals.dtype.kind == 'f':
+            missing = np.isnan(vals)
+            vals = vals.tolist()
+            for i in np.flatnonzero(missing).tolist():
+                vals[i] = None
+        else:
+            vals = [None if v is None or v != v else v for v in vals.tolist()] \
+                if vals.dtype.kind == 'O' else vals.tolist()
+        cols.append(vals)
+    return list(zip(*cols))
+
+
+def create_players_table(conn: sqlite3.Connection, table: str):
+    cols = ",\n    ".join(f"{c} {sqlite_type(DTYPES[c])}" for c in COLUMNS_TO_KEEP)
+    conn.execute(f"CREATE TABLE IF NOT EXISTS {table} (\n    {cols}\n)")
+
+
+def insert_sql(table: str, upsert: bool = False) -> str:
+    """Row INSERT for `table`; with `upsert`, a row whose ROW_KEY exists is overwritten."""
+    sql = (f"INSERT INTO {table} ({', '.join(COLUMNS_TO_KEEP)}) "
+           f"VALUES ({', '.join('?' * len(COLUMNS_TO_KEEP))})")
+    if upsert:
+        sql += (f" ON CONFLICT ({', '.join(ROW_KEY)}) DO UPDATE SET "
+                + ", ".join(f"{c} = excluded.{c}" for c in COLUMNS_TO_KEEP if c not in ROW_KEY))
+    return sql
+
+
+def insert_chunks(conn: sqlite3.Connection, sql: str, chunks) -> dict:
+    """`executemany` every parsed chunk; returns rows per (fifa_version, fifa_update)."""
+    counts = {}
+    # parse waits vs inserts show whether the pool or SQLite is the bottleneck
+    for chunk in instrumentation.timed_iter("ingest.parse", chunks):
+        with instrumentation.stage("ingest.insert") as span:
+            conn.executemany(sql, frame_records(chunk))
+            span.add(rows_in=len(chunk))
+        codes, n = np.unique(partition_codes(chunk['fifa_version'], chunk['fifa_update']),
+                             return_counts=True)
+        for code, k in zip(codes.tolist(), n.tolist()):
+            counts[divmod(code, 1000)] = counts.get(divmod(code, 1000), 0) + k
+    return counts
+
+
+def ingest_csv(csv_path: str, db_path: str, table: str = "test",
+               workers: int | None = None, chunk_bytes: int = CHUNK_BYTES,
+               **filters) -> int:
+    """Parallel filtered load of male_players.csv into `table`.
+
+    Parsed ranges are inserted with `executemany` as they arrive, all inside
+    one transaction.  Rows are appended, or upserted once `incremental_ingest`
+    has given the table its ROW_KEY.  Returns the number of rows written.
+    """
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    create_players_table(conn, table)
+
+    with conn:
+        instrumentation.count("ingest.parse", bytes_read=os.path.getsize(csv_path))
+        chunks = iter_filtered_chunks(csv_path, workers, chunk_bytes, **filters)
+        sql = insert_sql(table, upsert=has_row_key(conn, table))
+        n = sum(insert_chunks(conn, sql, chunks).values())
     conn.close()
+    return n
+
+
+def intial_creation_of_database(csv_path: str = PLAYERS_CSV,
+                                db_path: str = FIFA_DB,
+                                table: str = "test", workers: int | None = None,
+                                league_ids=(13,), fifa_updates=(1,), **filters):
+    """Load PL (league 13), first‑update rows by default; any filter can be changed."""
+    return ingest_csv(csv_path, db_path, table, workers,
+                      league_ids=league_ids, fifa_updates=fifa_updates, **filters)
+
+
+# --------------------------------------------------------------------------- #
+# ---------------------------  INCREMENTAL INGEST  -------------------------- #
+# --------------------------------------------------------------------------- #
+def ensure_watermark(conn: sqlite3.Connection):
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS {WATERMARK_TABLE} (
+    table_name TEXT, fifa_version INTEGER, fifa_update INTEGER, source_rows INTEGER, loaded_at REAL,
+    PRIMARY KEY (table_name, fifa_version, fifa_update)
+)""")
+    conn.execute(f"""CREATE TABLE IF NOT EXISTS {SOURCE_STATE_TABLE} (
+    table_name TEXT PRIMARY KEY, csv_path TEXT, size INTEGER, mtime_ns INTEGER, sha256 TEXT,
+    filters TEXT, loaded_at REAL
+)""")
+
+
+def has_row_key(conn: sqlite3.Connection, table: str) -> bool:
+    return conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = ?",
+                        (f"idx_{table}_row_key",)).fetchone() is not None
+
+
+def ensure_row_key(conn: sqlite3.Connection, table: str) -> int:
+    """Unique ROW_KEY index on `table`, the conflict target of the upserts.
+
+    Duplicates left by earlier plain appends are dropped first (the last
+    inserted copy wins).  Returns how many rows were dropped.
+    """
+    if has_row_key(conn, table):
+        return 0
+    name = f"idx_{table}_row_key"
+    key = ", ".join(ROW_KEY)
+    dropped = conn.execute(f"DELETE FROM {table} WHERE rowid NOT IN "
+                           f"(SELECT MAX(rowid) FROM {table} GROUP BY {key})").rowcount
+    conn.execute(f"CREATE UNIQUE INDEX {name} ON {table} ({key})")
+    return dropped
+
+
+def file_digests(path: str, prefix: int | None = None) -> tuple[str | None, str]:
+    """sha256 of the first `prefix` bytes (None without one) and of the whole file, in one read."""
+    h, done = hashlib.sha256(), 0
+    head = h.hexdigest() if prefix == 0 else None
+    with open(path, "rb") as f:
+        while True:
+            want = HASH_BLOCK if prefix is None or done >= prefix else min(HASH_BLOCK, prefix - done)
+            block = f.read(want)
+            if not block:
+                break
+            h.update(block)
+            done += len(block)
+            if done == prefix:
+                head = h.hexdigest()
+    return head, h.hexdigest()
+
+
+def _ends_line(path: str, offset: int) -> bool:
+    with open(path, "rb") as f:
+        f.seek(offset - 1)
+        return f.read(1) == b"\n"
+
+
+def loaded_partitions(conn: sqlite3.Connection, table: str) -> dict:
+    """(fifa_version, fifa_update) → source rows loaded into `table`."""
+    return {(v, u): n for v, u, n in conn.execute(
+        f"SELECT fifa_version, fifa_update, source_rows FROM {WATERMARK_TABLE} WHERE table_name = ?",
+        (table,))}
+
+
+def incremental_ingest(csv_path: str = PLAYERS_CSV, db_path: str = FIFA_DB, table: str = "test",
+                       workers: int | None = None, chunk_bytes: int = CHUNK_BYTES, reload=(),
+                       refresh: bool = True, **filters) -> dict:
+    """Load only what `table` does not hold yet; reruns are no-ops.
+
+    Against the watermark of the previous run (same table and filters):
+      * same size and mtime, or same hash: nothing is parsed;
+      * the old bytes still hash to the stored digest (a release appended
+        to the export): only the appended bytes are parsed;
+      * otherwise the whole file is parsed, skipping the (version, update)
+        slices already loaded, except the `reload` ones.
+    Changed filters (or no watermark yet) load everything.  Rows are upserted
+    on ROW_KEY, and rows, watermark and file state commit in one transaction,
+    so an interrupted run is simply repeated.  With `refresh`, the tables
+    built from `table` are brought up to date (`refresh_downstream`).
+
+    Returns {'mode', 'partitions', 'rows', 'downstream', 'seconds'}.
+    """
+    t0 = time.perf_counter()
+    st = os.stat(csv_path)
+    spec = json.dumps({k: sorted(v) for k, v in filters.items() if v is not None}, sort_keys=True)
+    reload = {tuple(p) for p in reload}
+
+    conn = sqlite3.connect(db_path)
+    conn.execute("PRAGMA journal_mode = WAL")
+    conn.execute("PRAGMA synchronous = NORMAL")
+    with conn:
+        create_players_table(conn, table)
+        ensure_watermark(conn)
+        ensure_row_key(conn, table)
+    state = conn.execute(f"SELECT size, mtime_ns, sha256, filters FROM {SOURCE_STATE_TABLE} "
+                         "WHERE table_name = ?", (table,)).fetchone()
+    loaded = loaded_partitions(conn, table)
+    same = state is not None and state[3] == spec
+
+    mode, start, skip = "scan", None, []
+    if same and not reload and (st.st_size, st.st_mtime_ns) == tuple(state[:2]):
+        mode = "unchanged"
+    else:
+        prefix = state[0] if same and not reload and st.st_size >= state[0] else None
+        head, digest = file_digests(csv_path, prefix)
+        if prefix is not None and head == state[2] and _ends_line(csv_path, prefix):
+            mode, start = ("unchanged" if prefix == st.st_size else "appended"), prefix
+        elif same:
+            skip = sorted(p for p in loaded if p not in reload)
+
+    counts = {}
+    if mode != "unchanged" or (st.st_size, st.st_mtime_ns) != tuple(state[:2]):
+        with conn:
+            if mode != "unchanged":
+                instrumentation.count("ingest.parse", bytes_read=st.st_size - (start or 0))
+                chunks = iter_filtered_chunks(csv_path, workers, chunk_bytes, start,
+                                              skip_partitions=skip or None, **filters)
+                counts = insert_chunks(conn, insert_sql(table, upsert=True), chunks)
+            now = time.time()
+            conn.executemany(f"INSERT OR REPLACE INTO {WATERMARK_TABLE} VALUES (?, ?, ?, ?, ?)",
+                             [(table, v, u, n + (loaded.get((v, u), 0) if mode == "appended" else 0), now)
+                              for (v, u), n in counts.items()])
+            conn.execute(f"INSERT OR REPLACE INTO {SOURCE_STATE_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?)",
+                         (table, os.path.abspath(csv_path), st.st_size, st.st_mtime_ns, digest, spec, now))
+    conn.close()
+
+    partitions = sorted(counts)
+    downstream = refresh_downstream(db_path, table, partitions) if refresh and partitions else {}
+    return {'mode': mode, 'partitions': partitions, 'rows': sum(counts.values()),
+            'downstream': downstream, 'seconds': time.perf_counter() - t0}
+
+
+def refresh_downstream(db_path: str, table: str, partitions, join_table: str = JOIN_TABLE) -> dict:
+    """Update the tables built from `table` for the given (version, update) pairs.
+
+    Only tables that already exist are touched: the club-season aggregates
+    (those partitions) and the name-matching join (their fifa_versions, as
+    matching runs per season, with the filter it was built with).  Returns
+    rows written per table.
+    """
+    import club_aggregates                # imports this module
+    import name_matching
+    conn = sqlite3.connect(db_path)
+    tables = {name for name, in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")}
+    spec = name_matching.join_spec(conn, join_table)
+    conn.close()
+    done = {}
+    if club_aggregates.AGG_TABLE in tables:
+        with club_aggregates.ClubAggregates(db_path, table) as agg:
+            done[club_aggregates.AGG_TABLE] = agg.refresh(partitions=partitions)['rows']
+    if spec is None:                      # built before its arguments were recorded
+        spec = {'fifa_table': "test", 'goals_table': "goals_plus", 'assists_table': "assists_plus"}
+    if join_table in tables and spec['fifa_table'] == table \
+            and {spec['goals_table'], spec['assists_table']} <= tables:
+        done[join_table] = name_matching.refresh_join(db_path, sorted({v for v, _ in partitions}),
+                                                      join_table)
+    return done
 
 
 if __name__ == "__main__":
-    intial_creation_of_database()
\ No newline at end of file
+    parser = argparse.ArgumentParser(description="male_players.csv → SQLite (filtered)")
+    parser.add_argument("csv", nargs="?", default=PLAYERS_CSV)
+    parser.add_argument("db", nargs="?", default=FIFA_DB)
+    parser.add_argument("--table", default="test")
+    parser.add_argument("--workers", type=int, default=None, help="parser processes (default: one per core)")
+    parser.add_argument("--league", nargs="+", type=int, default=[13], help="league_id filter")
+    parser.add_argument("--update", nargs="+", type=int, default=[1], help="fifa_update filter")
+    parser.add_argument("--all", action="store_true", help="no league / update filter")
+    parser.add_argument("--incremental", action="store_true",
+                        help="load only slices missing from the watermark (upsert, idempotent)")
+    parser.add_argument("--reload", nargs=2, type=int, action="append", default=[],
+                        metavar=("VERSION", "UPDATE"), help="with --incremental: load this slice again")
+    parser.add_argument("--no-refresh", action="store_true",
+                        help="with --incremental: leave aggregates / join tables alone")
+    args = parser.parse_args()
+
+    if args.incremental:
+        result = incremental_ingest(args.csv, args.db, args.table, args.workers, reload=args.reload,
+                                    refresh=not args.no_refresh,
+                                    league_ids=None if args.all else args.league,
+                                    fifa_updates=None if args.all else args.update)
+        slices = ", ".join(f"{v}/{u}" for v, u in result['partitions']) or "none"
+        print(f"✅ {result['mode']}: {result['rows']:,} rows upserted → {args.db}:{args.table} "
+              f"(slices {slices}) in {result['seconds']:.1f} s")
+        for name, rows in result['downstream'].items():
+            print(f"   refreshed {name}: {rows:,} rows")
+    else:
+        n = intial_creation_of_database(args.csv, args.db, args.table, args.workers,
+                                        league_ids=None if args.all else args.league,
+                                        fifa_updates=None if args.all else args.update)
+        print(f"✅ {n:,} rows → {args.db}:{args.table}")
@@ -0,0 +1,106 @@
+import argparse
+import json
+import random
+import sqlite3
+import threading
+import time
+
+import numpy as np
+import requests
+
+from paths import FIFA_DB
+
+# prediction_service.DEFAULT_PORT; not imported, as that module pulls in torch
+# and the load generator should run on a bare client box.
+DEFAULT_PORT = 8765
+
+
+def load_records(db: str | None, n: int, seed: int = 0) -> list[dict]:
+    """Up to `n` matched prem_name_join rows, or synthetic ones when `db` is None."""
+    import pandas as pd
+    if db:
+        conn = sqlite3.connect(db)
+        df = pd.read_sql_query("SELECT * FROM prem_name_join WHERE fifa_update IS NOT NULL "
+                               "ORDER BY RANDOM() LIMIT ?", conn, params=(n,))
+        conn.close()
+    else:
+        from benchmarks.synthetic import synthetic_join_frame
+        df = synthetic_join_frame(n, seed)
+    df = df.astype(object).where(df.notna(), None)      # JSON-safe: NaN → null
+    return df.to_dict('records')
+
+
+def run_load(url: str, records: list[dict], clients: int = 16, requests_per_client: int = 200,
+             rows_per_request: int = 1, repeat_share: float = 0.2, seed: int = 0) -> dict:
+    """`clients` threads each POST `requests_per_client` requests as fast as they can.
+
+    `repeat_share` of requests resend a row already sent, to exercise the cache.
+    Failed connections count as errors (latencies cover answered requests only).
+    """
+    latencies, errors = [], 0
+    lock = threading.Lock()
+
+    def client(i: int):
+        nonlocal errors
+        rng = random.Random(seed * 1000 + i)
+        session = requests.Session()
+        sent, mine = [], []
+        for _ in range(requests_per_client):
+            if sent and rng.random() < repeat_share:
+                rows = rng.choice(sent)
+            else:
+                rows = rng.sample(records, rows_per_request)
+                sent.append(rows)
+            t0 = time.perf_counter()
+            try:
+                resp = session.post(f"{url}/predict", data=json.dumps({"rows": rows}),
+                                    headers={"Content-Type": "application/json"})
+            except requests.RequestException:
+                resp = None
+            else:
+                mine.append(time.perf_counter() - t0)
+            if resp is None or resp.status_code != 200:
+                with lock:
+                    errors += 1
+        with lock:
+            latencies.extend(mine)
+
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(clients)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    lat = np.array(latencies) * 1000
+    try:
+        server = requests.get(f"{url}/stats").json()
+    except (requests.RequestException, ValueError):
+        server = None
+    return {'requests': len(lat), 'errors': errors, 'seconds': elapsed,
+            'requests_per_s': len(lat) / elapsed,
+            'rows_per_s': len(lat) * rows_per_request / elapsed,
+            'p50_ms': float(np.percentile(lat, 50)) if len(lat) else float('nan'),
+            'p99_ms': float(np.percentile(lat, 99)) if len(lat) else float('nan'),
+            'server': server}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="load test a running prediction_service")
+    parser.add_argument("--url", default=f"http://127.0.0.1:{DEFAULT_PORT}")
+    parser.add_argument("--db", default=FIFA_DB,
+                        help="sample prem_name_join rows from here ('' = synthetic rows)")
+    parser.add_argument("--records", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=16)
+    parser.add_argument("--requests", type=int, default=200, help="per client")
+    parser.add_argument("--rows", type=int, default=1, help="rows per request")
+    parser.add_argument("--repeat-share", type=float, default=0.2)
+    args = parser.parse_args()
+
+    result = run_load(args.url, load_records(args.db or None, args.records), args.clients,
+                      args.requests, args.rows, args.repeat_share)
+    print(f"{result['requests']:,} requests ({result['errors']} errors) in {result['seconds']:.1f} s: "
+          f"{result['requests_per_s']:,.0f} req/s, p50 {result['p50_ms']:.2f} ms, "
+          f"p99 {result['p99_ms']:.2f} ms")
+    print("server:", json.dumps(result['server'], indent=2))
@@ -0,0 +1,348 @@
+import argparse
+import sqlite3
+import time
+import numpy as np
+import pandas as pd
+
+from paths import FIFA_DB
+
+# A TM row is matched when this share of its name tokens appear in the FIFA
+# long/short name, and the runner‑up scores clearly lower.
+MIN_SCORE = 0.5
+AMBIGUITY_MARGIN = 0.05
+AGE_TOLERANCE = 1            # FIFA ages are taken at release, TM ages per season
+JOIN_BUILDS_TABLE = "name_join_builds"
+
+
+# --------------------------------------------------------------------------- #
+# ---------------------------  NAME NORMALISATION  -------------------------- #
+# --------------------------------------------------------------------------- #
+def name_tokens(names: pd.Series) -> pd.Series:
+    """Lower‑case ASCII tokens with accents and punctuation stripped."""
+    return (names.fillna("").astype(str)
+            .str.normalize("NFKD")
+            .str.encode("ascii", "ignore").str.decode("ascii")
+            .str.lower()
+            .str.replace(r"[^a-z0-9 ]+", " ", regex=True)
+            .str.split())
+
+
+def name_key(tokens: pd.Series) -> pd.Series:
+    """Order‑independent key: "Heung-min Son" and "Son Heung-min" agree."""
+    return tokens.map(sorted).str.join(" ")
+
+
+def encode_tokens(tm_tokens: pd.Series, fifa_token_lists: list[pd.Series]) -> dict:
+    """Integer‑code every token once.
+
+    TM names become a CSR layout (offsets into one id array, per tm_idx);
+    FIFA names become a sorted array of f_idx * vocab + token_id codes, so
+    "is this token in that FIFA name" is a binary search.
+    """
+    tm_exp = tm_tokens.explode()
+    fifa_exp = [t.explode() for t in fifa_token_lists]
+    codes, vocab = pd.factorize(pd.concat([tm_exp, *fifa_exp]), use_na_sentinel=True)
+    v = len(vocab) + 1
+
+    tm_codes = codes[:len(tm_exp)]
+    keep = tm_codes >= 0
+    tm_ids = tm_codes[keep]
+    counts = np.bincount(tm_exp.index.to_numpy()[keep], minlength=len(tm_tokens))
+    offsets = np.concatenate([[0], np.cumsum(counts)])
+
+    fifa_codes, start = [], len(tm_exp)
+    for exp in fifa_exp:
+        c = codes[start:start + len(exp)]
+        ok = c >= 0
+        fifa_codes.append(exp.index.to_numpy()[ok].astype(np.int64) * v + c[ok])
+        start += len(exp)
+    return {"v": v, "tm_ids": tm_ids, "tm_offsets": offsets, "tm_counts": counts,
+            "fifa_codes": np.unique(np.concatenate(fifa_codes))}
+
+
+def nation_key(nations: pd.Series) -> pd.Series:
+    return name_key(name_tokens(nations))
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------  LOADING  -------------------------------- #
+# --------------------------------------------------------------------------- #
+def load_transfermarkt(conn: sqlite3.Connection, goals_table: str = "goals_plus",
+                       assists_table: str = "assists_plus") -> pd.DataFrame:
+    """One row per (name, season) with goals, assists, nationality and age."""
+    goals = pd.read_sql_query(f"SELECT name, season, value AS goals, nationality, age FROM {goals_table}", conn)
+    assists = pd.read_sql_query(f"SELECT name, season, value AS assists, nationality, age FROM {assists_table}", conn)
+    tm = goals.merge(assists, on=['name', 'season'], how='outer', suffixes=('', '_a'))
+    tm['nationality'] = tm['nationality'].fillna(tm.pop('nationality_a'))
+    tm['age'] = tm['age'].fillna(tm.pop('age_a'))
+    tm[['goals', 'assists']] = tm[['goals', 'assists']].fillna(0).astype(int)
+    return tm.reset_index(drop=True)
+
+
+def load_fifa(conn: sqlite3.Connection, table: str = "test", where: str = "") -> pd.DataFrame:
+    return pd.read_sql_query(f"SELECT * FROM {table} {where}", conn).reset_index(drop=True)
+
+
+# --------------------------------------------------------------------------- #
+# ---------------------------  BLOCKING + SCORING  -------------------------- #
+# --------------------------------------------------------------------------- #
+def candidate_pairs(tm: pd.DataFrame, fifa: pd.DataFrame, keys: list[str],
+                    by_age: bool = False) -> pd.DataFrame:
+    """(tm_idx, f_idx) pairs sharing the blocking keys and a compatible age.
+
+    With `by_age` the age itself is part of the block (TM rows are repeated
+    for age ± AGE_TOLERANCE), so wide blocks like a whole season stay small.
+    """
+    left = tm[['tm_idx', 'age'] + keys]
+    right = fifa[['f_idx', 'age'] + keys]
+    if by_age:
+        left = pd.concat([left.assign(age_block=left['age'] + d)
+                          for d in range(-AGE_TOLERANCE, AGE_TOLERANCE + 1)])
+        right = right.assign(age_block=right['age'].astype(float))
+        keys = keys + ['age_block']
+    pairs = left.merge(right, on=keys, suffixes=('_tm', '_f'))
+    age_ok = ((pairs['age_tm'] - pairs['age_f']).abs() <= AGE_TOLERANCE) | pairs['age_tm'].isna()
+    return pairs.loc[age_ok, ['tm_idx', 'f_idx', 'age_tm', 'age_f']].drop_duplicates(['tm_idx', 'f_idx'])
+
+
+def score_pairs(pairs: pd.DataFrame, tm: pd.DataFrame, fifa: pd.DataFrame,
+                tokens: dict) -> pd.DataFrame:
+    """Share of TM name tokens found in the FIFA names, plus small tie‑breakers.
+
+    Pairs are expanded by their TM tokens with NumPy repeat/offset arithmetic
+    and every (f_idx, token) probe is a vectorised binary search.
+    """
+    tm_idx = pairs['tm_idx'].to_numpy(np.int64)
+    f_idx = pairs['f_idx'].to_numpy(np.int64)
+    counts = tokens["tm_counts"][tm_idx]
+    pair_rep = np.repeat(np.arange(len(pairs)), counts)
+    within = np.arange(len(pair_rep)) - np.repeat(np.cumsum(counts) - counts, counts)
+    tok = tokens["tm_ids"][tokens["tm_offsets"][tm_idx][pair_rep] + within]
+    probe = f_idx[pair_rep] * tokens["v"] + tok
+    pos = np.searchsorted(tokens["fifa_codes"], probe)
+    found = tokens["fifa_codes"][np.minimum(pos, len(tokens["fifa_codes"]) - 1)] == probe
+    hits = np.bincount(pair_rep[found], minlength=len(pairs))
+
+    scored = pairs.copy()
+    scored['score'] = hits / np.maximum(counts, 1)
+    # rows of one player in one season (e.g. several fifa_updates) are one candidate
+    scored['player'] = fifa['player_id'].to_numpy()[f_idx] if 'player_id' in fifa else f_idx
+
+    tm_key = tm['key'].to_numpy()[tm_idx]
+    exact = (tm_key == fifa['long_key'].to_numpy()[f_idx]) | \
+            (tm_key == fifa['short_key'].to_numpy()[f_idx])
+    scored['score'] += 0.1 * exact + 0.05 * (scored['age_tm'] == scored['age_f'])
+    return scored
+
+
+def pick_best(scored: pd.DataFrame) -> tuple[pd.DataFrame, pd.DataFrame]:
+    """Best candidate per TM row; returns (matches, ambiguous).
+
+    Candidates are collapsed per FIFA player first (its best-scoring row,
+    the earliest on ties), so a player's fifa_update rows never count as
+    each other's runner-up.
+    """
+    ranked = scored.sort_values(['tm_idx', 'score', 'f_idx'], ascending=[True, False, True])
+    ranked = ranked.drop_duplicates(['tm_idx', 'player'])
+    rank = ranked.groupby('tm_idx').cumcount().to_numpy()
+    best = ranked[rank == 0].set_index('tm_idx')
+    best['runner_up'] = ranked[rank == 1].set_index('tm_idx')['score'].reindex(best.index)
+
+    clear = (best['score'] >= MIN_SCORE) & ~(best['runner_up'] >= best['score'] - AMBIGUITY_MARGIN)
+    # one FIFA player can only take one TM row: keep the strongest claim
+    winners = best[clear].sort_values('score', ascending=False)
+    dup = winners.duplicated('player')
+    matches = winners[~dup]
+    ambiguous = pd.concat([
+        best[~clear & (best['score'] >= MIN_SCORE)].assign(reason='close runner-up'),
+        winners[dup].assign(reason='FIFA row already taken'),
+    ])
+    return matches.reset_index(), ambiguous.reset_index()
+
+
+# --------------------------------------------------------------------------- #
+# -------------------------------  THE JOIN  -------------------------------- #
+# --------------------------------------------------------------------------- #
+def match_players(fifa: pd.DataFrame, tm: pd.DataFrame):
+    """Resolve TM rows to FIFA rows.
+
+    Pass 1 blocks on (season, nationality); pass 2 retries the leftovers on
+    (season, age) to survive nationality spelling differences.  Returns
+    (matches, report) where matches has tm_idx, f_idx, score, match_pass.
+    """
+    fifa = fifa.reset_index(drop=True)
+    tm = tm.reset_index(drop=True)
+    fifa['f_idx'] = np.arange(len(fifa))
+    tm['tm_idx'] = np.arange(len(tm))
+
+    long_tok, short_tok = name_tokens(fifa['long_name']), name_tokens(fifa['short_name'])
+    fifa['long_key'], fifa['short_key'] = name_key(long_tok), name_key(short_tok)
+    fifa['season'] = fifa['fifa_version']
+    fifa['nation'] = nation_key(fifa['nationality_name'])
+
+    tm_tokens = name_tokens(tm['name'])
+    tm['key'] = name_key(tm_tokens)
+    tokens = encode_tokens(tm_tokens, [long_tok, short_tok])
+    # dual nationals ("England/Jamaica") block under every listed nation
+    tm_nat = tm[['tm_idx', 'season', 'age', 'nationality']].assign(
+        nation=tm['nationality'].fillna("").str.split("/")).explode('nation')
+    tm_nat['nation'] = nation_key(tm_nat['nation'])
+
+    # every block lies inside one season, so seasons are matched one at a
+    # time to keep the candidate‑pair frames bounded
+    matched, ambiguous = [], []
+    fifa_by_season = dict(tuple(fifa.groupby('season')))
+    for season, tm_s in tm.groupby('season'):
+        fifa_s = fifa_by_season.get(season)
+        if fifa_s is None:
+            continue
+        season_matches = pd.DataFrame(columns=['tm_idx', 'f_idx', 'player'])
+        for pass_no in (1, 2):
+            if pass_no == 1:
+                pairs = candidate_pairs(tm_nat[tm_nat['season'] == season], fifa_s,
+                                        ['season', 'nation'])
+            else:
+                todo = tm_s[~tm_s['tm_idx'].isin(season_matches['tm_idx']) & tm_s['age'].notna()]
+                pairs = candidate_pairs(todo, fifa_s, ['season'], by_age=True)
+                taken = fifa_s['player_id'].isin(season_matches['player']) if 'player_id' in fifa_s \
+                    else fifa_s['f_idx'].isin(season_matches['player'])
+                pairs = pairs[~pairs['f_idx'].isin(fifa_s.loc[taken, 'f_idx'])]
+            if pairs.empty:
+                continue
+            m, a = pick_best(score_pairs(pairs, tm, fifa, tokens))
+            season_matches = pd.concat([season_matches, m])
+            matched.append(m.assign(match_pass=pass_no))
+            ambiguous.append(a.assign(match_pass=pass_no))
+
+    matches = pd.concat(matched, ignore_index=True) if matched else \
+        pd.DataFrame(columns=['tm_idx', 'f_idx', 'score', 'match_pass'])
+    ambiguous = pd.concat(ambiguous, ignore_index=True) if ambiguous else pd.DataFrame()
+    report = build_report(tm, fifa, matches, ambiguous)
+    return matches[['tm_idx', 'f_idx', 'score', 'match_pass']], report
+
+
+def build_report(tm, fifa, matches, ambiguous) -> pd.DataFrame:
+    """Ambiguous and unmatched TM rows with their best FIFA candidate."""
+    unresolved = ambiguous[~ambiguous['tm_idx'].isin(matches['tm_idx'])] \
+        .drop_duplicates('tm_idx', keep='last') if len(ambiguous) else ambiguous
+    rows = []
+    if len(unresolved):
+        rows.append(pd.DataFrame({
+            'tm_idx': unresolved['tm_idx'].to_numpy(),
+            'candidate': fifa['long_name'].to_numpy()[unresolved['f_idx'].to_numpy(int)],
+            'score': unresolved['score'].to_numpy(),
+            'runner_up': unresolved['runner_up'].to_numpy(),
+            'reason': unresolved['reason'].to_numpy(),
+        }))
+    done = set(matches['tm_idx']).union(unresolved['tm_idx'] if len(unresolved) else [])
+    missing = tm.loc[~tm['tm_idx'].isin(done), 'tm_idx']
+    rows.append(pd.DataFrame({'tm_idx': missing.to_numpy(), 'reason': 'no candidate'}))
+    report = pd.concat(rows, ignore_index=True)
+    return tm[['tm_idx', 'name', 'season', 'nationality', 'age', 'goals', 'assists']] \
+        .merge(report, on='tm_idx').drop(columns='tm_idx')
+
+
+def build_join(fifa: pd.DataFrame, tm: pd.DataFrame):
+    """FIFA rows + matched goals/assists, followed by unmatched TM rows.
+
+    Same shape as the hand‑built prem_name_join: FIFA players without a TM
+    row get 0 goals/assists, TM‑only rows have NULL FIFA columns.  A match
+    is copied to all of the player's rows for that fifa_version.
+    """
+    fifa, tm = fifa.reset_index(drop=True), tm.reset_index(drop=True)
+    matches, report = match_players(fifa, tm)
+    f_idx = matches['f_idx'].to_numpy(int)
+    hit = tm[['name', 'goals', 'assists']].rename(columns={'name': 'tm_name'}) \
+        .iloc[matches['tm_idx'].to_numpy(int)].set_axis(f_idx) \
+        .assign(match_score=matches['score'].to_numpy(), match_pass=matches['match_pass'].to_numpy())
+    if 'player_id' in fifa:
+        # a match covers every fifa_update row of that player and season
+        keys = ['player_id', 'fifa_version']
+        hit = fifa.loc[f_idx, keys].join(hit).reset_index(drop=True)
+        joined = fifa.merge(hit, on=keys, how='left', validate='many_to_one')
+    else:
+        joined = fifa.join(hit)
+    joined[['goals', 'assists']] = joined[['goals', 'assists']].fillna(0).astype(int)
+
+    unmatched_tm = tm.drop(index=matches['tm_idx'].to_numpy(int))
+    tm_only = pd.DataFrame({
+        'tm_name': unmatched_tm['name'], 'goals': unmatched_tm['goals'],
+        'assists': unmatched_tm['assists'], 'fifa_version': unmatched_tm['season'],
+    })
+    return pd.concat([joined, tm_only], ignore_index=True), report
+
+
+def _where_and(where: str, condition: str) -> str:
+    """`where` (as passed to `materialize_join`, "WHERE …" or "") narrowed by `condition`."""
+    rest = where.strip()
+    if rest.upper().startswith("WHERE"):
+        rest = rest[5:].strip()
+    return f"WHERE {condition} AND ({rest})" if rest else f"WHERE {condition}"
+
+
+def join_spec(conn: sqlite3.Connection, out_table: str = "player_name_join") -> dict | None:
+    """The arguments `out_table` was last materialized with, if recorded."""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                          (JOIN_BUILDS_TABLE,)).fetchone()
+    row = conn.execute(f"SELECT fifa_table, report_table, where_clause, goals_table, assists_table "
+                       f"FROM {JOIN_BUILDS_TABLE} WHERE out_table = ?", (out_table,)).fetchone() \
+        if exists else None
+    if row is None:
+        return None
+    return dict(zip(['fifa_table', 'report_table', 'where', 'goals_table', 'assists_table'], row))
+
+
+def materialize_join(db_path: str, fifa_table: str = "test", out_table: str = "player_name_join",
+                     report_table: str = "name_match_report", where: str = "",
+                     goals_table: str = "goals_plus", assists_table: str = "assists_plus"):
+    t0 = time.perf_counter()
+    with sqlite3.connect(db_path) as conn:
+        fifa = load_fifa(conn, fifa_table, where)
+        tm = load_transfermarkt(conn, goals_table, assists_table)
+        joined, report = build_join(fifa, tm)
+        joined.to_sql(out_table, conn, if_exists='replace', index=False)
+        report.to_sql(report_table, conn, if_exists='replace', index=False)
+        # recorded so `refresh_join` rebuilds seasons with the same rows and filter
+        conn.execute(f"CREATE TABLE IF NOT EXISTS {JOIN_BUILDS_TABLE} (out_table TEXT PRIMARY KEY, "
+                     "fifa_table TEXT, report_table TEXT, where_clause TEXT, goals_table TEXT, "
+                     "assists_table TEXT, built_at REAL)")
+        conn.execute(f"INSERT OR REPLACE INTO {JOIN_BUILDS_TABLE} VALUES (?, ?, ?, ?, ?, ?, ?)",
+                     (out_table, fifa_table, report_table, where, goals_table, assists_table, time.time()))
+    n_matched = int(joined['match_score'].notna().sum())
+    print(f"✅ {out_table}: {n_matched}/{len(tm)} TM rows matched, "
+          f"{len(report)} in {report_table} ({time.perf_counter() - t0:.1f} s)")
+    return joined, report
+
+
+def refresh_join(db_path: str, versions, out_table: str = "player_name_join") -> int:
+    """Rebuild only these fifa_versions of a join made by `materialize_join`,
+    with the table, `where` filter and TM tables it was built from (the
+    defaults for joins built before those were recorded).  Matching runs per
+    season, so the other seasons' rows stay valid.  Returns the join rows written."""
+    versions = sorted({int(v) for v in versions})
+    if not versions:
+        return 0
+    listed = ", ".join(map(str, versions))
+    with sqlite3.connect(db_path) as conn:
+        spec = join_spec(conn, out_table) or {
+            'fifa_table': "test", 'report_table': "name_match_report", 'where': "",
+            'goals_table': "goals_plus", 'assists_table': "assists_plus"}
+        fifa = load_fifa(conn, spec['fifa_table'], _where_and(spec['where'], f"fifa_version IN ({listed})"))
+        tm = load_transfermarkt(conn, spec['goals_table'], spec['assists_table'])
+        joined, report = build_join(fifa, tm[tm['season'].isin(versions)])
+        conn.execute(f"DELETE FROM {out_table} WHERE fifa_version IN ({listed})")
+        conn.execute(f"DELETE FROM {spec['report_table']} WHERE season IN ({listed})")
+        joined.to_sql(out_table, conn, if_exists='append', index=False)
+        report.to_sql(spec['report_table'], conn, if_exists='append', index=False)
+    return len(joined)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="FIFA ↔ Transfermarkt name‑matching join")
+    parser.add_argument("--db", default=FIFA_DB)
+    parser.add_argument("--fifa-table", default="test")
+    parser.add_argument("--where", default="", help="e.g. \"WHERE fifa_update = 1\"")
+    parser.add_argument("--out-table", default="player_name_join")
+    parser.add_argument("--report-table", default="name_match_report")
+    args = parser.parse_args()
+    materialize_join(args.db, args.fifa_table, args.out_table, args.report_table, args.where)
@@ -0,0 +1,136 @@
+import json
+
+import numpy as np
+
+from paths import data_path
+
+# Torch-free forward pass for `Model` / `EmbeddedModel`.  Weights are exported
+# once from a trained model (`training.py --export`) into a flat .npz; scoring
+# then needs nothing heavier than NumPy.
+
+WEIGHTS_PATH = data_path("embedded_model.npz")
+LAYERS = ['fc1', 'fc2', 'fc3', 'out']
+EMBEDDINGS = ['player_emb', 'club_emb']
+LEAKY_SLOPE = 0.01                  # F.leaky_relu default
+
+# Max abs difference from the torch model's outputs (goals / assists), per
+# storage dtype.  Checked by the `inference` benchmark scenario.
+TOLERANCE = {'float32': 1e-4, 'float16': 1e-2, 'int8': 5e-2}
+
+
+# --------------------------------------------------------------------------- #
+# -----------------------------  QUANTIZATION  ------------------------------ #
+# --------------------------------------------------------------------------- #
+def quantize_int8(w: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8: w ≈ q * scale[:, None]."""
+    w = np.asarray(w, dtype=np.float32)
+    scale = np.abs(w).max(axis=1) / 127
+    scale[scale == 0] = 1.0
+    q = np.clip(np.rint(w / scale[:, None]), -127, 127).astype(np.int8)
+    return q, scale.astype(np.float32)
+
+
+def dequantize_int8(q: np.ndarray, scale: np.ndarray) -> np.ndarray:
+    return q.astype(np.float32) * scale[:, None]
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------  EXPORT  --------------------------------- #
+# --------------------------------------------------------------------------- #
+def export_weights(state: dict, config: dict, schema: dict, path: str = WEIGHTS_PATH,
+                   dtype: str = 'float32'):
+    """Write a model's weights (name → array, as in a state_dict) to one .npz.
+
+    Matrices are stored as `dtype`; int8 adds a per-row `<name>.scale`.
+    Biases stay float32 - they are a few hundred numbers in total.
+    """
+    if dtype not in TOLERANCE:
+        raise ValueError(f"dtype must be one of {list(TOLERANCE)}")
+    arrays = {}
+    for name, value in state.items():
+        value = np.asarray(value, dtype=np.float32)
+        if value.ndim == 1:
+            arrays[name] = value
+        elif dtype == 'int8':
+            arrays[name], arrays[f"{name}.scale"] = quantize_int8(value)
+        else:
+            arrays[name] = value.astype(dtype)
+    meta = {'dtype': dtype, 'config': config,
+            'schema': {k: schema[k] for k in ('feature_columns', 'target_columns',
+                                               'player_vocab_size', 'club_vocab_size')}}
+    arrays['meta'] = np.frombuffer(json.dumps(meta).encode(), dtype=np.uint8)
+    with open(path, 'wb') as f:         # np.savez would append .npz to a bare name
+        np.savez(f, **arrays)
+
+
+# --------------------------------------------------------------------------- #
+# -------------------------------  INFERENCE  ------------------------------- #
+# --------------------------------------------------------------------------- #
+class NumpyModel:
+    """Vectorized float32 forward pass over exported weights.
+
+    Embedding tables get an extra mean row, used for player/club codes the
+    model has never seen (code -1), as in `prediction_service.Predictor`.
+    """
+
+    def __init__(self, layers: list, embeddings: dict, config: dict, schema: dict, dtype: str):
+        self.layers = layers            # [(W.T, b), ...] float32, W.T contiguous
+        self.embeddings = embeddings
+        self.config, self.schema, self.dtype = config, schema, dtype
+        self.embedded = bool(embeddings)
+
+    @classmethod
+    def load(cls, path: str = WEIGHTS_PATH) -> "NumpyModel":
+        with np.load(path, allow_pickle=False) as npz:
+            meta = json.loads(npz['meta'].tobytes())
+
+            def weight(name):
+                if f"{name}.scale" in npz:
+                    return dequantize_int8(npz[name], npz[f"{name}.scale"])
+                return npz[name].astype(np.float32)
+
+            layers = [(np.ascontiguousarray(weight(f"{l}.weight").T),
+                       npz[f"{l}.bias"].astype(np.float32)) for l in LAYERS]
+            embeddings = {}
+            for name in EMBEDDINGS:
+                if f"{name}.weight" in npz:
+                    table = weight(f"{name}.weight")
+                    embeddings[name] = np.vstack([table, table.mean(0, keepdims=True)])
+        return cls(layers, embeddings, meta['config'], meta['schema'], meta['dtype'])
+
+    @staticmethod
+    def _lookup(table: np.ndarray, codes: np.ndarray) -> np.ndarray:
+        codes = np.asarray(codes).astype(np.int64)
+        codes[(codes < 0) | (codes >= len(table) - 1)] = len(table) - 1
+        return table[codes]
+
+    def forward(self, x: np.ndarray, player_ids=None, club_ids=None) -> np.ndarray:
+        """Same signature and outputs as the torch models' forward, on arrays."""
+        x = np.asarray(x, dtype=np.float32)
+        if self.embedded:
+            x = np.hstack([x, self._lookup(self.embeddings['player_emb'], player_ids),
+                           self._lookup(self.embeddings['club_emb'], club_ids)])
+        for i, (wt, b) in enumerate(self.layers):
+            x = x @ wt
+            x += b
+            if i < len(self.layers) - 1:
+                np.maximum(x, LEAKY_SLOPE * x, out=x)
+        return x
+
+
+class NumpyPredictor:
+    """Pipeline-transformed rows (pipeline.columns layout) → [goals, assists]."""
+
+    def __init__(self, model: NumpyModel, columns: list[str]):
+        self.model = model
+        col = {c: i for i, c in enumerate(columns)}
+        self.feature_idx = np.array([col[c] for c in model.schema['feature_columns']])
+        self.player_col, self.club_col = col['player_id'], col['club_team_id']
+
+    def forward(self, X: np.ndarray, batch_size: int = 4096) -> np.ndarray:
+        out = np.empty((len(X), len(self.model.schema['target_columns'])), dtype=np.float32)
+        for start in range(0, len(X), batch_size):
+            block = X[start:start + batch_size]
+            out[start:start + batch_size] = self.model.forward(
+                block[:, self.feature_idx], block[:, self.player_col], block[:, self.club_col])
+        return out
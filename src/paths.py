@@ -0,0 +1,20 @@
+import os
+
+# Default file locations, resolved from this file instead of the working
+# directory, so every entry point finds the same data from cron or any shell.
+# FIFA_DATA_DIR and FIFA_PLAYERS_CSV override the defaults (`cli.py --data-dir`
+# sets the former).
+
+SRC_DIR = os.path.dirname(os.path.abspath(__file__))
+DATA_DIR = os.path.normpath(os.environ.get("FIFA_DATA_DIR") or os.path.join(SRC_DIR, os.pardir, "data"))
+PLAYERS_CSV = os.path.normpath(os.environ.get("FIFA_PLAYERS_CSV")
+                               or os.path.join(SRC_DIR, os.pardir, os.pardir, "male_players.csv"))
+
+
+def data_path(*parts: str) -> str:
+    return os.path.join(DATA_DIR, *parts)
+
+
+FIFA_DB = data_path("fifa_players.db")
+HTTP_CACHE_DB = data_path("http_cache.db")
+PARQUET_DIR = data_path("male_players_parquet")
@@ -0,0 +1,259 @@
+import json
+import numpy as np
+
+from paths import data_path
+
+# pandas is only imported by the frame-level methods, so scoring single rows
+# (`transform`) needs nothing heavier than NumPy.
+
+# Mapping from position names to indices
+POSITION_MAP = {
+    'RCM': 0, 'ST': 1, 'LCB': 2, 'RW': 3, 'LW': 4, 'GK': 5, 'LB': 6, 'LCM': 7,
+    'RCB': 8, 'CDM': 9, 'RB': 10, 'CB': 11, 'SUB': 12, 'RDM': 13, 'CAM': 14,
+    'RES': 15, 'LDM': 16, 'RWB': 17, 'LM': 18, 'LWB': 19, 'RM': 20, 'LS': 21,
+    'RS': 22, 'CF': 23, 'CM': 24
+}
+
+# Final model-ready columns (before the work_rate / body_type one-hots)
+USE_COLUMNS = [
+    'player_id', 'fifa_version',
+    'overall', 'potential', 'age', 'height_cm', 'weight_kg',
+    'club_team_id', 'club_jersey_number', 'preferred_foot',
+    'weak_foot', 'skill_moves', 'international_reputation',
+    'pace', 'shooting', 'passing', 'dribbling', 'defending', 'physic',
+    'attacking_crossing', 'attacking_finishing', 'goals', 'assists',
+    'club_position_mapped', 'has_multiple_positions',
+    'primary_position_mapped', 'years_remaining',
+    'log_value_eur', 'log_wage_eur',
+]
+MONEY_COLUMNS = ['value_eur', 'wage_eur']
+SCALED_COLUMNS = ['log_value_eur', 'log_wage_eur', 'age', 'height_cm', 'weight_kg']
+CATEGORICAL_COLUMNS = ['work_rate', 'body_type']
+FOOT_MAP = {'Right': 0, 'Left': 1}
+_COL = {c: i for i, c in enumerate(USE_COLUMNS)}
+
+
+# --------------------------------------------------------------------------- #
+# -------------------------  FITTED PIPELINE  ------------------------------- #
+# --------------------------------------------------------------------------- #
+PIPELINE_PATH = data_path("preprocessing_pipeline.json")
+
+
+class PreprocessingPipeline:
+    """Everything `preprocess_frame` learns from the training rows, fitted once.
+
+    Holds the money fill values, scaler means/scales, one-hot vocabularies,
+    player/club id vocabularies and POSITION_MAP.  `transform` turns raw
+    prem_name_join records into the `select_columns` layout with plain NumPy,
+    so a single new player is encoded exactly like the training data.
+    Unknown ids encode as -1 and unknown categories as all-zero one-hots.
+    """
+
+    def __init__(self, fill_values: dict, means: list, scales: list, categories: dict,
+                 player_ids: list, club_ids: list, position_map: dict = POSITION_MAP):
+        self.fill_values = fill_values
+        self.means = np.asarray(means, dtype=float)
+        self.scales = np.asarray(scales, dtype=float)
+        self.categories = categories
+        self.player_ids = np.asarray(player_ids, dtype=float)
+        self.club_ids = np.asarray(club_ids, dtype=float)
+        self.position_map = position_map
+
+        self.columns = USE_COLUMNS + [f'{col}_{v}' for col in CATEGORICAL_COLUMNS
+                                      for v in categories[col]]
+        self._scaled_idx = np.array([_COL[c] for c in SCALED_COLUMNS])
+        self._log_idx = np.array([_COL[f'log_{c}'] for c in MONEY_COLUMNS])
+        self._fill = np.array([fill_values[c] for c in MONEY_COLUMNS], dtype=float)
+        # id lookups are built on first use: dicts for `transform`, pandas
+        # indexes for `transform_frame`
+        self._player_code = self._club_code = None
+        self._player_index = self._club_index = None
+        self._one_hot = {}
+        offset = len(USE_COLUMNS)
+        for col in CATEGORICAL_COLUMNS:
+            self._one_hot[col] = {v: offset + i for i, v in enumerate(categories[col])}
+            offset += len(categories[col])
+        # columns copied through unchanged from the raw record
+        self._direct = [(_COL[c], c) for c in (
+            'fifa_version', 'overall', 'potential', 'age', 'height_cm', 'weight_kg',
+            'club_jersey_number', 'weak_foot', 'skill_moves', 'international_reputation',
+            'pace', 'shooting', 'passing', 'dribbling', 'defending', 'physic',
+            'attacking_crossing', 'attacking_finishing', 'goals', 'assists')]
+
+    # ---- fitting / persistence ---- #
+    @classmethod
+    def fit(cls, df: "pd.DataFrame") -> "PreprocessingPipeline":
+        """Fit on corrected prem_name_join rows (the input of `feature_engineering`)."""
+        stats = PipelineStats()
+        stats.update(df)
+        return stats.pipeline()
+
+    def to_dict(self) -> dict:
+        return {'fill_values': self.fill_values, 'means': self.means.tolist(),
+                'scales': self.scales.tolist(), 'categories': self.categories,
+                'player_ids': self.player_ids.tolist(), 'club_ids': self.club_ids.tolist(),
+                'position_map': self.position_map}
+
+    def save(self, path: str = PIPELINE_PATH):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f)
+
+    @classmethod
+    def load(cls, path: str = PIPELINE_PATH) -> "PreprocessingPipeline":
+        with open(path) as f:
+            return cls(**json.load(f))
+
+    # ---- transforming ---- #
+    def _encode_row(self, row: dict, out: np.ndarray):
+        """Fill one output row (pre-scaling) from a raw record."""
+        for i, col in self._direct:
+            v = row.get(col)
+            out[i] = np.nan if v is None else v
+
+        pid, club = row.get('player_id'), row.get('club_team_id')
+        out[_COL['player_id']] = -1 if pid is None else self._player_code.get(float(pid), -1)
+        out[_COL['club_team_id']] = -1 if club is None or club != club \
+            else self._club_code.get(float(club), -1)
+        out[_COL['preferred_foot']] = FOOT_MAP.get(row.get('preferred_foot'), np.nan)
+
+        positions = row.get('player_positions')
+        positions = positions if isinstance(positions, str) else ''
+        out[_COL['club_position_mapped']] = self.position_map.get(row.get('club_position'), np.nan)
+        out[_COL['has_multiple_positions']] = ',' in positions
+        out[_COL['primary_position_mapped']] = self.position_map.get(
+            positions.split(',', 1)[0].strip(), np.nan)
+        contract = row.get('club_contract_valid_until_year')
+        out[_COL['years_remaining']] = np.nan if contract is None \
+            else contract - 2000 - row['fifa_version']
+        for col in MONEY_COLUMNS:   # log / fill happen batch-wise in `transform`
+            v = row.get(col)
+            out[_COL[f'log_{col}']] = np.nan if v is None else v
+
+        out[len(USE_COLUMNS):] = 0.0
+        for col in CATEGORICAL_COLUMNS:
+            v = row.get(col)
+            j = self._one_hot[col].get('nan' if v is None or v != v else v)
+            if j is not None:
+                out[j] = 1.0
+
+    def transform(self, rows) -> np.ndarray:
+        """Raw record(s) → float64 array in `self.columns` order.
+
+        `rows` is one dict or a list of dicts with prem_name_join fields;
+        goals/assists may be absent (NaN) when scoring new players.
+        """
+        if isinstance(rows, dict):
+            rows = [rows]
+        if self._player_code is None:
+            self._player_code = {v: i for i, v in enumerate(self.player_ids.tolist())}
+            self._club_code = {v: i for i, v in enumerate(self.club_ids.tolist())}
+        out = np.empty((len(rows), len(self.columns)))
+        for i, row in enumerate(rows):
+            self._encode_row(row, out[i])
+
+        return self._scale(out)
+
+    def _scale(self, out: np.ndarray) -> np.ndarray:
+        """Fill + log the money columns and standardize, in place."""
+        money = out[:, self._log_idx]
+        out[:, self._log_idx] = np.log1p(np.where(np.isnan(money), self._fill, money))
+        out[:, self._scaled_idx] = (out[:, self._scaled_idx] - self.means) / self.scales
+        return out
+
+    def transform_frame(self, df: "pd.DataFrame") -> "pd.DataFrame":
+        """Vectorized batch transform of a corrected frame, `select_columns`-shaped."""
+        import pandas as pd
+        if self._player_index is None:
+            self._player_index = pd.Index(self.player_ids)
+            self._club_index = pd.Index(self.club_ids)
+        out = np.zeros((len(df), len(self.columns)))
+        for i, col in self._direct:
+            out[:, i] = df[col].to_numpy(dtype=float, na_value=np.nan)
+        out[:, _COL['player_id']] = self._player_index.get_indexer(df['player_id'])
+        out[:, _COL['club_team_id']] = self._club_index.get_indexer(df['club_team_id'])
+        out[:, _COL['preferred_foot']] = df['preferred_foot'].map(FOOT_MAP).to_numpy(dtype=float)
+
+        codes, uniques = pd.factorize(df['player_positions'])
+        codes = np.where(codes < 0, len(uniques), codes)      # missing → trailing NaN / 0
+        primary = [self.position_map.get(u.split(',')[0].strip(), np.nan) for u in uniques]
+        out[:, _COL['primary_position_mapped']] = np.append(primary, np.nan)[codes]
+        out[:, _COL['has_multiple_positions']] = np.append([',' in u for u in uniques], 0)[codes]
+        out[:, _COL['club_position_mapped']] = \
+            df['club_position'].map(self.position_map).to_numpy(dtype=float, na_value=np.nan)
+        out[:, _COL['years_remaining']] = (df['club_contract_valid_until_year'].to_numpy(dtype=float)
+                                           - 2000 - df['fifa_version'].to_numpy(dtype=float))
+        for col in MONEY_COLUMNS:
+            out[:, _COL[f'log_{col}']] = df[col].to_numpy(dtype=float, na_value=np.nan)
+
+        rows = np.arange(len(df))
+        for col in CATEGORICAL_COLUMNS:
+            vocab = self.categories[col]
+            known = vocab[:-1] if vocab and vocab[-1] == 'nan' else vocab
+            idx = pd.Index(known).get_indexer(df[col])
+            if len(known) < len(vocab):
+                idx[df[col].isna().to_numpy()] = len(known)
+            hit = idx >= 0
+            out[rows[hit], self._one_hot[col][vocab[0]] + idx[hit]] = 1.0
+        return pd.DataFrame(self._scale(out), columns=self.columns, index=None)
+
+
+class PipelineStats:
+    """Mergeable fit statistics, so the pipeline can be fitted chunk by chunk.
+
+    The scaled columns are all discrete (whole euros, years, cm, kg), so each
+    is kept as value counts: the 1% money quantile and the scaler mean/std
+    come out exact, and memory grows with distinct values, not rows.
+    """
+
+    def __init__(self):
+        import pandas as pd
+        self.counts = {c: pd.Series(dtype=float) for c in MONEY_COLUMNS + SCALED_COLUMNS[len(MONEY_COLUMNS):]}
+        self.missing = dict.fromkeys(self.counts, 0)
+        self.categories = {c: set() for c in CATEGORICAL_COLUMNS}
+        self.has_missing = dict.fromkeys(CATEGORICAL_COLUMNS, False)
+        self.ids = {'player_id': np.empty(0), 'club_team_id': np.empty(0)}
+
+    def update(self, df: "pd.DataFrame"):
+        for col in self.counts:
+            vc = df[col].value_counts()
+            self.counts[col] = self.counts[col].add(vc, fill_value=0) if len(self.counts[col]) else vc
+            self.missing[col] += int(df[col].isna().sum())
+        for col in CATEGORICAL_COLUMNS:
+            self.categories[col].update(df[col].dropna().unique().tolist())
+            self.has_missing[col] |= bool(df[col].isna().any())
+        for col, seen in self.ids.items():
+            self.ids[col] = np.union1d(seen, df[col].dropna().to_numpy(dtype=float))
+
+    @staticmethod
+    def _quantile(counts: "pd.Series", q: float) -> float:
+        """pandas' linear-interpolation quantile from value counts."""
+        counts = counts.sort_index()
+        values, cum = counts.index.to_numpy(dtype=float), counts.to_numpy().cumsum()
+        pos = (cum[-1] - 1) * q
+        lo = values[np.searchsorted(cum, np.floor(pos) + 1)]
+        hi = values[np.searchsorted(cum, np.ceil(pos) + 1)]
+        return float(lo + (hi - lo) * (pos - np.floor(pos)))
+
+    @staticmethod
+    def _mean_scale(values: np.ndarray, weights: np.ndarray) -> tuple[float, float]:
+        mean = np.average(values, weights=weights)
+        std = np.sqrt(np.average((values - mean) ** 2, weights=weights))
+        return float(mean), float(std) if std > 0 else 1.0
+
+    def pipeline(self) -> PreprocessingPipeline:
+        fill_values, means, scales = {}, [], []
+        for col in MONEY_COLUMNS:
+            counts = self.counts[col].sort_index()
+            fill_values[col] = self._quantile(counts, 0.01)
+            values = np.log1p(np.append(counts.index.to_numpy(dtype=float), fill_values[col]))
+            mean, scale = self._mean_scale(values, np.append(counts.to_numpy(), self.missing[col]))
+            means.append(mean), scales.append(scale)
+        for col in SCALED_COLUMNS[len(MONEY_COLUMNS):]:
+            counts = self.counts[col]
+            mean, scale = self._mean_scale(counts.index.to_numpy(dtype=float), counts.to_numpy())
+            means.append(mean), scales.append(scale)
+
+        categories = {c: sorted(v) + (['nan'] if self.has_missing[c] else [])
+                      for c, v in self.categories.items()}
+        return PreprocessingPipeline(fill_values, means, scales, categories,
+                                     self.ids['player_id'], self.ids['club_team_id'])
@@ -0,0 +1,53 @@
+import argparse
+import json
+import sys
+
+import numpy as np
+
+from numpy_inference import WEIGHTS_PATH, NumpyModel, NumpyPredictor
+from pipeline import PIPELINE_PATH, PreprocessingPipeline
+
+# Scores raw prem_name_join records with the exported NumPy weights.  Only
+# NumPy is imported (no pandas / torch), so a one-off call starts quickly.
+
+
+def read_records(f) -> list[dict]:
+    """A JSON array, a single JSON object, or one JSON object per line."""
+    text = f.read().strip()
+    if not text:
+        return []
+    if text[0] == '[':
+        return json.loads(text)
+    try:
+        return [json.loads(text)]
+    except json.JSONDecodeError:
+        return [json.loads(line) for line in text.splitlines() if line.strip()]
+
+
+def predict(records: list[dict], model: NumpyModel, pipeline: PreprocessingPipeline,
+            batch_size: int = 4096) -> np.ndarray:
+    if not records:
+        return np.empty((0, 2), dtype=np.float32)
+    return NumpyPredictor(model, pipeline.columns).forward(pipeline.transform(records), batch_size)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="goals/assists for JSON player records, without torch")
+    parser.add_argument("input", nargs="?", default="-", help="JSON / JSON lines file (default stdin)")
+    parser.add_argument("--weights", default=WEIGHTS_PATH)
+    parser.add_argument("--pipeline", default=PIPELINE_PATH)
+    parser.add_argument("--batch-size", type=int, default=4096)
+    args = parser.parse_args()
+
+    if args.input == "-":
+        records = read_records(sys.stdin)
+    else:
+        with open(args.input) as f:
+            records = read_records(f)
+    preds = predict(records, NumpyModel.load(args.weights),
+                    PreprocessingPipeline.load(args.pipeline), args.batch_size)
+    for record, (goals, assists) in zip(records, preds.tolist()):
+        print(json.dumps({'player_id': record.get('player_id'),
+                          'fifa_version': record.get('fifa_version'),
+                          'goals': None if goals != goals else goals,   # NaN → null
+                          'assists': None if assists != assists else assists}))
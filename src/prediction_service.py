@@ -0,0 +1,320 @@
+import argparse
+import hashlib
+import json
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import numpy as np
+import torch
+import torch.nn as nn
+
+from pipeline import PIPELINE_PATH, PreprocessingPipeline
+from training import MODEL_PATH, load_checkpoint
+
+DEFAULT_PORT = 8765
+MAX_BATCH = 256
+MAX_WAIT_MS = 2.0
+CACHE_SIZE = 50_000
+RESULT_TIMEOUT_S = 30.0             # a request never waits longer on the batcher
+
+
+# --------------------------------------------------------------------------- #
+# -------------------------------  PREDICTOR  ------------------------------- #
+# --------------------------------------------------------------------------- #
+class Predictor:
+    """Fitted pipeline + trained model: raw prem_name_join records → [goals, assists].
+
+    Players/clubs the pipeline has never seen (code -1) use the mean of the
+    learned embeddings instead of an arbitrary row.
+    """
+
+    def __init__(self, model: nn.Module, schema: dict, pipeline: PreprocessingPipeline):
+        self.model = model.eval()
+        self.pipeline = pipeline
+        col = {c: i for i, c in enumerate(pipeline.columns)}
+        self.feature_idx = np.array([col[c] for c in schema['feature_columns']])
+        self.player_col, self.club_col = col['player_id'], col['club_team_id']
+        self.embedded = hasattr(model, 'player_emb')
+        if self.embedded:
+            for name in ('player_emb', 'club_emb'):
+                weight = getattr(model, name).weight.detach()
+                setattr(model, name, nn.Embedding.from_pretrained(
+                    torch.cat([weight, weight.mean(0, keepdim=True)])))
+
+    @classmethod
+    def load(cls, model_path: str = MODEL_PATH, pipeline_path: str = PIPELINE_PATH) -> "Predictor":
+        model, _, schema = load_checkpoint(model_path)
+        return cls(model, schema, PreprocessingPipeline.load(pipeline_path))
+
+    def _ids(self, codes: np.ndarray, emb: nn.Embedding) -> torch.Tensor:
+        codes = codes.astype(np.int64)
+        codes[(codes < 0) | (codes >= emb.num_embeddings - 1)] = emb.num_embeddings - 1
+        return torch.from_numpy(codes)
+
+    def forward(self, X: np.ndarray) -> np.ndarray:
+        """Model outputs for already-transformed rows (pipeline.columns layout)."""
+        x = torch.from_numpy(np.ascontiguousarray(X[:, self.feature_idx], dtype=np.float32))
+        with torch.no_grad():
+            if self.embedded:
+                out = self.model(x, self._ids(X[:, self.player_col], self.model.player_emb),
+                                 self._ids(X[:, self.club_col], self.model.club_emb))
+            else:
+                out = self.model(x)
+        return out.numpy()
+
+
+# --------------------------------------------------------------------------- #
+# ---------------------------  BATCHING / CACHE  ---------------------------- #
+# --------------------------------------------------------------------------- #
+class MicroBatcher:
+    """Coalesces concurrent `submit` calls into one forward pass.
+
+    A background thread takes the first waiting item, then keeps collecting
+    until `max_batch` rows are queued or `max_wait` seconds have passed.
+    `close` runs whatever is still queued; later submits fail immediately.
+    """
+
+    def __init__(self, forward, max_batch: int = MAX_BATCH, max_wait: float = MAX_WAIT_MS / 1000):
+        self.forward = forward
+        self.max_batch = max_batch
+        self.max_wait = max_wait
+        self.batches = self.rows = 0
+        self._queue = deque()
+        self._cond = threading.Condition()
+        self._stop = False
+        self._thread = threading.Thread(target=self._loop, daemon=True)
+        self._thread.start()
+
+    def submit(self, X: np.ndarray) -> Future:
+        fut = Future()
+        with self._cond:
+            if self._stop:
+                fut.set_exception(RuntimeError("batcher is closed"))
+                return fut
+            self._queue.append((X, fut))
+            self._cond.notify()
+        return fut
+
+    def _take(self) -> list:
+        with self._cond:
+            while not self._queue and not self._stop:
+                self._cond.wait()
+            deadline = time.perf_counter() + self.max_wait
+            items, n = [], 0
+            while True:
+                while self._queue and n < self.max_batch:
+                    X, fut = self._queue.popleft()
+                    items.append((X, fut))
+                    n += len(X)
+                remaining = deadline - time.perf_counter()
+                if self._stop or n >= self.max_batch or remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            return items
+
+    def _loop(self):
+        while True:
+            items = self._take()
+            if not items:                       # only once stopped and drained
+                return
+            try:
+                out = self.forward(np.concatenate([X for X, _ in items]))
+            except Exception as exc:            # hand the error to every caller
+                for _, fut in items:
+                    fut.set_exception(exc)
+                continue
+            self.batches += 1
+            start = 0
+            for X, fut in items:
+                fut.set_result(out[start:start + len(X)])
+                start += len(X)
+            self.rows += start
+
+    def close(self):
+        with self._cond:
+            self._stop = True
+            self._cond.notify_all()
+        self._thread.join()
+
+
+class LRUCache:
+    def __init__(self, maxsize: int = CACHE_SIZE):
+        self.maxsize = maxsize
+        self.hits = self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            if key in self._data:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return self._data[key]
+            self.misses += 1
+            return None
+
+    def put(self, key, value):
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            if len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+
+class LatencyStats:
+    """Rolling request latencies (last `window`) and overall throughput."""
+
+    def __init__(self, window: int = 10_000):
+        self.latencies = deque(maxlen=window)
+        self.requests = self.rows = 0
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+
+    def record(self, seconds: float, rows: int):
+        with self._lock:
+            self.latencies.append(seconds)
+            self.requests += 1
+            self.rows += rows
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            lat = np.array(self.latencies) * 1000
+            elapsed = time.perf_counter() - self.started
+            return {'requests': self.requests, 'rows': self.rows,
+                    'p50_ms': float(np.percentile(lat, 50)) if len(lat) else None,
+                    'p99_ms': float(np.percentile(lat, 99)) if len(lat) else None,
+                    'requests_per_s': self.requests / elapsed,
+                    'rows_per_s': self.rows / elapsed}
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------  SERVICE  -------------------------------- #
+# --------------------------------------------------------------------------- #
+class PredictionService:
+    """Cache lookup → micro-batched forward pass → cache fill, with latency stats."""
+
+    def __init__(self, predictor: Predictor, max_batch: int = MAX_BATCH,
+                 max_wait_ms: float = MAX_WAIT_MS, cache_size: int = CACHE_SIZE,
+                 timeout: float = RESULT_TIMEOUT_S):
+        self.predictor = predictor
+        self.timeout = timeout
+        self.batcher = MicroBatcher(predictor.forward, max_batch, max_wait_ms / 1000)
+        self.cache = LRUCache(cache_size)
+        self.stats = LatencyStats()
+
+    @staticmethod
+    def cache_key(record: dict, features: np.ndarray) -> tuple:
+        return (record.get('player_id'), record.get('fifa_version'),
+                hashlib.blake2b(features.tobytes(), digest_size=16).digest())
+
+    def predict(self, records: list[dict]) -> np.ndarray:
+        t0 = time.perf_counter()
+        X = self.predictor.pipeline.transform(records)
+        out = np.empty((len(records), 2), dtype=np.float32)
+        keys, missing = [], []
+        for i, record in enumerate(records):
+            keys.append(self.cache_key(record, X[i]))
+            hit = self.cache.get(keys[-1])
+            if hit is None:
+                missing.append(i)
+            else:
+                out[i] = hit
+        if missing:
+            preds = self.batcher.submit(X[missing]).result(timeout=self.timeout)
+            out[missing] = preds
+            for i, pred in zip(missing, preds):
+                self.cache.put(keys[i], pred)
+        self.stats.record(time.perf_counter() - t0, len(records))
+        return out
+
+    def report(self) -> dict:
+        b = self.batcher
+        return {**self.stats.snapshot(),
+                'batches': b.batches, 'mean_batch_rows': b.rows / b.batches if b.batches else None,
+                'cache_hits': self.cache.hits, 'cache_misses': self.cache.misses}
+
+    def close(self):
+        self.batcher.close()
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128            # default 5 drops SYNs under concurrent load
+
+
+def make_server(service: PredictionService, host: str = "127.0.0.1",
+                port: int = DEFAULT_PORT) -> ThreadingHTTPServer:
+    """POST /predict {"rows": [...]} or a single record; GET /stats; GET /health."""
+
+    class Handler(BaseHTTPRequestHandler):
+        def _send(self, status: int, payload: dict):
+            body = json.dumps(payload).encode()
+            self.send_response(status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def do_GET(self):
+            if self.path == "/stats":
+                self._send(200, service.report())
+            elif self.path == "/health":
+                self._send(200, {"ok": True})
+            else:
+                self._send(404, {"error": "not found"})
+
+        def do_POST(self):
+            if self.path != "/predict":
+                return self._send(404, {"error": "not found"})
+            try:
+                payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))))
+                if not isinstance(payload, dict):
+                    raise TypeError("body must be a JSON object: a record or {\"rows\": [...]}")
+                rows = payload["rows"] if "rows" in payload else [payload]
+                if not isinstance(rows, list) or not all(isinstance(r, dict) for r in rows):
+                    raise TypeError("\"rows\" must be a list of JSON objects")
+                preds = service.predict(rows)
+            except (ValueError, KeyError, TypeError) as exc:
+                return self._send(400, {"error": str(exc)})
+            except Exception as exc:            # model / batcher failure: answer, don't reset
+                return self._send(500, {"error": f"{type(exc).__name__}: {exc}"})
+            self._send(200, {"predictions": [  # NaN (missing features) → null
+                {"goals": None if g != g else g, "assists": None if a != a else a}
+                for g, a in preds.tolist()]})
+
+        def log_message(self, *args):
+            pass
+
+    return _Server((host, port), Handler)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="local goals/assists prediction service")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--model", default=MODEL_PATH)
+    parser.add_argument("--pipeline", default=PIPELINE_PATH)
+    parser.add_argument("--max-batch", type=int, default=MAX_BATCH)
+    parser.add_argument("--max-wait-ms", type=float, default=MAX_WAIT_MS)
+    parser.add_argument("--cache-size", type=int, default=CACHE_SIZE)
+    parser.add_argument("--timeout", type=float, default=RESULT_TIMEOUT_S,
+                        help="seconds a request waits for its batch")
+    parser.add_argument("--threads", type=int, default=None, help="torch threads")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    service = PredictionService(Predictor.load(args.model, args.pipeline),
+                                args.max_batch, args.max_wait_ms, args.cache_size, args.timeout)
+    server = make_server(service, args.host, args.port)
+    print(f"serving on http://{args.host}:{args.port}  (POST /predict, GET /stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.close()
+        print(json.dumps(service.report(), indent=2))
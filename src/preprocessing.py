@@ -1,31 +1,36 @@
 import pandas as pd
 import sqlite3
+import argparse
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import time
 import numpy as np
-from sklearn.preprocessing import StandardScaler, OneHotEncoder
 
-# Mapping from position names to indices
-POSITION_MAP = {
-    'RCM': 0, 'ST': 1, 'LCB': 2, 'RW': 3, 'LW': 4, 'GK': 5, 'LB': 6, 'LCM': 7,
-    'RCB': 8, 'CDM': 9, 'RB': 10, 'CB': 11, 'SUB': 12, 'RDM': 13, 'CAM': 14,
-    'RES': 15, 'LDM': 16, 'RWB': 17, 'LM': 18, 'LWB': 19, 'RM': 20, 'LS': 21,
-    'RS': 22, 'CF': 23, 'CM': 24
-}
+import instrumentation
+from data_access import read_pool
+from paths import FIFA_DB, data_path
+
+# The fitted pipeline and the column constants it needs live in pipeline.py
+# (NumPy only, for fast-starting scorers); re-exported here for existing imports.
+from pipeline import (
+    POSITION_MAP, USE_COLUMNS, MONEY_COLUMNS, SCALED_COLUMNS, CATEGORICAL_COLUMNS, FOOT_MAP,
+    PIPELINE_PATH, PreprocessingPipeline, PipelineStats,
+)
 
 
 def load_sql_table(path: str, query: str) -> pd.DataFrame:
-    """Connect to SQLite and return result of query."""
-    conn = sqlite3.connect(path)
-    df = pd.read_sql_query(query, conn)
-    conn.close()
-    return df
+    """Return the result of query, on a pooled read-only connection to path."""
+    with read_pool(path).connection() as conn:
+        return pd.read_sql_query(query, conn)
 
 
-def manual_goal_assist_corrections(df: pd.DataFrame) -> pd.DataFrame:
-    """
-    Apply manual corrections to goal/assist stats based on external Transfermarkt lookup.
-    These were manually verified and edited during preprocessing.
-    """
-    corrections = {
+# Manual corrections to goal/assist stats based on external Transfermarkt
+# lookup, as row positions in prem_name_join.  Kept only to build the keyed
+# goal_assist_corrections table (see `legacy_corrections_table`).
+LEGACY_CORRECTIONS = {
         4147: [7, 1],
         2687: [5, 0],
         1578: [1, 1],
@@ -123,11 +128,8 @@ def manual_goal_assist_corrections(df: pd.DataFrame) -> pd.DataFrame:
         5110: [0, 0]
     }
 
-    for idx, (goals, assists) in corrections.items():
-        df.loc[idx, ['goals', 'assists']] = [goals, assists]
-
-    # Drop rows that were found to be misattributed, duplicates, or corrupt
-    drop_indices = [
+# Rows that were found to be misattributed, duplicates, or corrupt
+LEGACY_DROP_INDICES = [
         5318, 4695, 4962, 2809, 5114, 4444, 2970, 3165, 2679, 4742,
         3037, 2974, 4752, 3463, 2813, 3470, 4676, 4709, 2802, 4830,
         4751, 4686, 3180, 3202, 2770, 2757, 2725, 2776, 2763, 3236,
@@ -140,15 +142,121 @@ def manual_goal_assist_corrections(df: pd.DataFrame) -> pd.DataFrame:
         2992, 3068, 2901, 2851, 2964, 3078
     ]
 
-    df = df.drop(index=drop_indices, errors='ignore')
-    return df
+CORRECTIONS_TABLE = "goal_assist_corrections"
+CORRECTION_KEY = ['player_id', 'fifa_version', 'name', 'occurrence']
+
+
+def legacy_corrections_table(df: pd.DataFrame, version: int = 1) -> pd.DataFrame:
+    """Translate the positional corrections into rows keyed by (player_id, fifa_version).
+
+    Where that key is not unique in `df` (join duplicates), `name` (the
+    Transfermarkt name) and `occurrence` (the row's position among the rows
+    sharing player_id, fifa_version and name) are filled in too, so every
+    correction still hits exactly the row the positional one did.  A row
+    that is both corrected and dropped is dropped, as before.
+    """
+    dup = df.duplicated(['player_id', 'fifa_version'], keep=False)
+    occurrence = df.groupby(['player_id', 'fifa_version', 'name'], dropna=False, sort=False).cumcount()
+
+    def keyed(indices):
+        idx = [i for i in indices if i in df.index]
+        rows = df.loc[idx, ['player_id', 'fifa_version', 'name']].copy()
+        rows['occurrence'] = occurrence.loc[idx].astype(float)
+        rows.loc[~dup.loc[idx].to_numpy(), ['name', 'occurrence']] = None
+        return rows
+
+    fixes = keyed(LEGACY_CORRECTIONS)
+    fixes[['goals', 'assists']] = np.array([LEGACY_CORRECTIONS[i] for i in fixes.index],
+                                           dtype=float).reshape(-1, 2)
+    drops = keyed(LEGACY_DROP_INDICES).assign(goals=np.nan, assists=np.nan, action='drop')
+
+    table = pd.concat([fixes.assign(action='set'), drops], ignore_index=True)
+    table = table.drop_duplicates(CORRECTION_KEY, keep='last')
+    table.insert(0, 'version', version)
+    return table[['version'] + CORRECTION_KEY + ['action', 'goals', 'assists']]
+
+
+def load_corrections(conn: sqlite3.Connection) -> pd.DataFrame | None:
+    """Latest version of every correction, or None if the table doesn't exist."""
+    exists = conn.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?",
+                          (CORRECTIONS_TABLE,)).fetchone()
+    if not exists:
+        return None
+    table = pd.read_sql_query(f"SELECT * FROM {CORRECTIONS_TABLE}", conn)
+    if 'occurrence' not in table:         # written before occurrences were recorded
+        table['occurrence'] = np.nan
+    return table.sort_values('version').drop_duplicates(CORRECTION_KEY, keep='last')
+
+
+def manual_goal_assist_corrections(df: pd.DataFrame, corrections: pd.DataFrame | None = None,
+                                   seen: dict | None = None) -> pd.DataFrame:
+    """
+    Apply manual corrections to goal/assist stats based on external Transfermarkt lookup.
+    These were manually verified and edited during preprocessing.
+
+    `corrections` holds one row per (player_id, fifa_version[, name, occurrence])
+    with an action of 'set', 'drop' or 'dedupe' (drop all but the first row);
+    it is applied with a single merge.  Without it the legacy positional
+    corrections are translated on the fly.  When `df` is one chunk of a larger
+    table, pass the same `seen` dict to every call so occurrences keep counting
+    across chunks.
+    """
+    if corrections is None:
+        corrections = legacy_corrections_table(df)
+    corr = corrections.rename(columns={'goals': '_goals', 'assists': '_assists',
+                                       'name': '_match_name'})
+    if 'occurrence' not in corr:
+        corr['occurrence'] = np.nan
+    key = ['player_id', 'fifa_version', '_match_name']
+
+    # only rows of corrected players take part in the merge
+    pos = np.flatnonzero(df['player_id'].isin(corr['player_id']).to_numpy())
+    sub = df.iloc[pos][['player_id', 'fifa_version']].reset_index(drop=True)
+    names = df['name'].iloc[pos].to_numpy() if 'name' in df else None
+
+    # name only takes part in the key where the correction was recorded per name
+    named = corr.loc[corr['_match_name'].notna(), ['player_id', 'fifa_version']]
+    is_named = pd.MultiIndex.from_frame(sub).isin(pd.MultiIndex.from_frame(named))
+    sub['_match_name'] = np.where(is_named, names, None) if names is not None else None
+
+    # each row's position among the rows sharing its key, counted across chunks
+    occurrence = sub.groupby(key, dropna=False, sort=False).cumcount().to_numpy()
+    if seen is not None:
+        keys = list(sub[key].itertuples(index=False, name=None))
+        occurrence = occurrence + np.array([seen.get(k, 0) for k in keys], dtype=np.int64)
+        for k in keys:
+            seen[k] = seen.get(k, 0) + 1
+    sub['_occurrence'] = occurrence
+    sub['_row'] = np.arange(len(sub))
+
+    cand = sub.merge(corr[key + ['occurrence', 'action', '_goals', '_assists']], on=key)
+    cand = cand[cand['occurrence'].isna() | (cand['occurrence'] == cand['_occurrence'])]
+    if cand['_row'].duplicated().any():
+        raise ValueError("more than one correction applies to the same row")
+    hit = cand.set_index('_row').reindex(np.arange(len(sub)))
 
+    action = hit['action'].to_numpy()
+    fix = action == 'set'
+    out = df.copy()
+    for col in ['goals', 'assists']:
+        vals = out[col].to_numpy().copy()
+        vals[pos[fix]] = hit[f'_{col}'].to_numpy()[fix]
+        out[col] = vals
+    gone = (action == 'drop') | ((action == 'dedupe') & (occurrence > 0))
+    keep = np.ones(len(out), dtype=bool)
+    keep[pos[gone]] = False
+    return out[keep]
 
 
 def feature_engineering(df: pd.DataFrame) -> pd.DataFrame:
     """Add derived features like years_remaining, primary_position, etc."""
-    df['primary_position'] = df['player_positions'].apply(lambda x: x.split(',')[0].strip())
-    df['has_multiple_positions'] = df['player_positions'].apply(lambda x: ',' in x).astype(int)
+    # only a few hundred distinct position strings: parse each once
+    codes, uniques = pd.factorize(df['player_positions'])
+    # a missing position (code -1) gets NaN / 0, as in PreprocessingPipeline.transform
+    codes = np.where(codes < 0, len(uniques), codes)
+    df['primary_position'] = np.array([u.split(',')[0].strip() for u in uniques] + [np.nan],
+                                      dtype=object)[codes]
+    df['has_multiple_positions'] = np.array([',' in u for u in uniques] + [False], dtype=int)[codes]
     df['primary_position_mapped'] = df['primary_position'].map(POSITION_MAP)
     df['club_position_mapped'] = df['club_position'].map(POSITION_MAP)
     df['years_remaining'] = df['club_contract_valid_until_year'] - 2000 - df['fifa_version']
@@ -167,6 +275,7 @@ def handle_missing_and_log_transform(df: pd.DataFrame) -> pd.DataFrame:
 
 def normalize_numeric_features(df: pd.DataFrame) -> pd.DataFrame:
     """Apply z-score normalization to numerical columns."""
+    from sklearn.preprocessing import StandardScaler   # sklearn + scipy: over a second to import
     scaler = StandardScaler()
     cols_to_scale = ['log_value_eur', 'log_wage_eur', 'age', 'height_cm', 'weight_kg']
     df[cols_to_scale] = scaler.fit_transform(df[cols_to_scale])
@@ -174,64 +283,499 @@ def normalize_numeric_features(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def encode_categorical_features(df: pd.DataFrame) -> pd.DataFrame:
-    """One-hot encode work_rate and body_type."""
-    ohe = OneHotEncoder(sparse_output=False, handle_unknown='ignore')
-    for col in ['work_rate', 'body_type']:
-        encoded = ohe.fit_transform(df[[col]])
-        encoded_df = pd.DataFrame(encoded, columns=ohe.get_feature_names_out([col]))
-        df = pd.concat([df.reset_index(drop=True), encoded_df.reset_index(drop=True)], axis=1)
-        df.drop(columns=[col], inplace=True)
-    return df
+    """One-hot encode work_rate and body_type (same columns as OneHotEncoder)."""
+    cols = ['work_rate', 'body_type']
+    blocks = []
+    for col in cols:
+        codes, uniques = pd.factorize(df[col], sort=True)
+        names = [f'{col}_{u}' for u in uniques]
+        if (codes < 0).any():       # missing values get their own trailing column
+            codes = np.where(codes < 0, len(uniques), codes)
+            names.append(f'{col}_nan')
+        blocks.append(pd.DataFrame(np.eye(len(names))[codes], columns=names))
+    return pd.concat([df.drop(columns=cols).reset_index(drop=True)] + blocks, axis=1)
 
 
 def encode_ids(df: pd.DataFrame) -> pd.DataFrame:
     """Convert player_id and club_team_id to integer category codes for embeddings."""
     df['player_id'] = df['player_id'].astype('category').cat.codes
     df['club_team_id'] = df['club_team_id'].astype('category').cat.codes
-    df['preferred_foot'] = df['preferred_foot'].map({'Right': 0, 'Left': 1})
+    df['preferred_foot'] = df['preferred_foot'].map(FOOT_MAP)
     return df
 
 
 def select_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Keep only final model-ready columns."""
-    use_cols = [
-        'player_id', 'fifa_version',
-        'overall', 'potential', 'age', 'height_cm', 'weight_kg',
-        'club_team_id', 'club_jersey_number', 'preferred_foot',
-        'weak_foot', 'skill_moves', 'international_reputation',
-        'pace', 'shooting', 'passing', 'dribbling', 'defending', 'physic',
-        'attacking_crossing', 'attacking_finishing', 'goals', 'assists',
-        'club_position_mapped', 'has_multiple_positions',
-        'primary_position_mapped', 'years_remaining',
-        'log_value_eur', 'log_wage_eur',
-    ]
     # Add one-hot columns for work_rate and body_type
     ohe_cols = [col for col in df.columns if col.startswith('work_rate_') or col.startswith('body_type_')]
-    return df[use_cols + ohe_cols]
+    return df[USE_COLUMNS + ohe_cols]
 
 
-def preprocess_all(sql_path: str, query: str, out_path: str = None) -> pd.DataFrame:
-    """Main preprocessing pipeline."""
-    df = load_sql_table(sql_path, query)
+def correct_frame(df: pd.DataFrame, corrections: pd.DataFrame | None = None,
+                  seen: dict | None = None) -> pd.DataFrame:
+    """Matched FIFA rows with the goal/assist corrections applied."""
     df = df[df['fifa_update'].notna()]  # remove unmatched Transfermarkt-only rows
-    df = manual_goal_assist_corrections(df)
+    return manual_goal_assist_corrections(df, corrections, seen)
+
+
+def build_features(df: pd.DataFrame) -> pd.DataFrame:
+    """Feature stages on corrected rows, fitting scaler/encoders on `df` itself."""
     df = feature_engineering(df)
     df = handle_missing_and_log_transform(df)
     df = normalize_numeric_features(df)
     df = encode_categorical_features(df)
     df = encode_ids(df)
     df = select_columns(df)
+    return df
+
+
+def preprocess_frame(df: pd.DataFrame, corrections: pd.DataFrame | None = None) -> pd.DataFrame:
+    """Run every stage on an already-loaded join table."""
+    return build_features(correct_frame(df, corrections))
+
+
+# --------------------------------------------------------------------------- #
+# -------------------------  TRAINING ARRAYS  ------------------------------- #
+# --------------------------------------------------------------------------- #
+ARRAYS_DIR = data_path("training_arrays")
+TARGET_COLUMNS = ['goals', 'assists']
+ID_COLUMNS = ['player_id', 'club_team_id']
+SMALL_INT_COLUMNS = [
+    'fifa_version', 'overall', 'potential', 'club_jersey_number', 'preferred_foot',
+    'weak_foot', 'skill_moves', 'international_reputation',
+    'pace', 'shooting', 'passing', 'dribbling', 'defending', 'physic',
+    'attacking_crossing', 'attacking_finishing',
+    'club_position_mapped', 'has_multiple_positions', 'primary_position_mapped',
+    'years_remaining',
+]
+
+
+def compact_dtypes(df: pd.DataFrame) -> pd.DataFrame:
+    """Downcast `select_columns` output: ids int32, flags/ratings/codes int8, rest float32.
+
+    Small-int columns that contain NaN (e.g. goalkeepers' pace) stay float32.
+    """
+    out = {}
+    for col in df.columns:
+        if col in ID_COLUMNS:
+            dtype = 'int32'
+        elif col in SMALL_INT_COLUMNS or col.startswith(tuple(f'{c}_' for c in CATEGORICAL_COLUMNS)):
+            dtype = 'float32' if df[col].isna().any() else 'int8'
+        else:
+            dtype = 'float32'
+        out[col] = df[col].to_numpy().astype(dtype)
+    return pd.DataFrame(out, index=df.index)
+
+
+def training_arrays(df: pd.DataFrame) -> tuple[list[str], dict]:
+    """(feature column names, {array name: ndarray}) for `select_columns` output.
+
+    Rows with any missing feature are dropped (the notebook drops rows without
+    pace).  Features and targets are float32 so training can wrap the memory
+    maps with `torch.from_numpy` without a copy.
+    """
+    feature_cols = [c for c in df.columns
+                    if c not in ID_COLUMNS + TARGET_COLUMNS + ['fifa_version']]
+    df = compact_dtypes(df)
+    df = df[df[feature_cols].notna().all(axis=1).to_numpy()]
+    return feature_cols, {
+        'features': df[feature_cols].to_numpy(dtype='float32'),
+        'targets': df[TARGET_COLUMNS].to_numpy(dtype='float32'),
+        'player_ids': df['player_id'].to_numpy(dtype='int32'),
+        'club_ids': df['club_team_id'].to_numpy(dtype='int32'),
+        'fifa_version': df['fifa_version'].to_numpy(dtype='int8'),
+    }
+
+
+class TrainingArrayWriter:
+    """Appends `training_arrays` chunks to .npy files; headers are written on close.
+
+    Each file starts with a fixed NPY_HEADER_BYTES header slot, so rows can be
+    streamed in before the final shape is known.
+    """
+    NPY_HEADER_BYTES = 128
+
+    def __init__(self, out_dir: str = ARRAYS_DIR):
+        self.out_dir = out_dir
+        os.makedirs(out_dir, exist_ok=True)
+        self.files, self.specs = {}, {}
+        self.rows = 0
+        self.feature_cols = None
+        self.max_ids = {'player_ids': -1, 'club_ids': -1}
+
+    def append(self, feature_cols: list[str], arrays: dict):
+        if self.feature_cols is None:
+            self.feature_cols = feature_cols
+            for name, arr in arrays.items():
+                f = open(os.path.join(self.out_dir, f'{name}.npy'), 'wb')
+                f.write(b'\0' * self.NPY_HEADER_BYTES)
+                self.files[name] = f
+                self.specs[name] = (arr.dtype, arr.shape[1:])
+        elif feature_cols != self.feature_cols:
+            raise ValueError("feature columns changed between chunks")
+        for name, arr in arrays.items():
+            self.files[name].write(np.ascontiguousarray(arr, dtype=self.specs[name][0]).tobytes())
+        for name in self.max_ids:
+            if len(arrays[name]):
+                self.max_ids[name] = max(self.max_ids[name], int(arrays[name].max()))
+        self.rows += len(arrays['features'])
+
+    def close(self) -> dict:
+        """Finish the .npy headers, write schema.json and return the schema."""
+        schema = {'rows': self.rows, 'feature_columns': self.feature_cols,
+                  'target_columns': TARGET_COLUMNS,
+                  'player_vocab_size': self.max_ids['player_ids'] + 1,
+                  'club_vocab_size': self.max_ids['club_ids'] + 1,
+                  'arrays': {}}
+        for name, f in self.files.items():
+            dtype, tail = self.specs[name]
+            shape = (self.rows,) + tuple(tail)
+            header = repr({'descr': np.lib.format.dtype_to_descr(dtype),
+                           'fortran_order': False, 'shape': shape})
+            header = header.ljust(self.NPY_HEADER_BYTES - 10 - 1) + '\n'
+            f.seek(0)
+            f.write(b'\x93NUMPY\x01\x00' + len(header).to_bytes(2, 'little') + header.encode('latin1'))
+            f.close()
+            schema['arrays'][name] = {'file': f'{name}.npy', 'dtype': str(dtype),
+                                      'shape': list(shape)}
+        with open(os.path.join(self.out_dir, 'schema.json'), 'w') as f:
+            json.dump(schema, f, indent=2)
+        return schema
+
+
+def write_training_arrays(df: pd.DataFrame, out_dir: str = ARRAYS_DIR) -> dict:
+    """Write features/targets/ids as contiguous .npy files plus schema.json."""
+    writer = TrainingArrayWriter(out_dir)
+    writer.append(*training_arrays(df))
+    return writer.close()
+
+
+def load_training_arrays(out_dir: str = ARRAYS_DIR, mmap_mode: str = 'c') -> tuple[dict, dict]:
+    """(schema, {name: memory map}) for a `write_training_arrays` directory.
+
+    The default copy-on-write maps are writable, so `torch.from_numpy` wraps
+    them without a copy or a read-only warning; nothing is written back.
+    """
+    with open(os.path.join(out_dir, 'schema.json')) as f:
+        schema = json.load(f)
+    arrays = {name: np.load(os.path.join(out_dir, spec['file']), mmap_mode=mmap_mode)
+              for name, spec in schema['arrays'].items()}
+    return schema, arrays
+
+
+# --------------------------------------------------------------------------- #
+# ---------------------------  STAGE CACHE  --------------------------------- #
+# --------------------------------------------------------------------------- #
+# Bump to invalidate every cached stage at once (e.g. after a pandas upgrade).
+CACHE_VERSION = 1
+STAGE_CACHE_DIR = data_path("stage_cache")
+
+# (name, function, helpers whose source also counts towards the code version)
+STAGES = [
+    ('correct', correct_frame, [manual_goal_assist_corrections, legacy_corrections_table]),
+    ('features', feature_engineering, []),
+    ('fill_log', handle_missing_and_log_transform, []),
+    ('normalize', normalize_numeric_features, []),
+    ('encode_categorical', encode_categorical_features, []),
+    ('encode_ids', encode_ids, []),
+    ('select', select_columns, []),
+]
+STAGE_NAMES = [name for name, _, _ in STAGES]
+
+
+def _digest(*parts) -> str:
+    h = hashlib.sha256()
+    for part in parts:
+        h.update(repr(part).encode())
+    return h.hexdigest()[:24]
+
+
+def source_key(sql_path: str, query: str) -> str:
+    """Identity of the raw input: query plus size/mtime of the DB (and its WAL)."""
+    stats = []
+    for path in (sql_path, sql_path + "-wal"):
+        if os.path.exists(path):
+            st = os.stat(path)
+            stats.append((st.st_size, st.st_mtime_ns))
+    return _digest(os.path.abspath(sql_path), query, stats)
+
+
+def _constants(fn) -> dict:
+    """Module-level data (maps, column lists, …) that `fn` reads, by name.
+
+    Editing e.g. `pipeline.USE_COLUMNS` changes a stage's output without
+    touching its source, so these count towards the code version too.
+    """
+    names, todo = set(), [fn.__code__]
+    while todo:
+        code = todo.pop()
+        names.update(code.co_names)
+        todo.extend(c for c in code.co_consts if inspect.iscode(c))
+    return {n: fn.__globals__[n] for n in sorted(names)
+            if isinstance(fn.__globals__.get(n), (dict, list, tuple, set, frozenset, str, int, float))}
+
+
+def stage_keys(input_key: str, params: dict | None = None) -> list[str]:
+    """One key per stage: hash of the previous stage's key, its params and code.
+
+    Keys chain, so a stage's key identifies its input content without
+    hashing the frame, and editing one stage (or a constant it reads) only
+    invalidates it and the stages after it.
+    """
+    keys, key = [], input_key
+    for name, fn, helpers in STAGES:
+        code = [(inspect.getsource(f), _constants(f)) for f in [fn] + helpers]
+        key = _digest(key, name, CACHE_VERSION, code, (params or {}).get(name))
+        keys.append(key)
+    return keys
+
+
+class StageCache:
+    """Size‑bounded LRU store of intermediate frames, one pickle per stage key."""
+
+    def __init__(self, root: str = STAGE_CACHE_DIR, max_bytes: int = 1024 * 2**20):
+        self.root = root
+        self.max_bytes = max_bytes
+        self.hits = self.misses = self.evictions = 0
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.root, f"{stage}-{key}.pkl")
+
+    def get(self, stage: str, key: str) -> pd.DataFrame | None:
+        path = self._path(stage, key)
+        if not os.path.exists(path):
+            return None
+        os.utime(path)                      # mtime doubles as last access
+        self.hits += 1
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+    def has(self, stage: str, key: str) -> bool:
+        return os.path.exists(self._path(stage, key))
+
+    def put(self, stage: str, key: str, df: pd.DataFrame):
+        tmp = self._path(stage, key) + ".tmp"
+        with open(tmp, 'wb') as f:
+            pickle.dump(df, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, self._path(stage, key))
+        self.misses += 1
+        self._evict()
+
+    def invalidate(self, stages) -> int:
+        """Delete every entry of the given stages; returns how many were removed."""
+        n = 0
+        for entry in os.scandir(self.root):
+            if entry.name.rsplit('-', 1)[0] in stages:
+                os.remove(entry.path)
+                n += 1
+        return n
+
+    def _evict(self):
+        entries = sorted(os.scandir(self.root), key=lambda e: e.stat().st_mtime)
+        total = sum(e.stat().st_size for e in entries)
+        for entry in entries:
+            if total <= self.max_bytes:
+                break
+            total -= entry.stat().st_size
+            os.remove(entry.path)
+            self.evictions += 1
+
+    def report(self) -> str:
+        return f"stage cache: {self.hits} hits, {self.misses} recomputed, {self.evictions} evicted"
+
+
+def run_stages(load, keys: list[str], cache: StageCache | None, keep=()):
+    """Run STAGES from the latest cached one; returns (final frame, kept outputs).
+
+    `load()` returns (raw frame, corrections) and is only called when no
+    stage is cached.  Stages mutate their input, so outputs of the stages
+    named in `keep` are copied when computed here.
+    """
+    first, df = 0, None
+    if cache is not None:
+        for i in reversed(range(len(STAGES))):
+            if cache.has(STAGE_NAMES[i], keys[i]):
+                with instrumentation.stage(f"preprocess.{STAGE_NAMES[i]}") as span:
+                    df = cache.get(STAGE_NAMES[i], keys[i])
+                    span.add(cache_hits=1, rows_out=len(df))
+                first = i + 1
+                break
+
+    kept = {}
+    for i in range(first, len(STAGES)):
+        name, fn, _ = STAGES[i]
+        t0 = time.perf_counter()
+        if name == 'correct':
+            with instrumentation.stage("preprocess.load", own_peak=True) as span:
+                df, corrections = load()
+                span.add(rows_out=len(df))
+        with instrumentation.stage(f"preprocess.{name}", own_peak=True) as span:
+            span.add(rows_in=len(df))
+            df = fn(df, corrections) if name == 'correct' else fn(df)
+            span.add(rows_out=len(df))
+        if cache is not None:
+            cache.put(name, keys[i], df)
+        if name in keep:
+            kept[name] = df.copy()
+        print(f"  {name:<20} {time.perf_counter() - t0:7.3f} s")
+    return df, kept
+
+
+def preprocess_all(sql_path: str, query: str, out_path: str = None,
+                   pipeline_path: str = None, cache: StageCache | None = None,
+                   invalidate: str | None = None, arrays_dir: str = None,
+                   chunksize: int | None = None, params: dict | None = None) -> pd.DataFrame | None:
+    """Main preprocessing pipeline.
+
+    With `pipeline_path` the fitted `PreprocessingPipeline` is saved too, so
+    single rows can later be transformed without rerunning this.  With
+    `cache`, stages whose input, parameters and code are unchanged are read
+    back instead of recomputed; `invalidate` drops a stage and everything after it.
+    `params` ({stage: settings}) is folded into the stage keys, for settings
+    that change a stage's output outside its code.
+    With `arrays_dir` the compact memory-mappable training arrays are written too.
+    With `chunksize` the table is streamed through `preprocess_chunked`
+    instead (no stage cache, nothing returned).
+    """
+    if chunksize:
+        preprocess_chunked(sql_path, query, chunksize, out_path, pipeline_path, arrays_dir)
+        return None
+
+    def load():
+        conn = sqlite3.connect(sql_path)
+        corrections = load_corrections(conn)
+        conn.close()
+        return load_sql_table(sql_path, query), corrections
+
+    keys = stage_keys(source_key(sql_path, query), params)
+    if cache is not None and invalidate:
+        cache.invalidate(STAGE_NAMES[STAGE_NAMES.index(invalidate):])
+
+    df, kept = run_stages(load, keys, cache, keep=('correct',) if pipeline_path else ())
+    if pipeline_path:
+        corrected = kept.get('correct')
+        if corrected is None:
+            corrected = cache.get('correct', keys[0]) if cache is not None else None
+        if corrected is None:
+            corrected = correct_frame(*load())
+        PreprocessingPipeline.fit(corrected).save(pipeline_path)
+        print(f"✅ Pipeline saved to {pipeline_path}")
+    if cache is not None:
+        print(cache.report())
 
     if out_path:
         df.to_csv(out_path, index=False)
         print(f"✅ Saved to {out_path}")
+    if arrays_dir:
+        schema = write_training_arrays(df, arrays_dir)
+        print(f"✅ {schema['rows']} training rows saved to {arrays_dir}")
 
     return df
 
 
+def preprocess_chunked(sql_path: str, query: str, chunksize: int = 100_000,
+                       out_path: str = None, pipeline_path: str = None,
+                       arrays_dir: str = None) -> PreprocessingPipeline:
+    """Two-pass, bounded-memory `preprocess_all` for the full FIFA history.
+
+    Pass one streams corrected rows into `PipelineStats` (scaler statistics,
+    one-hot and id vocabularies); pass two re-reads the query and transforms
+    and writes each chunk with the fitted pipeline.  Needs the keyed
+    corrections table (`--migrate-corrections`), since the legacy positional
+    corrections only make sense on the whole table.
+    """
+    conn = sqlite3.connect(sql_path)
+    corrections = load_corrections(conn)
+    if corrections is None:
+        conn.close()
+        raise ValueError(f"chunked mode needs the {CORRECTIONS_TABLE} table; "
+                         "run with --migrate-corrections first")
+
+    def corrected_chunks():
+        seen = {}
+        chunks = pd.read_sql_query(query, conn, chunksize=chunksize)
+        for chunk in instrumentation.timed_iter("preprocess.load", chunks):
+            with instrumentation.stage("preprocess.correct") as span:
+                span.add(rows_in=len(chunk))
+                chunk = correct_frame(chunk, corrections, seen)
+                span.add(rows_out=len(chunk))
+            yield chunk
+
+    stats = PipelineStats()
+    for chunk in corrected_chunks():
+        with instrumentation.stage("preprocess.fit") as span:
+            stats.update(chunk)
+            span.add(rows_in=len(chunk))
+    pipeline = stats.pipeline()
+    if pipeline_path:
+        pipeline.save(pipeline_path)
+        print(f"✅ Pipeline saved to {pipeline_path}")
+
+    writer = TrainingArrayWriter(arrays_dir) if arrays_dir else None
+    n = 0
+    for chunk in corrected_chunks():
+        with instrumentation.stage("preprocess.transform") as span:
+            out = pipeline.transform_frame(chunk)
+            span.add(rows_in=len(chunk), rows_out=len(out))
+        with instrumentation.stage("preprocess.write") as span:
+            if out_path:
+                out.to_csv(out_path, index=False, header=n == 0, mode='w' if n == 0 else 'a')
+            if writer is not None:
+                writer.append(*training_arrays(out))
+            span.add(rows_in=len(out))
+        n += len(out)
+    conn.close()
+
+    if out_path:
+        print(f"✅ Saved {n} rows to {out_path}")
+    if writer is not None:
+        schema = writer.close()
+        print(f"✅ {schema['rows']} training rows saved to {arrays_dir}")
+    return pipeline
+
+
+def migrate_corrections(sql_path: str, query: str, version: int = 1):
+    """Write the legacy positional corrections as the keyed corrections table."""
+    df = load_sql_table(sql_path, query)
+    df = df[df['fifa_update'].notna()]
+    table = legacy_corrections_table(df, version)
+    conn = sqlite3.connect(sql_path)
+    columns = [c[1] for c in conn.execute(f"PRAGMA table_info({CORRECTIONS_TABLE})")]
+    if columns and 'occurrence' not in columns:
+        conn.execute(f"ALTER TABLE {CORRECTIONS_TABLE} ADD COLUMN occurrence REAL")
+    table.to_sql(CORRECTIONS_TABLE, conn, if_exists='append', index=False)
+    conn.close()
+    print(f"✅ {len(table)} corrections written to {CORRECTIONS_TABLE} (version {version})")
+
+
 if __name__ == "__main__":
-    final_df = preprocess_all(
-        sql_path="../data/fifa_players.db",
-        query="SELECT * FROM prem_name_join",
-        out_path="data/cleaned_prem_data.csv"
-    )
+    parser = argparse.ArgumentParser(description="prem_name_join → model-ready CSV")
+    parser.add_argument("--db", default=FIFA_DB)
+    parser.add_argument("--out", default=data_path("cleaned_prem_data.csv"))
+    parser.add_argument("--migrate-corrections", action="store_true",
+                        help="write the legacy corrections to goal_assist_corrections and exit")
+    parser.add_argument("--no-cache", action="store_true", help="recompute every stage")
+    parser.add_argument("--invalidate", choices=STAGE_NAMES, metavar="STAGE",
+                        help=f"drop cached output of STAGE and later stages ({', '.join(STAGE_NAMES)})")
+    parser.add_argument("--cache-max-mb", type=float, default=1024)
+    parser.add_argument("--arrays", nargs="?", const=ARRAYS_DIR, metavar="DIR",
+                        help=f"also write memory-mappable training arrays (default {ARRAYS_DIR})")
+    parser.add_argument("--chunksize", type=int, default=None,
+                        help="stream the table in chunks of this many rows (bounded memory)")
+    args = parser.parse_args()
+
+    if args.migrate_corrections:
+        migrate_corrections(args.db, "SELECT * FROM prem_name_join")
+    else:
+        cache = None if args.no_cache else StageCache(max_bytes=int(args.cache_max_mb * 2**20))
+        final_df = preprocess_all(
+            sql_path=args.db,
+            query="SELECT * FROM prem_name_join",
+            out_path=args.out,
+            pipeline_path=PIPELINE_PATH,
+            cache=cache,
+            invalidate=args.invalidate,
+            arrays_dir=args.arrays,
+            chunksize=args.chunksize,
+        )
@@ -1,49 +1,285 @@
-import requests, sqlite3, pandas as pd, random, time, sys, argparse, pathlib
-from bs4 import BeautifulSoup
+import requests, sqlite3, pandas as pd, numpy as np, random, time, sys, argparse, pathlib, threading, re, zlib
+from bs4 import BeautifulSoup, SoupStrainer
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import date
+from urllib.parse import urljoin, urlsplit
 from requests.adapters import HTTPAdapter, Retry
 
+import instrumentation
+from paths import FIFA_DB, HTTP_CACHE_DB
+
 # --------------------------------------------------------------------------- #
 # ------------------------------  GLOBAL SESSION  --------------------------- #
 # --------------------------------------------------------------------------- #
 HEADERS = {"User-Agent": "Mozilla/5.0"}
+BASE_URL = "https://www.transfermarkt.us"
+MAX_WORKERS = 16                     # upper bound for the pooled connections
+
 SESSION = requests.Session()
 SESSION.headers.update(HEADERS)
-SESSION.mount(
-    "https://",
-    HTTPAdapter(
-        max_retries=Retry(
-            total=4, backoff_factor=1,
-            status_forcelist=[429, 502, 503, 504],
-            allowed_methods=["GET"],
-        )
+_ADAPTER = HTTPAdapter(
+    pool_maxsize=MAX_WORKERS,
+    max_retries=Retry(
+        total=4, backoff_factor=1,
+        status_forcelist=[429, 502, 503, 504],
+        allowed_methods=["GET"],
     ),
 )
+SESSION.mount("https://", _ADAPTER)
+SESSION.mount("http://", _ADAPTER)
 
-def fetch(url: str, timeout: int = 15) -> str:
-    """GET a page with retries + random delay to avoid rate‑limits."""
-    print(f"     … {url}", flush=True)
-    try:
-        resp = SESSION.get(url, timeout=timeout)
-        resp.raise_for_status()
-        return resp.text
-    finally:
-        time.sleep(random.uniform(0.8, 1.6))
+
+# --------------------------------------------------------------------------- #
+# ---------------------------  PER‑HOST RATE LIMIT  ------------------------- #
+# --------------------------------------------------------------------------- #
+DEFAULT_RATE = 2.0                   # requests / second / host
+DEFAULT_BURST = 4
+
+class TokenBucket:
+    """Thread‑safe token bucket: `rate` tokens/s, bursts of up to `capacity`."""
+
+    def __init__(self, rate: float = DEFAULT_RATE, capacity: int = DEFAULT_BURST):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._stamp = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """Take one token, sleeping until it is available. Returns the wait."""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity,
+                               self._tokens + (now - self._stamp) * self.rate)
+            self._stamp = now
+            self._tokens -= 1        # may go negative → reserves a future slot
+            wait = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        if wait:
+            time.sleep(wait)
+        return wait
+
+
+_LIMITERS: dict[str, TokenBucket] = {}
+_LIMITERS_LOCK = threading.Lock()
+
+def configure_rate_limit(host: str, rate: float, burst: int = DEFAULT_BURST):
+    with _LIMITERS_LOCK:
+        _LIMITERS[host] = TokenBucket(rate, burst)
+
+def limiter_for(url: str) -> TokenBucket:
+    """Shared bucket for the URL's host (created with the defaults on demand)."""
+    host = urlsplit(url).netloc
+    with _LIMITERS_LOCK:
+        if host not in _LIMITERS:
+            _LIMITERS[host] = TokenBucket()
+        return _LIMITERS[host]
+
+
+# --------------------------------------------------------------------------- #
+# ----------------------------  RESPONSE CACHE  ----------------------------- #
+# --------------------------------------------------------------------------- #
+SEASON_RE = re.compile(r"saison_id[/=](\d{4})")
+
+def current_season(today: date | None = None) -> int:
+    """Start year of the season in progress (seasons roll over on 1 Aug)."""
+    today = today or date.today()
+    return today.year if today.month >= 8 else today.year - 1
+
+
+class ResponseCache:
+    """Persistent, size‑bounded LRU cache of page bodies keyed on URL.
+
+    Bodies are zlib‑compressed in a small SQLite file together with the fetch
+    time and the ETag / Last‑Modified validators.  Pages of closed seasons are
+    served from disk forever; pages of the current season (or without a season
+    in the URL) are revalidated with a conditional GET once older than
+    `current_ttl` seconds.
+    """
+
+    def __init__(self, path, max_bytes: int = 256 * 2**20, current_ttl: float = 3600):
+        self.max_bytes = max_bytes
+        self.current_ttl = current_ttl
+        self.hits = self.misses = self.revalidated = self.evictions = 0
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS responses (
+                url TEXT PRIMARY KEY,
+                body BLOB,
+                size INTEGER,
+                fetched_at REAL,
+                accessed_at REAL,
+                etag TEXT,
+                last_modified TEXT
+            )"""
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS responses_lru ON responses (accessed_at)"
+        )
+        self._conn.commit()
+
+    def ttl_for(self, url: str) -> float | None:
+        """Seconds an entry stays fresh; None = never expires."""
+        m = SEASON_RE.search(url)
+        if m and int(m.group(1)) < current_season():
+            return None
+        return self.current_ttl
+
+    def lookup(self, url: str):
+        """Return (body, fresh, validator headers) or None if not cached.
+
+        A fresh entry counts as a hit; `touch` counts revalidations and
+        `store` misses, all under the lock since pooled fetches share the cache.
+        """
+        ttl = self.ttl_for(url)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, fetched_at, etag, last_modified FROM responses WHERE url = ?",
+                (url,),
+            ).fetchone()
+            if row is None:
+                return None
+            self._conn.execute("UPDATE responses SET accessed_at = ? WHERE url = ?",
+                               (time.time(), url))
+            self._conn.commit()
+            body, fetched_at, etag, last_modified = row
+            fresh = ttl is None or time.time() - fetched_at < ttl
+            if fresh:
+                self.hits += 1
+        validators = {}
+        if etag:
+            validators["If-None-Match"] = etag
+        if last_modified:
+            validators["If-Modified-Since"] = last_modified
+        return zlib.decompress(body).decode("utf-8"), fresh, validators
+
+    def store(self, url: str, text: str, etag: str | None = None,
+              last_modified: str | None = None):
+        blob = zlib.compress(text.encode("utf-8"), 6)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                """INSERT OR REPLACE INTO responses
+                   (url, body, size, fetched_at, accessed_at, etag, last_modified)
+                   VALUES (?, ?, ?, ?, ?, ?, ?)""",
+                (url, blob, len(blob), now, now, etag, last_modified),
+            )
+            self.misses += 1
+            self._evict()
+            self._conn.commit()
+
+    def touch(self, url: str):
+        """Mark a revalidated (304) entry as freshly fetched."""
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "UPDATE responses SET fetched_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+            self.revalidated += 1
+            self._conn.commit()
+
+    def _evict(self):
+        total = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for url, size in self._conn.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at"
+        ).fetchall():
+            self._conn.execute("DELETE FROM responses WHERE url = ?", (url,))
+            self.evictions += 1
+            total -= size
+            if total <= self.max_bytes:
+                break
+
+    def report(self) -> str:
+        return (f"cache: {self.hits} hits • {self.revalidated} revalidated (304) • "
+                f"{self.misses} misses • {self.evictions} evicted")
+
+    def close(self):
+        self._conn.close()
+
+
+CACHE: ResponseCache | None = None      # enabled from the CLI / enable_cache()
+
+def enable_cache(path, **kwargs) -> ResponseCache:
+    global CACHE
+    CACHE = ResponseCache(path, **kwargs)
+    return CACHE
+
+
+def fetch(url: str, timeout: int = 15, limiter: TokenBucket | None = None) -> str:
+    """GET a page with retries.
+
+    Fresh cache entries are returned without touching the network; stale ones
+    are revalidated with a conditional GET.  Serial callers get the original
+    random 0.8–1.6 s delay after every network call; concurrent callers pass
+    the host's `limiter` and are paced by it instead.  429/5xx backoff is
+    handled by the session's `Retry` in both modes.
+    """
+    with instrumentation.stage("fetch") as span:
+        cached = CACHE.lookup(url) if CACHE is not None else None
+        if cached and cached[1]:
+            span.add(cache_hits=1)
+            return cached[0]
+
+        if limiter is not None:
+            span.add(sleep_s=limiter.acquire())
+        print(f"     … {url}", flush=True)
+        try:
+            resp = SESSION.get(url, timeout=timeout, headers=cached[2] if cached else None)
+            span.add(bytes_down=int(resp.headers.get("Content-Length") or len(resp.content)),
+                     retries=_retries(resp))
+            if cached and resp.status_code == 304:
+                CACHE.touch(url)
+                span.add(cache_hits=1)
+                return cached[0]
+            resp.raise_for_status()
+            if CACHE is not None:
+                CACHE.store(url, resp.text, resp.headers.get("ETag"),
+                            resp.headers.get("Last-Modified"))
+            return resp.text
+        finally:
+            if limiter is None:
+                delay = random.uniform(0.8, 1.6)
+                time.sleep(delay)
+                span.add(sleep_s=delay)
+
+
+def _retries(resp: requests.Response) -> int:
+    """Retries urllib3 made before this response (429/5xx backoff, resets)."""
+    retries = getattr(resp.raw, "retries", None)
+    return len(retries.history) if retries is not None else 0
 
 
 # --------------------------------------------------------------------------- #
 # -----------------------------  URL UTILITIES  ----------------------------- #
 # --------------------------------------------------------------------------- #
-def build_url(stat_type: str, season: int) -> str:
-    base = {
-        "goals":   "https://www.transfermarkt.us/premier-league/torschuetzenliste/wettbewerb/GB1/plus/?saison_id={}",
-        "assists": "https://www.transfermarkt.us/premier-league/assistliste/wettbewerb/GB1/plus/?saison_id={}",
+COMPETITIONS = {                     # Transfermarkt code → URL slug
+    "GB1": "premier-league",
+    "GB2": "championship",
+    "ES1": "laliga",
+    "IT1": "serie-a",
+    "L1":  "bundesliga",
+    "FR1": "ligue-1",
+}
+
+def build_url(stat_type: str, season: int, base: str = BASE_URL,
+              competition: str = "GB1") -> str:
+    path = {
+        "goals":   "/{slug}/torschuetzenliste/wettbewerb/{comp}/plus/?saison_id={season}",
+        "assists": "/{slug}/assistliste/wettbewerb/{comp}/plus/?saison_id={season}",
     }
-    return base[stat_type].format(season)
+    return base + path[stat_type].format(slug=COMPETITIONS[competition],
+                                         comp=competition, season=season)
+
+def table_for(stat_type: str, competition: str = "GB1", suffix: str = "_plus") -> str:
+    """PL keeps the original goals_plus / assists_plus tables; others get goals_gb2 …"""
+    return stat_type + (suffix if competition == "GB1" else f"_{competition.lower()}")
 
-def get_paginated_urls(soup):
+def get_paginated_urls(soup, page_url: str = BASE_URL):
     return [
-        "https://www.transfermarkt.us" + a["href"]
+        urljoin(page_url, a["href"])
         for li in soup.select("li.tm-pagination__list-item")[1:]
         if (a := li.find("a")) and a.get("href")
     ]
@@ -52,13 +288,67 @@ def get_paginated_urls(soup):
 # --------------------------------------------------------------------------- #
 # ---------------------  TABLE‑PAGE   →   DATAFRAME  ------------------------ #
 # --------------------------------------------------------------------------- #
-def extract_stats_from_page(soup: BeautifulSoup, season: int) -> pd.DataFrame:
-    """Return DF with: name • value • season • nationality • age"""
+PARSER = "fast"                      # "fast" (partial parse) or "full"
+
+# Only the stats table and the pager are ever read from a list page.
+PAGE_STRAINER = SoupStrainer(["table", "ul"], class_=["items", "tm-pagination"])
+TABLE_TAG_RE = re.compile(r"<(/?)table\b[^>]*>", re.I)
+
+
+def _class_open_re(tag: str, cls: str) -> str:
+    """Opening `tag` whose class attribute (", ' or unquoted) has `cls` as a whole token."""
+    return (rf"""<{tag}\b[^>]*?\sclass\s*=\s*"""
+            rf"""(?:(["'])(?:[^"'>]*?\s)?{cls}(?:\s[^"'>]*)?\1|{cls}(?=[\s/>]))[^>]*>""")
+
+
+ITEMS_OPEN_RE = re.compile(_class_open_re("table", "items"), re.I)
+PAGER_RE = re.compile(_class_open_re("ul", "tm-pagination") + r".*?</ul>", re.I | re.S)
+
+
+def _page_fragments(html: str) -> str | None:
+    """Raw HTML of `table.items` (+ pager), or None if the table isn't found."""
+    m = ITEMS_OPEN_RE.search(html)
+    if not m:
+        return None
+    depth = 0
+    for tag in TABLE_TAG_RE.finditer(html, m.start()):
+        depth += -1 if tag.group(1) else 1
+        if depth == 0:
+            table = html[m.start():tag.end()]
+            break
+    else:
+        return None
+    pager = PAGER_RE.search(html, tag.end())
+    return table + (pager.group(0) if pager else "")
+
+
+def parse_page(html: str, parser: str | None = None) -> BeautifulSoup:
+    """Soup of a list page.
+
+    "full" builds the whole document tree.  "fast" cuts the `table.items` and
+    pager fragments out of the raw HTML and builds only those subtrees,
+    falling back to a strained parse of the whole page if the cut fails.
+    Both give identical `extract_stats_from_page` / `get_paginated_urls` output
+    (tests/test_scraper.py checks this on the saved pages in tests/fixtures).
+    """
+    with instrumentation.stage("parse_page") as span:
+        span.add(bytes_read=len(html))
+        if (parser or PARSER) == "full":
+            return BeautifulSoup(html, "html.parser")
+        fragment = _page_fragments(html)
+        if fragment is None:
+            return BeautifulSoup(html, "html.parser", parse_only=PAGE_STRAINER)
+        return BeautifulSoup(fragment, "html.parser")
+
+
+COLUMNS = ["name", "value", "season", "nationality", "age"]
+
+def iter_page_rows(soup: BeautifulSoup, season: int):
+    """Yield (name, value, season, nationality, age) for each table row."""
     table = soup.find("table", class_="items")
     if not table:
-        return pd.DataFrame(columns=["name", "value", "season", "nationality", "age"])
+        return
 
-    rows = []
     for tr in table.select("tbody > tr"):
         name_td = tr.find("td", class_="hauptlink")
         stat_tds = tr.find_all("td", class_="zentriert")
@@ -82,15 +372,31 @@ def extract_stats_from_page(soup: BeautifulSoup, season: int) -> pd.DataFrame:
             continue
         value = int(value_txt)
 
-        rows.append((name, value, (season % 2000) + 1, nationality, age))
+        yield (name, value, (season % 2000) + 1, nationality, age)
 
-    return pd.DataFrame(rows,
-                        columns=["name", "value", "season", "nationality", "age"])
+
+def extract_stats_from_page(soup: BeautifulSoup, season: int) -> pd.DataFrame:
+    """Return DF with: name • value • season • nationality • age"""
+    with instrumentation.stage("extract") as span:
+        df = pd.DataFrame(list(iter_page_rows(soup, season)), columns=COLUMNS)
+        span.add(rows_out=len(df))
+        return df
 
 
 # --------------------------------------------------------------------------- #
 # -----------------------------  DB UTILITIES  ------------------------------ #
 # --------------------------------------------------------------------------- #
+BATCH_SIZE = 25                      # ≈ one list page, when batching by row count
+
+UPSERT_SQL = """
+    INSERT INTO {table} (name, value, season, nationality, age)
+    VALUES (?, ?, ?, ?, ?)
+    ON CONFLICT(name, season) DO UPDATE SET
+        value       = excluded.value,
+        nationality = COALESCE(excluded.nationality, {table}.nationality),
+        age         = COALESCE(excluded.age, {table}.age)
+"""
+
 def ensure_table(cur, table: str):
     cur.execute(
         f"""CREATE TABLE IF NOT EXISTS {table} (
@@ -111,65 +417,419 @@ def pythonify(df: pd.DataFrame) -> pd.DataFrame:
     return df.drop_duplicates(subset=["name", "season"])
 
 
-def insert_df(df: pd.DataFrame, db: str, table: str):
-    df = pythonify(df)
-    with sqlite3.connect(db) as conn:
-        cur = conn.cursor()
-        ensure_table(cur, table)
-
-        # dedupe any pre‑existing duplicates in the table ------------------
-        cur.execute(
-            f"""
-            DELETE FROM {table}
-            WHERE rowid NOT IN (
-                SELECT MIN(rowid) FROM {table} GROUP BY name, season
+def batched(rows, size: int = BATCH_SIZE):
+    """Group an iterable of rows into lists of at most `size`."""
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+def upsert_rows(conn: sqlite3.Connection, table: str, rows: list[tuple]):
+    """Upsert one batch in a single transaction."""
+    with conn:
+        conn.executemany(UPSERT_SQL.format(table=table), rows)
+
+
+def frame_rows(df: pd.DataFrame) -> list[tuple]:
+    """Rows of a name/value/season/nationality/age frame as bindable tuples.
+
+    Columns are converted with NumPy's `tolist()` (native ints/strs in C), and
+    missing values in the integer columns become None — no object‑dtype cast.
+    """
+    cols = []
+    for col in COLUMNS:
+        arr = df[col].to_numpy()
+        if col in ("value", "season", "age") and arr.dtype.kind == "f":
+            missing = np.isnan(arr)
+            vals = np.where(missing, 0, arr).astype(np.int64).tolist()
+            for i in np.flatnonzero(missing).tolist():
+                vals[i] = None
+        elif arr.dtype.kind in "iu":
+            vals = arr.tolist()
+        else:
+            vals = [None if v is None or v is pd.NA or v != v else v for v in arr.tolist()]
+        cols.append(vals)
+    return list(zip(*cols))
+
+
+class StatsWriter:
+    """One SQLite connection reused for a whole scrape run.
+
+    Opens the DB in WAL mode with relaxed fsyncs and a larger page cache, and
+    writes every batch as a single upsert transaction.  The PRIMARY KEY
+    already rules out duplicates, so the old full‑table dedupe only runs on
+    demand through `repair()`.
+    """
+
+    PRAGMAS = {
+        "journal_mode": "WAL",
+        "synchronous": "NORMAL",
+        "temp_store": "MEMORY",
+        "cache_size": -64_000,       # ~64 MB
+    }
+
+    def __init__(self, db):
+        self.conn = sqlite3.connect(str(db), check_same_thread=False)
+        self.lock = threading.RLock()            # serialises worker threads
+        for key, val in self.PRAGMAS.items():
+            self.conn.execute(f"PRAGMA {key} = {val}")
+        self._tables = set()
+
+    def ensure(self, table: str):
+        if table not in self._tables:
+            ensure_table(self.conn.cursor(), table)
+            self._tables.add(table)
+
+    def write(self, table: str, rows: list[tuple]) -> int:
+        with instrumentation.stage("insert") as span, self.lock:
+            self.ensure(table)
+            upsert_rows(self.conn, table, rows)
+            span.add(rows_in=len(rows))
+        return len(rows)
+
+    def write_df(self, table: str, df: pd.DataFrame) -> int:
+        return self.write(table, frame_rows(df.drop_duplicates(subset=["name", "season"])))
+
+    def repair(self, table: str) -> int:
+        """Drop duplicate (name, season) rows left by tables built without a key."""
+        self.ensure(table)
+        with self.lock, self.conn:
+            cur = self.conn.execute(
+                f"""
+                DELETE FROM {table}
+                WHERE rowid NOT IN (
+                    SELECT MIN(rowid) FROM {table} GROUP BY name, season
+                )
+            """
             )
-        """
-        )
+        return cur.rowcount
 
-        cur.executemany(
-            f"""
-            INSERT INTO {table} (name, value, season, nationality, age)
-            VALUES (?, ?, ?, ?, ?)
-            ON CONFLICT(name, season) DO UPDATE SET
-                value       = excluded.value,
-                nationality = COALESCE(excluded.nationality, {table}.nationality),
-                age         = COALESCE(excluded.age, {table}.age)
-            """,
-            list(df.itertuples(index=False, name=None)),
-        )
-        conn.commit()
+    def close(self):
+        self.conn.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def insert_df(df: pd.DataFrame, db: str, table: str):
+    with StatsWriter(db) as writer:
+        writer.write_df(table, df)
 
 
 # --------------------------------------------------------------------------- #
 # -----------------------------  TOP‑LEVEL LOOP  ---------------------------- #
 # --------------------------------------------------------------------------- #
-def scrape_season(stat_type: str, season: int) -> pd.DataFrame:
+def iter_season_pages(stat_type: str, season: int, workers: int = 1,
+                      base: str = BASE_URL):
+    """Yield the parsed soup of every list page of one season, in page order.
+
+    With `workers > 1` the paginated pages are fetched on a thread pool behind
+    the host's token bucket and parsed as each download completes; a small
+    reorder buffer releases them in page order so output matches the serial
+    loop.
+    """
     print(f"  ↳ {stat_type} {season}/{season+1}")
-    soup = BeautifulSoup(fetch(build_url(stat_type, season)), "html.parser")
-    df = extract_stats_from_page(soup, season)
+    first_url = build_url(stat_type, season, base)
+    soup = parse_page(fetch(first_url))
+    yield soup
+    page_urls = get_paginated_urls(soup, first_url)
+
+    if workers > 1 and page_urls:
+        limiter = limiter_for(first_url)
+        with ThreadPoolExecutor(max_workers=min(workers, MAX_WORKERS)) as pool:
+            futures = {pool.submit(fetch, url, limiter=limiter): i
+                       for i, url in enumerate(page_urls)}
+            ready, next_i = {}, 0
+            for fut in as_completed(futures):
+                ready[futures[fut]] = parse_page(fut.result())
+                while next_i in ready:
+                    yield ready.pop(next_i)
+                    next_i += 1
+    else:
+        for page_url in page_urls:
+            yield parse_page(fetch(page_url))
+
+
+def iter_season_batches(stat_type: str, season: int, workers: int = 1,
+                        base: str = BASE_URL):
+    """Yield each page's rows as one list, first occurrence of a name wins."""
+    seen = set()
+    for soup in iter_season_pages(stat_type, season, workers, base):
+        with instrumentation.stage("extract") as span:
+            rows = list(iter_page_rows(soup, season))
+            span.add(rows_out=len(rows))
+        new = []
+        for row in rows:
+            if row[0] not in seen:
+                seen.add(row[0])
+                new.append(row)
+        yield new
+
+
+def iter_season_rows(stat_type: str, season: int, workers: int = 1,
+                     base: str = BASE_URL):
+    """Yield the season's rows page by page, first occurrence of a name wins."""
+    for rows in iter_season_batches(stat_type, season, workers, base):
+        yield from rows
+
+
+def scrape_season(stat_type: str, season: int, workers: int = 1,
+                  base: str = BASE_URL) -> pd.DataFrame:
+    """Scrape every list page of one season into a DataFrame."""
+    rows = list(iter_season_rows(stat_type, season, workers, base))
+    return pythonify(pd.DataFrame(rows, columns=COLUMNS))
+
 
-    for page_url in get_paginated_urls(soup):
-        page = BeautifulSoup(fetch(page_url), "html.parser")
-        df = pd.concat([df, extract_stats_from_page(page, season)], ignore_index=True)
+def stream_season(stat_type: str, season: int, writer: StatsWriter,
+                  table: str, workers: int = 1, base: str = BASE_URL,
+                  batch_size: int | None = None) -> int:
+    """Scrape one season straight into `table`, committing every page
+    (or every `batch_size` rows if given).
 
-    return pythonify(df)
+    Memory stays bounded by one page, and pages already written survive a
+    failure later in the season.  Returns the number of rows.
+    """
+    if batch_size:
+        batches = batched(iter_season_rows(stat_type, season, workers, base), batch_size)
+    else:
+        batches = iter_season_batches(stat_type, season, workers, base)
+    n = 0
+    for batch in batches:
+        if batch:
+            n += writer.write(table, batch)
+    return n
 
 
 def scrape_and_save(stat_type: str, first: int, last: int,
-                    db: str, suffix: str = "_plus"):
+                    db: str, suffix: str = "_plus", workers: int = 1,
+                    batch_size: int | None = None, writer: StatsWriter | None = None):
     table = stat_type + suffix
     failed = []
-    for yr in range(first, last + 1):
-        try:
-            insert_df(scrape_season(stat_type, yr), db, table)
-        except Exception as e:
-            print(f"⚠️  {table} {yr}/{yr+1} failed → {e}", file=sys.stderr)
-            failed.append((stat_type, yr))
+    own_writer = writer is None
+    writer = writer or StatsWriter(db)
+    try:
+        for yr in range(first, last + 1):
+            try:
+                stream_season(stat_type, yr, writer, table, workers=workers,
+                              batch_size=batch_size)
+            except Exception as e:
+                print(f"⚠️  {table} {yr}/{yr+1} failed → {e}", file=sys.stderr)
+                failed.append((stat_type, yr))
+    finally:
+        if own_writer:
+            writer.close()
     if failed:
         print("\n❌  Still missing:", failed)
 
 
+# --------------------------------------------------------------------------- #
+# ------------------------------  JOB QUEUE  -------------------------------- #
+# --------------------------------------------------------------------------- #
+class JobQueue:
+    """Durable (competition, stat_type, season, page) work list in SQLite.
+
+    Page‑1 jobs are seeded up front; finishing one enqueues the season's
+    remaining pages.  A job's rows and its `done` state are committed in the
+    same transaction, so an interrupted run resumes exactly where it stopped.
+    Pages finish in any order, so `scrape_row_pages` remembers which page
+    each stored name came from: as in `iter_season_rows`, the first page
+    listing a name wins.
+    """
+
+    MAX_ATTEMPTS = 3
+
+    def __init__(self, writer: StatsWriter):
+        self.writer = writer
+        self.conn = writer.conn
+        self.lock = writer.lock
+        self._active = 0
+        with self.lock, self.conn:
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS scrape_jobs (
+                    competition TEXT,
+                    stat_type TEXT,
+                    season INTEGER,
+                    page INTEGER,
+                    url TEXT,
+                    state TEXT DEFAULT 'pending',
+                    attempts INTEGER DEFAULT 0,
+                    rows INTEGER,
+                    error TEXT,
+                    claimed_at REAL,
+                    finished_at REAL,
+                    PRIMARY KEY (competition, stat_type, season, page)
+                )"""
+            )
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS scrape_jobs_state ON scrape_jobs (state)"
+            )
+            self.conn.execute(
+                """CREATE TABLE IF NOT EXISTS scrape_row_pages (
+                    competition TEXT,
+                    stat_type TEXT,
+                    season INTEGER,
+                    name TEXT,
+                    page INTEGER,
+                    PRIMARY KEY (competition, stat_type, season, name)
+                )"""
+            )
+
+    def seed(self, competitions, stat_types, first: int, last: int,
+             resume: bool = False, base: str = BASE_URL):
+        """Queue page 1 of every season; without `resume` the scope starts over."""
+        jobs = [(c, st, yr, 1, build_url(st, yr, base, c))
+                for c in competitions for st in stat_types
+                for yr in range(first, last + 1)]
+        with self.lock, self.conn:
+            if resume:
+                self.conn.execute(
+                    "UPDATE scrape_jobs SET state = 'pending', attempts = 0 "
+                    "WHERE state IN ('running', 'failed')"
+                )
+            else:
+                for done_table in ("scrape_jobs", "scrape_row_pages"):
+                    self.conn.executemany(
+                        f"DELETE FROM {done_table} WHERE competition = ? AND stat_type = ? AND season = ?",
+                        [j[:3] for j in jobs],
+                    )
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO scrape_jobs (competition, stat_type, season, page, url) "
+                "VALUES (?, ?, ?, ?, ?)",
+                jobs,
+            )
+
+    def claim(self):
+        with self.lock, self.conn:
+            job = self.conn.execute(
+                """UPDATE scrape_jobs
+                   SET state = 'running', attempts = attempts + 1, claimed_at = ?
+                   WHERE rowid = (SELECT rowid FROM scrape_jobs WHERE state = 'pending'
+                                  ORDER BY page, season LIMIT 1)
+                   RETURNING competition, stat_type, season, page, url""",
+                (time.time(),),
+            ).fetchone()
+            if job:
+                self._active += 1
+            return job
+
+    def in_flight(self) -> int:
+        with self.lock:
+            return self._active
+
+    def _first_listings(self, job, rows: list[tuple]) -> list[tuple]:
+        """The rows whose name no earlier page of the season has listed (call under the lock)."""
+        comp, stat_type, season, page, _ = job
+        keep = []
+        for row in rows:
+            cur = self.conn.execute(
+                """INSERT INTO scrape_row_pages VALUES (?, ?, ?, ?, ?)
+                   ON CONFLICT (competition, stat_type, season, name) DO UPDATE
+                   SET page = excluded.page WHERE excluded.page < scrape_row_pages.page""",
+                (comp, stat_type, season, row[0], page),
+            )
+            if cur.rowcount:
+                keep.append(row)
+        return keep
+
+    def complete(self, job, rows: list[tuple], next_urls: list[str]):
+        comp, stat_type, season, page, _ = job
+        table = table_for(stat_type, comp)
+        with instrumentation.stage("insert") as span, self.lock, self.conn:
+            span.add(rows_in=len(rows))
+            self.writer.ensure(table)
+            self.conn.executemany(UPSERT_SQL.format(table=table), self._first_listings(job, rows))
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO scrape_jobs (competition, stat_type, season, page, url) "
+                "VALUES (?, ?, ?, ?, ?)",
+                [(comp, stat_type, season, p, url) for p, url in enumerate(next_urls, start=2)],
+            )
+            self.conn.execute(
+                """UPDATE scrape_jobs SET state = 'done', rows = ?, error = NULL, finished_at = ?
+                   WHERE competition = ? AND stat_type = ? AND season = ? AND page = ?""",
+                (len(rows), time.time(), comp, stat_type, season, page),
+            )
+            self._active -= 1
+
+    def fail(self, job, exc: Exception):
+        with self.lock, self.conn:
+            self.conn.execute(
+                """UPDATE scrape_jobs
+                   SET state = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END,
+                       error = ?, finished_at = ?
+                   WHERE competition = ? AND stat_type = ? AND season = ? AND page = ?""",
+                (self.MAX_ATTEMPTS, str(exc), time.time(), *job[:4]),
+            )
+            self._active -= 1
+
+    def status(self, window: float = 3600) -> str:
+        with self.lock:
+            counts = self.conn.execute(
+                """SELECT competition, stat_type,
+                          SUM(state = 'pending'), SUM(state = 'running'),
+                          SUM(state = 'done'), SUM(state = 'failed'),
+                          COALESCE(SUM(rows), 0)
+                   FROM scrape_jobs GROUP BY competition, stat_type
+                   ORDER BY competition, stat_type"""
+            ).fetchall()
+            recent, first_t, last_t = self.conn.execute(
+                "SELECT COUNT(*), MIN(finished_at), MAX(finished_at) FROM scrape_jobs "
+                "WHERE state = 'done' AND finished_at > ?",
+                (time.time() - window,),
+            ).fetchone()
+
+        lines = [f"{'comp':<5} {'stat':<8} {'pending':>7} {'running':>7} "
+                 f"{'done':>6} {'failed':>6} {'rows':>8}"]
+        lines += [f"{c:<5} {st:<8} {p:>7} {r:>7} {d:>6} {f:>6} {n:>8}"
+                  for c, st, p, r, d, f, n in counts]
+        backlog = sum(row[2] + row[3] for row in counts)
+        if recent > 1 and last_t > first_t:
+            per_min = (recent - 1) / (last_t - first_t) * 60
+            lines.append(f"throughput: {per_min:.1f} pages/min over the last "
+                         f"{window / 60:.0f} min • backlog {backlog} pages "
+                         f"(~{backlog / per_min:.1f} min)")
+        else:
+            lines.append(f"backlog: {backlog} pages")
+        return "\n".join(lines)
+
+
+def run_job(queue: JobQueue, job, limiter: bool = True):
+    comp, stat_type, season, page, url = job
+    soup = parse_page(fetch(url, limiter=limiter_for(url) if limiter else None))
+    with instrumentation.stage("extract") as span:
+        rows = list(iter_page_rows(soup, season))
+        span.add(rows_out=len(rows))
+    queue.complete(job, rows, get_paginated_urls(soup, url) if page == 1 else [])
+
+
+def run_jobs(queue: JobQueue, workers: int = 1):
+    """Drain the queue with `workers` threads; page fetches share per‑host limits."""
+    def worker():
+        while True:
+            job = queue.claim()
+            if job is None:
+                if not queue.in_flight():
+                    return
+                time.sleep(0.2)        # a running page 1 may still enqueue pages
+                continue
+            try:
+                run_job(queue, job, limiter=workers > 1)
+            except Exception as e:
+                print(f"⚠️  {job[0]} {job[1]} {job[2]} p{job[3]} failed → {e}", file=sys.stderr)
+                queue.fail(job, e)
+
+    with ThreadPoolExecutor(max_workers=min(workers, MAX_WORKERS)) as pool:
+        for fut in [pool.submit(worker) for _ in range(min(workers, MAX_WORKERS))]:
+            fut.result()
+
+
 # --------------------------------------------------------------------------- #
 # ---------------------------------  CLI  ----------------------------------- #
 # --------------------------------------------------------------------------- #
@@ -179,11 +839,55 @@ if __name__ == "__main__":
                         default="both", help="what to scrape")
     parser.add_argument("start", nargs="?", type=int, default=2014)
     parser.add_argument("end",   nargs="?", type=int, default=2022)
+    parser.add_argument("--competition", nargs="+", default=["GB1"],
+                        choices=list(COMPETITIONS), help="Transfermarkt competition codes")
+    parser.add_argument("--workers", type=int, default=1,
+                        help="concurrent page jobs (1 = serial)")
+    parser.add_argument("--resume", action="store_true",
+                        help="continue the job queue instead of starting the range over")
+    parser.add_argument("--status", action="store_true",
+                        help="show job‑queue progress and exit")
+    parser.add_argument("--rate", type=float, default=DEFAULT_RATE,
+                        help="max requests/second per host when --workers > 1")
+    parser.add_argument("--burst", type=int, default=DEFAULT_BURST,
+                        help="token‑bucket burst size per host")
+    parser.add_argument("--cache", default=HTTP_CACHE_DB,
+                        help="on‑disk response cache (SQLite file)")
+    parser.add_argument("--no-cache", action="store_true",
+                        help="always hit the network")
+    parser.add_argument("--cache-max-mb", type=int, default=256)
+    parser.add_argument("--current-ttl", type=float, default=3600,
+                        help="seconds before current‑season pages are revalidated")
+    parser.add_argument("--parser", choices=["fast", "full"], default=PARSER,
+                        help="list‑page parser backend")
+    parser.add_argument("--repair", action="store_true",
+                        help="only dedupe existing (name, season) rows, don't scrape")
     args = parser.parse_args()
 
-    DB_PATH = pathlib.Path("../data/fifa_players.db")
+    PARSER = args.parser
+
+    DB_PATH = pathlib.Path(FIFA_DB)
+    configure_rate_limit(urlsplit(BASE_URL).netloc, args.rate, args.burst)
+    if not args.no_cache:
+        enable_cache(args.cache, max_bytes=args.cache_max_mb * 2**20,
+                     current_ttl=args.current_ttl)
+
+    stat_types = ["goals", "assists"] if args.only == "both" else [args.only]
+
+    with StatsWriter(DB_PATH) as writer:
+        queue = JobQueue(writer)
+        if args.status:
+            print(queue.status())
+        elif args.repair:
+            for comp in args.competition:
+                for stat_type in stat_types:
+                    table = table_for(stat_type, comp)
+                    print(f"{table}: removed {writer.repair(table)} duplicates")
+        else:
+            queue.seed(args.competition, stat_types, args.start, args.end,
+                       resume=args.resume)
+            run_jobs(queue, workers=args.workers)
+            print("\n" + queue.status())
 
-    if args.only in ("goals", "both"):
-        scrape_and_save("goals",   args.start, args.end, DB_PATH)
-    if args.only in ("assists", "both"):
-        scrape_and_save("assists", args.start, args.end, DB_PATH)
+    if CACHE is not None:
+        print("\n" + CACHE.report())
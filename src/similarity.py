@@ -0,0 +1,259 @@
+import argparse
+import json
+import os
+import shutil
+
+import numpy as np
+
+from paths import FIFA_DB, data_path
+from pipeline import POSITION_MAP, PreprocessingPipeline
+
+# "Which players look most like X in FIFA 22?"  Players are indexed as
+# standardized `select_columns` attribute vectors (optionally joined with the
+# trained player embeddings) and searched exactly: queries are scored against
+# blocks of rows with one matrix product per block, keeping a running top-k.
+# Rows are sorted by (fifa_version, player_id), so a version filter is a
+# contiguous slice and a player's row is a binary search.  The index is a
+# directory of .npy files, memory-mapped on load.
+
+INDEX_DIR = data_path("similarity_index")
+SOURCE_TABLE = "test"                     # load_csv_sql_db's default table
+BLOCK_ROWS = 32_768
+DEFAULT_K = 10
+
+# Attribute columns of the pipeline output compared between players; ids,
+# targets and position codes are left out (positions are a filter instead).
+ATTRIBUTE_COLUMNS = [
+    'overall', 'potential', 'age', 'height_cm', 'weight_kg', 'preferred_foot',
+    'weak_foot', 'skill_moves', 'international_reputation',
+    'pace', 'shooting', 'passing', 'dribbling', 'defending', 'physic',
+    'attacking_crossing', 'attacking_finishing', 'log_value_eur', 'log_wage_eur',
+]
+META_ARRAYS = ['player_id', 'fifa_version', 'league_id', 'positions', 'short_name', 'club_name']
+
+
+def position_masks(player_positions) -> np.ndarray:
+    """int32 bitmask of every listed position ('ST, LW' → bits of ST and LW)."""
+    import pandas as pd
+    codes, uniques = pd.factorize(pd.Series(player_positions, dtype=object).fillna(''))
+    masks = np.array([sum(1 << POSITION_MAP[p.strip()] for p in u.split(',') if p.strip() in POSITION_MAP)
+                      for u in uniques] + [0], dtype=np.int32)
+    return masks[codes]
+
+
+class SimilarityIndex:
+    """Standardized player vectors plus the metadata used for filters and output."""
+
+    def __init__(self, vectors: np.ndarray, meta: dict, info: dict):
+        self.vectors = vectors            # (n, d) float32, rows by (fifa_version, player_id)
+        self.meta = meta
+        self.info = info
+        self.sq_norms = np.einsum('ij,ij->i', vectors, vectors, dtype=np.float32)
+        values, starts = np.unique(np.asarray(meta['fifa_version']), return_index=True)
+        ends = np.append(starts[1:], len(vectors))
+        self.versions = {int(v): (int(lo), int(hi)) for v, lo, hi in zip(values, starts, ends)}
+
+    # ---- building / persistence ---- #
+    @classmethod
+    def build(cls, df: "pd.DataFrame", pipeline: PreprocessingPipeline | None = None,
+              embeddings: np.ndarray | None = None, embedding_weight: float = 1.0) -> "SimilarityIndex":
+        """Index raw player rows (the ingest schema; latest fifa_update per version kept).
+
+        Without a `pipeline` one is fitted on `df`.  `embeddings` is a
+        player_emb table whose rows are codes of `pipeline` (the one the model
+        was trained with); players it doesn't know get its mean row.
+        """
+        df = df.sort_values(['fifa_version', 'player_id', 'fifa_update'])
+        df = df.drop_duplicates(['fifa_version', 'player_id'], keep='last').reset_index(drop=True)
+        if 'goals' not in df:
+            df = df.assign(goals=np.nan, assists=np.nan)
+        pipeline = pipeline or PreprocessingPipeline.fit(df)
+        out = pipeline.transform_frame(df)
+
+        x = out[ATTRIBUTE_COLUMNS].to_numpy(dtype=np.float64)
+        blocks, columns = [x], list(ATTRIBUTE_COLUMNS)
+        if embeddings is not None:
+            codes = out['player_id'].to_numpy(dtype=np.int64)
+            table = np.vstack([embeddings, embeddings.mean(0, keepdims=True)])
+            codes[(codes < 0) | (codes >= len(embeddings))] = len(embeddings)
+            blocks.append(table[codes].astype(np.float64))
+            columns += [f'emb_{i}' for i in range(embeddings.shape[1])]
+        x = np.hstack(blocks)
+        means, scales = np.nanmean(x, axis=0), np.nanstd(x, axis=0)
+        scales[~(scales > 0)] = 1.0
+        weights = np.ones(len(columns))
+        weights[len(ATTRIBUTE_COLUMNS):] = embedding_weight
+        vectors = np.nan_to_num((x - means) / scales) * weights    # missing → population mean
+
+        meta = {'player_id': df['player_id'].to_numpy(dtype=np.int32),
+                'fifa_version': df['fifa_version'].to_numpy(dtype=np.int16),
+                'league_id': df['league_id'].fillna(-1).to_numpy(dtype=np.int32),
+                'positions': position_masks(df['player_positions']),
+                'short_name': df['short_name'].fillna('').to_numpy(dtype=str),
+                'club_name': df['club_name'].fillna('').to_numpy(dtype=str)}
+        info = {'columns': columns, 'means': means.tolist(), 'scales': scales.tolist(),
+                'weights': weights.tolist(), 'rows': len(df)}
+        return cls(np.ascontiguousarray(vectors, dtype=np.float32), meta, info)
+
+    def save(self, path: str = INDEX_DIR):
+        """One .npy per array plus info.json, swapped in with a rename."""
+        tmp = f"{path}.tmp{os.getpid()}"
+        os.makedirs(tmp, exist_ok=True)
+        np.save(os.path.join(tmp, "vectors.npy"), self.vectors)
+        for name in META_ARRAYS:
+            np.save(os.path.join(tmp, f"{name}.npy"), self.meta[name])
+        with open(os.path.join(tmp, "info.json"), "w") as f:
+            json.dump(self.info, f)
+        if os.path.isdir(path):
+            shutil.rmtree(path)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str = INDEX_DIR, mmap_mode: str | None = 'r') -> "SimilarityIndex":
+        with open(os.path.join(path, "info.json")) as f:
+            info = json.load(f)
+        meta = {name: np.load(os.path.join(path, f"{name}.npy"), mmap_mode=mmap_mode)
+                for name in META_ARRAYS}
+        return cls(np.load(os.path.join(path, "vectors.npy"), mmap_mode=mmap_mode), meta, info)
+
+    # ---- searching ---- #
+    def row_of(self, player_id: int, fifa_version: int) -> int | None:
+        lo, hi = self.versions.get(int(fifa_version), (0, 0))
+        i = lo + int(np.searchsorted(self.meta['player_id'][lo:hi], player_id))
+        return i if i < hi and self.meta['player_id'][i] == player_id else None
+
+    def candidates(self, fifa_version: int | None = None, position: str | None = None,
+                   league_id: int | None = None) -> tuple[int, int, np.ndarray | None]:
+        """(lo, hi, rows): the version slice, and the rows within it passing the
+        other filters (None = every row of the slice)."""
+        lo, hi = (0, len(self.vectors)) if fifa_version is None \
+            else self.versions.get(int(fifa_version), (0, 0))
+        keep = None
+        if position is not None:
+            keep = (np.asarray(self.meta['positions'][lo:hi]) & (1 << POSITION_MAP[position])) != 0
+        if league_id is not None:
+            in_league = np.asarray(self.meta['league_id'][lo:hi]) == league_id
+            keep = in_league if keep is None else keep & in_league
+        return lo, hi, None if keep is None else lo + np.flatnonzero(keep)
+
+    def query(self, queries: np.ndarray, k: int = DEFAULT_K, exclude: np.ndarray | None = None,
+              block_rows: int = BLOCK_ROWS, **filters) -> tuple[np.ndarray, np.ndarray]:
+        """(rows, distances) of the k nearest indexed players for each query vector.
+
+        `exclude` holds one row per query to skip (e.g. the query player
+        itself).  Missing neighbours (fewer than k candidates) are row -1.
+        """
+        q = np.atleast_2d(np.asarray(queries, dtype=np.float32))
+        m = len(q)
+        q_sq = np.einsum('ij,ij->i', q, q)
+        exclude = None if exclude is None else np.asarray(exclude)
+        best_d = np.full((m, k), np.inf, dtype=np.float32)
+        best_i = np.full((m, k), -1, dtype=np.int64)
+        lo, hi, rows = self.candidates(**filters)
+        n = hi - lo if rows is None else len(rows)
+        for start in range(0, n, block_rows):
+            if rows is None:
+                idx = np.arange(lo + start, min(lo + start + block_rows, hi))
+                block, sq = self.vectors[idx[0]:idx[-1] + 1], self.sq_norms[idx[0]:idx[-1] + 1]
+            else:
+                idx = rows[start:start + block_rows]
+                block, sq = self.vectors[idx], self.sq_norms[idx]
+            d = q @ block.T
+            d *= -2
+            d += q_sq[:, None]
+            d += sq[None, :]
+            if exclude is not None:           # idx is ascending: one binary search per query
+                pos = np.minimum(np.searchsorted(idx, exclude), len(idx) - 1)
+                hit = idx[pos] == exclude
+                d[np.flatnonzero(hit), pos[hit]] = np.inf
+            if d.shape[1] > k:
+                part = np.argpartition(d, k - 1, axis=1)[:, :k]
+                d, cand = np.take_along_axis(d, part, axis=1), idx[part]
+            else:
+                cand = np.broadcast_to(idx, d.shape)
+            d_all, i_all = np.hstack([best_d, d]), np.hstack([best_i, cand])
+            keep = np.argpartition(d_all, k - 1, axis=1)[:, :k]
+            best_d, best_i = np.take_along_axis(d_all, keep, axis=1), np.take_along_axis(i_all, keep, axis=1)
+        # the expanded form loses precision near 0: recompute the k winners directly
+        found = np.isfinite(best_d)
+        diff = q[:, None, :] - self.vectors[np.where(found, best_i, 0)]
+        best_d = np.where(found, np.sqrt(np.einsum('ijk,ijk->ij', diff, diff)), np.inf)
+        order = np.argsort(best_d, axis=1)
+        best_d, best_i = np.take_along_axis(best_d, order, axis=1), np.take_along_axis(best_i, order, axis=1)
+        best_i[~np.isfinite(best_d)] = -1
+        return best_i, best_d
+
+    def similar(self, player_ids, fifa_version: int, k: int = DEFAULT_K,
+                target_version: int | None = None, **filters) -> "pd.DataFrame":
+        """Top-k look-alikes of players (as of `fifa_version`) among the players of
+        `target_version` (default: the same version) passing `filters`."""
+        import pandas as pd
+        player_ids = np.atleast_1d(player_ids)
+        rows = [self.row_of(p, fifa_version) for p in player_ids]
+        missing = [int(p) for p, r in zip(player_ids, rows) if r is None]
+        if missing:
+            raise KeyError(f"not indexed for FIFA {fifa_version}: {missing}")
+        rows = np.array(rows)
+        found, dist = self.query(self.vectors[rows], k, exclude=rows,
+                                 fifa_version=fifa_version if target_version is None else target_version,
+                                 **filters)
+        out = []
+        for qi, (pid, hits, ds) in enumerate(zip(player_ids, found, dist)):
+            for rank, (r, d) in enumerate(zip(hits, ds), 1):
+                if r >= 0:
+                    out.append({'query_id': int(pid), 'query_name': str(self.meta['short_name'][rows[qi]]),
+                                'rank': rank, 'player_id': int(self.meta['player_id'][r]),
+                                'short_name': str(self.meta['short_name'][r]),
+                                'club_name': str(self.meta['club_name'][r]),
+                                'fifa_version': int(self.meta['fifa_version'][r]),
+                                'distance': float(d)})
+        return pd.DataFrame(out)
+
+
+def load_embeddings(weights_path: str) -> np.ndarray:
+    """player_emb from `training.py --export` weights (the mean row NumpyModel adds is dropped)."""
+    from numpy_inference import NumpyModel
+    model = NumpyModel.load(weights_path)
+    if 'player_emb' not in model.embeddings:
+        raise ValueError(f"{weights_path} has no player embeddings (a 'plain' model)")
+    return model.embeddings['player_emb'][:-1]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="similar-player search index")
+    sub = parser.add_subparsers(dest="action", required=True)
+    build = sub.add_parser("build", help="index the players of an ingested table")
+    build.add_argument("--db", default=FIFA_DB)
+    build.add_argument("--table", default=SOURCE_TABLE)
+    build.add_argument("--index", default=INDEX_DIR)
+    build.add_argument("--embeddings", nargs="?", const=data_path("embedded_model.npz"), metavar="WEIGHTS",
+                       help="also use player embeddings (exported weights; uses the saved pipeline)")
+    build.add_argument("--embedding-weight", type=float, default=1.0)
+    query = sub.add_parser("query", help="players most like the given ones")
+    query.add_argument("player_ids", nargs="+", type=int)
+    query.add_argument("--version", type=int, required=True, help="fifa_version of the query players")
+    query.add_argument("--in-version", type=int, default=None, help="search this version instead")
+    query.add_argument("--position", default=None, choices=sorted(POSITION_MAP))
+    query.add_argument("--league", type=int, default=None, help="league_id filter")
+    query.add_argument("-k", type=int, default=DEFAULT_K)
+    query.add_argument("--index", default=INDEX_DIR)
+    args = parser.parse_args()
+
+    if args.action == "build":
+        from data_access import query_frame
+        from pipeline import PIPELINE_PATH
+        df = query_frame(args.db, f"SELECT * FROM {args.table}")
+        embeddings = pipeline = None
+        if args.embeddings:
+            embeddings, pipeline = load_embeddings(args.embeddings), PreprocessingPipeline.load(PIPELINE_PATH)
+        index = SimilarityIndex.build(df, pipeline, embeddings, args.embedding_weight)
+        index.save(args.index)
+        print(f"✅ {index.info['rows']:,} players × {len(index.info['columns'])} dims indexed to {args.index}")
+    else:
+        index = SimilarityIndex.load(args.index)
+        try:
+            result = index.similar(args.player_ids, args.version, args.k, args.in_version,
+                                   position=args.position, league_id=args.league)
+        except KeyError as exc:
+            parser.exit(1, f"{exc.args[0]}\n")
+        print(result.to_string(index=False) if len(result) else "no players match the filters")
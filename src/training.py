@@ -0,0 +1,333 @@
+import argparse
+import itertools
+import json
+import os
+import sqlite3
+import time
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import torch
+import torch.nn as nn
+import torch.nn.functional as F
+import torch.optim as optim
+from torch.utils.data import TensorDataset, DataLoader
+
+from paths import FIFA_DB, data_path
+from numpy_inference import TOLERANCE, WEIGHTS_PATH, export_weights
+from preprocessing import ARRAYS_DIR, load_training_arrays
+
+RESULTS_DB = FIFA_DB
+MODEL_PATH = data_path("embedded_model.pt")
+RESULTS_TABLE = "training_runs"
+SPLIT_VERSION = 22                  # train on fifa_version < 22, test on >= 22
+
+DEFAULT_CONFIG = {
+    'model': 'embedded',            # 'plain' = Model, 'embedded' = EmbeddedModel
+    'lr': 0.001,
+    'gamma': 0.075,
+    'step_size': 100,               # StepLR step, in epochs
+    'epochs': 285,
+    'batch_size': 256,              # None = full batch, as in the notebook
+    'embed_dim': 8,
+    'seed': 0,
+}
+
+
+# --------------------------------------------------------------------------- #
+# --------------------------------  MODELS  --------------------------------- #
+# --------------------------------------------------------------------------- #
+class Model(nn.Module):
+    def __init__(self, in_features=43, h1=128, h2=64, h3=32, out_features=2):
+        super().__init__()
+        self.fc1 = nn.Linear(in_features, h1)
+        self.fc2 = nn.Linear(h1, h2)
+        self.fc3 = nn.Linear(h2, h3)
+        self.out = nn.Linear(h3, out_features)
+
+    def forward(self, x, player_ids=None, club_ids=None):
+        x = F.leaky_relu(self.fc1(x))
+        x = F.leaky_relu(self.fc2(x))
+        x = F.leaky_relu(self.fc3(x))
+        return self.out(x)
+
+
+class EmbeddedModel(nn.Module):
+    def __init__(self, player_vocab_size, club_vocab_size, embed_dim=8, in_features=43,
+                 h1=128, h2=64, h3=32, out_features=2):
+        super().__init__()
+        self.player_emb = nn.Embedding(player_vocab_size, embed_dim)
+        self.club_emb = nn.Embedding(club_vocab_size, embed_dim)
+
+        self.fc1 = nn.Linear(in_features + 2 * embed_dim, h1)
+        self.fc2 = nn.Linear(h1, h2)
+        self.fc3 = nn.Linear(h2, h3)
+        self.out = nn.Linear(h3, out_features)
+
+    def forward(self, x, player_ids, club_ids):
+        player_vec = self.player_emb(player_ids)
+        club_vec = self.club_emb(club_ids)
+        x = torch.cat([x, player_vec, club_vec], dim=1)
+        x = F.leaky_relu(self.fc1(x))
+        x = F.leaky_relu(self.fc2(x))
+        x = F.leaky_relu(self.fc3(x))
+        return self.out(x)
+
+
+def build_model(config: dict, schema: dict) -> nn.Module:
+    in_features = len(schema['feature_columns'])
+    if config['model'] == 'plain':
+        return Model(in_features=in_features)
+    return EmbeddedModel(schema['player_vocab_size'], schema['club_vocab_size'],
+                         config['embed_dim'], in_features=in_features)
+
+
+# --------------------------------------------------------------------------- #
+# ---------------------------------  DATA  ---------------------------------- #
+# --------------------------------------------------------------------------- #
+def load_split(arrays_dir: str = ARRAYS_DIR, split_version: int = SPLIT_VERSION):
+    """(schema, train tensors, test tensors) from the memory-mapped training arrays.
+
+    Each tensor tuple is (X, Y, player_ids, club_ids); ids are int64 for
+    nn.Embedding.  Rows are selected by fifa_version, as in the notebook.
+    """
+    schema, arrays = load_training_arrays(arrays_dir)
+    train = np.asarray(arrays['fifa_version']) < split_version
+
+    def tensors(mask):
+        return (torch.from_numpy(np.ascontiguousarray(arrays['features'][mask])),
+                torch.from_numpy(np.ascontiguousarray(arrays['targets'][mask])),
+                torch.from_numpy(arrays['player_ids'][mask].astype(np.int64)),
+                torch.from_numpy(arrays['club_ids'][mask].astype(np.int64)))
+
+    return schema, tensors(train), tensors(~train)
+
+
+def make_loader(tensors, batch_size: int | None, seed: int = 0) -> DataLoader:
+    """Shuffled mini-batches over in-memory tensors (no worker processes)."""
+    dataset = TensorDataset(*tensors)
+    return DataLoader(dataset, batch_size=batch_size or len(dataset), shuffle=True,
+                      generator=torch.Generator().manual_seed(seed))
+
+
+# --------------------------------------------------------------------------- #
+# -------------------------------  TRAINING  -------------------------------- #
+# --------------------------------------------------------------------------- #
+def train_one(config: dict, schema: dict, train, test, threads: int | None = None) -> dict:
+    """Train one config; returns its result row (losses, wall time, test loss)."""
+    config = {**DEFAULT_CONFIG, **config}
+    if threads:
+        torch.set_num_threads(threads)
+    torch.manual_seed(config['seed'])
+
+    model = build_model(config, schema)
+    criterion = nn.SmoothL1Loss()
+    optimizer = optim.Adam(model.parameters(), lr=config['lr'])
+    scheduler = optim.lr_scheduler.StepLR(optimizer, step_size=config['step_size'],
+                                          gamma=config['gamma'])
+    loader = make_loader(train, config['batch_size'], config['seed'])
+
+    t0 = time.perf_counter()
+    epoch_losses = []
+    for epoch in range(config['epochs']):
+        model.train()
+        total = 0.0
+        for x, y, player_ids, club_ids in loader:
+            loss = criterion(model(x, player_ids, club_ids), y)
+            optimizer.zero_grad()
+            loss.backward()
+            optimizer.step()
+            total += loss.item() * len(x)
+        scheduler.step()
+        epoch_losses.append(total / len(loader.dataset))
+
+    model.eval()
+    with torch.no_grad():
+        x, y, player_ids, club_ids = test
+        test_loss = criterion(model(x, player_ids, club_ids), y).item()
+
+    return {'config': config, 'epoch_losses': epoch_losses,
+            'wall_s': time.perf_counter() - t0, 'test_loss': test_loss,
+            'threads': torch.get_num_threads(), 'model': model}
+
+
+def save_checkpoint(model: nn.Module, config: dict, schema: dict, path: str = MODEL_PATH):
+    """Weights plus everything needed to rebuild the model without the arrays."""
+    torch.save({'state_dict': model.state_dict(), 'config': config,
+                'schema': {k: schema[k] for k in ('feature_columns', 'target_columns',
+                                                   'player_vocab_size', 'club_vocab_size')}},
+               path)
+
+
+def load_checkpoint(path: str = MODEL_PATH) -> tuple[nn.Module, dict, dict]:
+    """(model in eval mode, config, schema) from `save_checkpoint`."""
+    ckpt = torch.load(path, map_location='cpu')
+    model = build_model(ckpt['config'], ckpt['schema'])
+    model.load_state_dict(ckpt['state_dict'])
+    return model.eval(), ckpt['config'], ckpt['schema']
+
+
+def export_numpy(model: nn.Module, config: dict, schema: dict, path: str = WEIGHTS_PATH,
+                 dtype: str = 'float32'):
+    """Flat .npz of the weights for the torch-free `numpy_inference.NumpyModel`."""
+    state = {k: v.detach().cpu().numpy() for k, v in model.state_dict().items()}
+    export_weights(state, config, schema, path, dtype)
+
+
+def grid(**options) -> list[dict]:
+    """Cartesian product of option lists, e.g. grid(lr=[1e-3, 1e-4], gamma=[0.6, 0.9])."""
+    keys = list(options)
+    return [dict(zip(keys, values)) for values in itertools.product(*options.values())]
+
+
+# ---- sweep workers: each process loads the arrays once ---- #
+_WORKER = {}
+
+
+def _init_worker(arrays_dir: str, split_version: int, threads: int):
+    torch.set_num_threads(threads)
+    _WORKER['data'] = load_split(arrays_dir, split_version)
+    _WORKER['threads'] = threads
+
+
+def _run_config(config: dict) -> dict:
+    result = train_one(config, *_WORKER['data'], threads=_WORKER['threads'])
+    result.pop('model')                 # weights aren't needed back in the parent
+    return result
+
+
+def split_cores(workers: int, cores: int | None = None) -> tuple[int, int]:
+    """(processes, torch threads per process) with processes × threads ≤ cores."""
+    cores = cores or os.cpu_count() or 1
+    workers = max(1, min(workers, cores))
+    return workers, max(1, cores // workers)
+
+
+def run_sweep(configs: list[dict], arrays_dir: str = ARRAYS_DIR, workers: int | None = None,
+              results_db: str | None = RESULTS_DB, sweep: str | None = None,
+              split_version: int = SPLIT_VERSION) -> list[dict]:
+    """Train every config across a process pool and record each run.
+
+    Cores are split between processes (see `split_cores`) so the pool never
+    oversubscribes, and there are never more processes than configs;
+    `workers=1` trains in-process with every core.
+    """
+    workers, threads = split_cores(min(workers or os.cpu_count() or 1, max(len(configs), 1)))
+    sweep = sweep or time.strftime("%Y%m%d-%H%M%S")
+    writer = ResultsTable(results_db) if results_db else None
+    results = []
+
+    if workers == 1:
+        _init_worker(arrays_dir, split_version, threads)
+        for config in configs:
+            results.append(_run_config(config))
+            if writer:
+                writer.record(sweep, results[-1])
+    else:
+        ctx = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=ctx, initializer=_init_worker,
+                                 initargs=(arrays_dir, split_version, threads)) as pool:
+            futures = [pool.submit(_run_config, config) for config in configs]
+            for fut in as_completed(futures):
+                results.append(fut.result())
+                if writer:
+                    writer.record(sweep, results[-1])
+
+    for r in sorted(results, key=lambda r: r['test_loss']):
+        c = r['config']
+        print(f"  {c['model']:<8} lr={c['lr']:<7} gamma={c['gamma']:<6} epochs={c['epochs']:<5} "
+              f"test loss {r['test_loss']:.4f}  ({r['wall_s']:.1f} s)")
+    if writer:
+        writer.close()
+    return results
+
+
+# --------------------------------------------------------------------------- #
+# -------------------------------  RESULTS  --------------------------------- #
+# --------------------------------------------------------------------------- #
+class ResultsTable:
+    """`training_runs` rows: one per trained config, replacing the hand-typed dicts."""
+
+    def __init__(self, db: str = RESULTS_DB):
+        self.conn = sqlite3.connect(db)
+        self.conn.execute(
+            f"""CREATE TABLE IF NOT EXISTS {RESULTS_TABLE} (
+                run_id INTEGER PRIMARY KEY AUTOINCREMENT,
+                sweep TEXT,
+                model TEXT,
+                config TEXT,
+                epoch_losses TEXT,
+                wall_s REAL,
+                test_loss REAL,
+                threads INTEGER,
+                created_at REAL
+            )"""
+        )
+        self.conn.commit()
+
+    def record(self, sweep: str, result: dict):
+        self.conn.execute(
+            f"INSERT INTO {RESULTS_TABLE} (sweep, model, config, epoch_losses, wall_s, "
+            "test_loss, threads, created_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+            (sweep, result['config']['model'], json.dumps(result['config']),
+             json.dumps(result['epoch_losses']), result['wall_s'], result['test_loss'],
+             result['threads'], time.time()),
+        )
+        self.conn.commit()
+
+    def close(self):
+        self.conn.close()
+
+
+def load_results(db: str = RESULTS_DB, sweep: str | None = None):
+    """Recorded runs as a DataFrame, config keys expanded into columns."""
+    import pandas as pd
+    conn = sqlite3.connect(db)
+    query = f"SELECT * FROM {RESULTS_TABLE}" + (" WHERE sweep = ?" if sweep else "")
+    df = pd.read_sql_query(query, conn, params=(sweep,) if sweep else None)
+    conn.close()
+    configs = pd.DataFrame([json.loads(c) for c in df['config']], index=df.index)
+    return df.drop(columns=['config', 'model']).join(configs).sort_values('test_loss')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="train Model / EmbeddedModel, optionally as a sweep")
+    parser.add_argument("--model", nargs="+", default=[DEFAULT_CONFIG['model']],
+                        choices=["plain", "embedded"])
+    parser.add_argument("--lr", nargs="+", type=float, default=[DEFAULT_CONFIG['lr']])
+    parser.add_argument("--gamma", nargs="+", type=float, default=[DEFAULT_CONFIG['gamma']])
+    parser.add_argument("--epochs", nargs="+", type=int, default=[DEFAULT_CONFIG['epochs']])
+    parser.add_argument("--batch-size", nargs="+", type=int, default=[DEFAULT_CONFIG['batch_size']],
+                        help="0 = full batch")
+    parser.add_argument("--workers", type=int, default=None, help="processes (default: one per core)")
+    parser.add_argument("--arrays", default=ARRAYS_DIR)
+    parser.add_argument("--db", default=RESULTS_DB)
+    parser.add_argument("--sweep", default=None, help="name recorded with each run")
+    parser.add_argument("--save", nargs="?", const=MODEL_PATH, metavar="PATH",
+                        help=f"train a single config in-process and save it (default {MODEL_PATH})")
+    parser.add_argument("--export", nargs="?", const=WEIGHTS_PATH, metavar="PATH",
+                        help=f"export a checkpoint (--from) for numpy_inference (default {WEIGHTS_PATH})")
+    parser.add_argument("--from", dest="checkpoint", default=MODEL_PATH,
+                        help="checkpoint read by --export")
+    parser.add_argument("--dtype", default="float32", choices=list(TOLERANCE),
+                        help="weight storage for --export")
+    args = parser.parse_args()
+
+    if args.export:
+        model, config, schema = load_checkpoint(args.checkpoint)
+        export_numpy(model, config, schema, args.export, args.dtype)
+        print(f"✅ {args.checkpoint} exported to {args.export} ({args.dtype})")
+        parser.exit()
+
+    configs = grid(model=args.model, lr=args.lr, gamma=args.gamma, epochs=args.epochs,
+                   batch_size=[b or None for b in args.batch_size])
+    if args.save:
+        if len(configs) != 1:
+            parser.error("--save needs exactly one config")
+        schema, train, test = load_split(args.arrays)
+        result = train_one(configs[0], schema, train, test)
+        save_checkpoint(result['model'], result['config'], schema, args.save)
+        print(f"✅ test loss {result['test_loss']:.4f}, model saved to {args.save}")
+    else:
+        run_sweep(configs, args.arrays, args.workers, args.db, args.sweep)
@@ -0,0 +1,36 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src"))
+
+# (player_id, long_name, short_name, age, nationality); Kane and Salah have TM rows
+PLAYERS = [(1, "Harry Kane", "H. Kane", 29, "England"),
+           (2, "Harry Maguire", "H. Maguire", 29, "England"),
+           (3, "Mohamed Salah", "M. Salah", 30, "Egypt")]
+TM_STATS = {"Harry Kane": (30, 3), "Mohamed Salah": (19, 12)}
+
+
+@pytest.fixture
+def fifa_rows():
+    """Factory for FIFA rows of PLAYERS, one per player and fifa_update."""
+    def make(updates=(1,), fifa_version=23):
+        return pd.DataFrame([
+            {'player_id': pid, 'fifa_version': fifa_version, 'fifa_update': u, 'long_name': long,
+             'short_name': short, 'age': age, 'nationality_name': nation}
+            for u in updates for pid, long, short, age, nation in PLAYERS])
+    return make
+
+
+@pytest.fixture
+def tm_rows():
+    """Transfermarkt goals/assists for the TM_STATS players, as `load_transfermarkt` returns them."""
+    ages = {long: age for _, long, _, age, _ in PLAYERS}
+    nations = {long: nation for _, long, _, _, nation in PLAYERS}
+    return pd.DataFrame({'name': list(TM_STATS), 'season': 23,
+                         'goals': [g for g, _ in TM_STATS.values()],
+                         'assists': [a for _, a in TM_STATS.values()],
+                         'nationality': [nations[n] for n in TM_STATS],
+                         'age': [float(ages[n]) for n in TM_STATS]})
@@ -0,0 +1,64 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+import preprocessing
+from preprocessing import LEGACY_CORRECTIONS, LEGACY_DROP_INDICES, correct_frame, legacy_corrections_table
+
+
+def legacy_positional(df: pd.DataFrame) -> pd.DataFrame:
+    """The original `manual_goal_assist_corrections`: set by position, then drop."""
+    df = df.copy()
+    for idx, (goals, assists) in LEGACY_CORRECTIONS.items():
+        df.loc[idx, ['goals', 'assists']] = [goals, assists]
+    return df.drop(index=LEGACY_DROP_INDICES, errors='ignore')
+
+
+def join_frame(n_rows: int = 5400, seed: int = 0) -> pd.DataFrame:
+    """prem_name_join-like rows where neighbours often share (player_id, fifa_version, name)."""
+    rng = np.random.default_rng(seed)
+    player = np.cumsum(rng.random(n_rows) > 0.4)          # runs of 1-4 rows per player
+    player[2679:2688] = player[2679]                       # a dropped row and a corrected row
+    df = pd.DataFrame({
+        'player_id': player + 1000,
+        'fifa_version': 22,
+        'fifa_update': rng.integers(1, 4, n_rows).astype(float),
+        'name': [f"TM {p}" if rng.random() > 0.3 else f"TM {p}b" for p in player],
+        'goals': rng.integers(0, 20, n_rows),
+        'assists': rng.integers(0, 15, n_rows),
+    })
+    df.loc[2679:2687, 'name'] = "Harry Kane"
+    return df
+
+
+@pytest.mark.parametrize("seed", [0, 1, 2])
+def test_keyed_corrections_match_legacy_positions(seed):
+    df = join_frame(seed=seed)
+    expected = legacy_positional(df)
+    table = legacy_corrections_table(df)
+    pd.testing.assert_frame_equal(correct_frame(df, table), expected)
+    assert expected.loc[2687, ['goals', 'assists']].tolist() == [5, 0]
+
+
+def test_keyed_corrections_across_chunks():
+    df = join_frame()
+    table = legacy_corrections_table(df)
+    seen = {}
+    chunks = [correct_frame(df.iloc[i:i + 700], table, seen) for i in range(0, len(df), 700)]
+    pd.testing.assert_frame_equal(pd.concat(chunks), legacy_positional(df))
+
+
+def test_corrections_table_round_trip(tmp_path):
+    import sqlite3
+    df = join_frame()
+    with sqlite3.connect(tmp_path / "join.db") as conn:
+        legacy_corrections_table(df).to_sql(preprocessing.CORRECTIONS_TABLE, conn, index=False)
+        loaded = preprocessing.load_corrections(conn)
+    pd.testing.assert_frame_equal(correct_frame(df, loaded), legacy_positional(df))
+
+
+def test_frame_without_legacy_rows():
+    df = join_frame().head(300)
+    table = legacy_corrections_table(df)
+    assert table.empty
+    pd.testing.assert_frame_equal(correct_frame(df, table), df)
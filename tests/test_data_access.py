@@ -0,0 +1,27 @@
+import sqlite3
+
+import numpy as np
+
+from data_access import _column_array, fetch_columns
+
+
+def test_integer_columns():
+    assert _column_array((1, 2), 'int8').dtype == np.int8
+    assert np.isnan(_column_array((1, None), 'int8')[1])
+
+
+def test_values_wider_than_schema_fall_back():
+    arr = _column_array((1, 300), 'int8')
+    assert arr.dtype == np.int64 and arr.tolist() == [1, 300]
+    arr = _column_array((1, None, 300), 'int8')
+    assert arr.dtype == np.float64 and arr[2] == 300
+    assert _column_array((1, 2 ** 70), 'int32').tolist() == [1.0, float(2 ** 70)]
+
+
+def test_fetch_columns_with_out_of_range_rows():
+    conn = sqlite3.connect(":memory:")
+    conn.execute("CREATE TABLE t (overall INTEGER, fifa_version INTEGER)")
+    conn.executemany("INSERT INTO t VALUES (?, ?)", [(80, 23), (1000, 24)])
+    cols = fetch_columns(conn.execute("SELECT * FROM t"), block_rows=1)
+    assert cols['overall'].tolist() == [80, 1000]
+    assert cols['fifa_version'].tolist() == [23, 24]
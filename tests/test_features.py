@@ -0,0 +1,38 @@
+import numpy as np
+import pandas as pd
+
+from pipeline import MONEY_COLUMNS, PreprocessingPipeline
+from preprocessing import feature_engineering
+
+POSITIONS = ["ST, CF", None, "GK"]
+
+
+def records():
+    return [{'player_id': 1.0, 'fifa_version': 23, 'club_team_id': 10.0, 'player_positions': pos,
+             'club_position': "SUB", 'club_contract_valid_until_year': 2025, 'preferred_foot': "Right",
+             'value_eur': 1e6, 'wage_eur': 1e4, 'work_rate': "High/High", 'body_type': "Lean",
+             **{c: 1.0 for c in ('overall', 'potential', 'age', 'height_cm', 'weight_kg',
+                                 'club_jersey_number', 'weak_foot', 'skill_moves',
+                                 'international_reputation', 'pace', 'shooting', 'passing',
+                                 'dribbling', 'defending', 'physic', 'attacking_crossing',
+                                 'attacking_finishing', 'goals', 'assists')}}
+            for pos in POSITIONS]
+
+
+def test_missing_position_gets_no_position():
+    df = feature_engineering(pd.DataFrame(records()))
+    assert df['primary_position'][[0, 2]].tolist() == ["ST", "GK"]
+    assert pd.isna(df['primary_position'][1])
+    assert df['has_multiple_positions'].tolist() == [1, 0, 0]
+    assert np.isnan(df['primary_position_mapped'][1])
+
+
+def test_missing_position_frame_matches_single_rows():
+    pipeline = PreprocessingPipeline(
+        fill_values=dict.fromkeys(MONEY_COLUMNS, 1.0), means=[0.0] * 5, scales=[1.0] * 5,
+        categories={'work_rate': ["High/High"], 'body_type': ["Lean"]},
+        player_ids=[1.0], club_ids=[10.0])
+    frame = pipeline.transform_frame(pd.DataFrame(records())).to_numpy()
+    np.testing.assert_array_equal(frame, pipeline.transform(records()))
+    assert frame[1, pipeline.columns.index('has_multiple_positions')] == 0
+    assert np.isnan(frame[1, pipeline.columns.index('primary_position_mapped')])
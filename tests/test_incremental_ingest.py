@@ -0,0 +1,92 @@
+import sqlite3
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import load_csv_sql_db as ingest
+import name_matching
+from conftest import TM_STATS
+
+ALL = {'league_ids': None, 'fifa_updates': None}
+
+
+@pytest.fixture
+def release_rows(fifa_rows):
+    """Factory for full male_players.csv rows of the conftest PLAYERS."""
+    def make(fifa_version: int, fifa_update: int) -> pd.DataFrame:
+        base = fifa_rows(updates=(fifa_update,), fifa_version=fifa_version)
+        filler = {c: (np.nan if np.dtype(t).kind == 'f' else 1) if t != 'str' else "x"
+                  for c, t in ingest.DTYPES.items() if c not in base}
+        filler.update(player_positions="ST", overall=80 + fifa_update)
+        return base.assign(**filler)[ingest.COLUMNS_TO_KEEP]
+    return make
+
+
+@pytest.fixture
+def source(tmp_path, release_rows, tm_rows):
+    csv_path, db = str(tmp_path / "male_players.csv"), str(tmp_path / "fifa.db")
+    release_rows(23, 1).to_csv(csv_path, index=False)
+    tm = tm_rows.drop(columns=['goals', 'assists'])
+    with sqlite3.connect(db) as conn:
+        tm.assign(value=tm_rows['goals']).to_sql("goals_plus", conn, index=False)
+        tm.assign(value=tm_rows['assists']).to_sql("assists_plus", conn, index=False)
+    return csv_path, db
+
+
+@pytest.fixture
+def append_update(release_rows):
+    def append(csv_path, fifa_update):
+        release_rows(23, fifa_update).to_csv(csv_path, mode="a", header=False, index=False)
+    return append
+
+
+def test_rerun_is_idempotent(source, append_update):
+    csv_path, db = source
+    assert ingest.incremental_ingest(csv_path, db, workers=1, **ALL)['rows'] == 3
+    again = ingest.incremental_ingest(csv_path, db, workers=1, **ALL)
+    assert (again['mode'], again['rows']) == ("unchanged", 0)
+    append_update(csv_path, 2)
+    new = ingest.incremental_ingest(csv_path, db, workers=1, **ALL)
+    assert (new['mode'], new['partitions']) == ("appended", [(23, 2)])
+    assert sqlite3.connect(db).execute("SELECT COUNT(*) FROM test").fetchone()[0] == 6
+
+
+def test_second_update_keeps_join_matched(source, append_update):
+    csv_path, db = source
+    ingest.incremental_ingest(csv_path, db, workers=1, **ALL)
+    name_matching.materialize_join(db)
+    append_update(csv_path, 2)
+    result = ingest.incremental_ingest(csv_path, db, workers=1, **ALL)
+    assert 'player_name_join' in result['downstream']
+
+    join = pd.read_sql_query("SELECT * FROM player_name_join", sqlite3.connect(db))
+    assert join['player_id'].notna().all()               # no unmatched TM-only rows
+    assert len(join) == 6
+    for name, stats in TM_STATS.items():
+        rows = join[join['long_name'] == name]
+        assert sorted(rows['fifa_update']) == [1, 2]
+        assert rows['match_score'].notna().all()
+        assert list(zip(rows['goals'], rows['assists'])) == [stats] * 2
+    unmatched = join[~join['long_name'].isin(TM_STATS)]
+    assert unmatched['match_score'].isna().all() and (unmatched[['goals', 'assists']] == 0).all().all()
+
+
+def test_join_refresh_keeps_where_filter(source, append_update):
+    csv_path, db = source
+    ingest.incremental_ingest(csv_path, db, workers=1, **ALL)
+    name_matching.materialize_join(db, where="WHERE fifa_update = 1")
+    append_update(csv_path, 2)
+    ingest.incremental_ingest(csv_path, db, workers=1, **ALL)
+
+    join = pd.read_sql_query("SELECT * FROM player_name_join", sqlite3.connect(db))
+    assert set(join['fifa_update']) == {1}
+    assert (join.loc[join['long_name'] == "Harry Kane", 'goals'] == 30).all()
+
+
+def test_plain_ingest_after_incremental_upserts(source):
+    csv_path, db = source
+    ingest.incremental_ingest(csv_path, db, workers=1, **ALL)
+    assert ingest.ingest_csv(csv_path, db, workers=1, **ALL) == 3
+    assert ingest.intial_creation_of_database(csv_path, db, workers=1, league_ids=None) == 3
+    assert sqlite3.connect(db).execute("SELECT COUNT(*) FROM test").fetchone()[0] == 3
@@ -0,0 +1,35 @@
+import sqlite3
+
+import scraper_with_adjustments as scraper
+
+
+def job(page: int, season: int = 2022):
+    return ("GB1", "goals", season, page, f"https://example.test/page/{page}")
+
+
+def stored(db):
+    return dict(sqlite3.connect(db).execute("SELECT name, value FROM goals_plus").fetchall())
+
+
+def test_first_page_listing_a_name_wins(tmp_path):
+    db = tmp_path / "tm.db"
+    with scraper.StatsWriter(db) as writer:
+        queue = scraper.JobQueue(writer)
+        queue.seed(["GB1"], ["goals"], 2022, 2022)
+        # pages finish out of order; "Harry Kane" is listed on pages 1 and 3
+        queue.complete(job(3), [("Harry Kane", 2, 23, "England", 29), ("Ivan Toney", 4, 23, "England", 27)], [])
+        queue.complete(job(1), [("Harry Kane", 30, 23, "England", 29), ("Son Heung-min", 17, 23, None, 30)], [])
+        queue.complete(job(2), [("Son Heung-min", 1, 23, "Korea, South", 30),
+                                ("Ivan Toney", 9, 23, "England", 27), ("Ivan Toney", 8, 23, "England", 27)], [])
+    assert stored(db) == {"Harry Kane": 30, "Son Heung-min": 17, "Ivan Toney": 9}
+
+
+def test_new_scope_starts_over(tmp_path):
+    db = tmp_path / "tm.db"
+    with scraper.StatsWriter(db) as writer:
+        queue = scraper.JobQueue(writer)
+        queue.seed(["GB1"], ["goals"], 2022, 2022)
+        queue.complete(job(1), [("Harry Kane", 30, 23, "England", 29)], [])
+        queue.seed(["GB1"], ["goals"], 2022, 2022)            # a fresh run re-scrapes the season
+        queue.complete(job(2), [("Harry Kane", 31, 23, "England", 29)], [])
+    assert stored(db) == {"Harry Kane": 31}
@@ -0,0 +1,21 @@
+from conftest import TM_STATS
+from name_matching import build_join
+
+
+def test_updates_of_one_player_are_not_ambiguous(fifa_rows, tm_rows):
+    joined, report = build_join(fifa_rows(updates=(1, 2)), tm_rows)
+    assert report.empty
+    for pid, name in [(1, "Harry Kane"), (3, "Mohamed Salah")]:
+        rows = joined[joined['player_id'] == pid]
+        assert sorted(rows['fifa_update']) == [1, 2]
+        assert rows['match_score'].notna().all()
+        assert list(zip(rows['goals'], rows['assists'])) == [TM_STATS[name]] * 2
+    maguire = joined[joined['player_id'] == 2]
+    assert maguire['match_score'].isna().all() and (maguire['goals'] == 0).all()
+    assert joined['player_id'].notna().all()             # no unmatched TM-only rows
+
+
+def test_single_update_unchanged(fifa_rows, tm_rows):
+    joined, report = build_join(fifa_rows(), tm_rows)
+    assert joined.set_index('player_id')['goals'].to_dict() == {1: 30, 2: 0, 3: 19}
+    assert report.empty
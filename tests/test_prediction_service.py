@@ -0,0 +1,136 @@
+import json
+import os
+import subprocess
+import sys
+import threading
+import time
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+import requests
+
+import load_test
+
+ps = pytest.importorskip("prediction_service")
+
+
+class EchoService:
+    """Stands in for PredictionService: one (goals, assists) row per record."""
+
+    def predict(self, records):
+        return np.array([[float(r.get("overall", 0)), 0.0] for r in records], dtype=np.float32)
+
+    def report(self):
+        return {"requests": 0}
+
+
+class BrokenService(EchoService):
+    def predict(self, records):
+        raise RuntimeError("mat1 and mat2 shapes cannot be multiplied")
+
+
+def serve(service):
+    server = ps.make_server(service, port=0)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+@pytest.fixture
+def url():
+    server, base = serve(EchoService())
+    yield base
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.mark.parametrize("body", ['[{"overall": 80}]', '"text"', '3', '{"rows": {"overall": 80}}',
+                                  '{"rows": [1, 2]}', 'not json'])
+def test_bad_bodies_get_400(url, body):
+    resp = requests.post(f"{url}/predict", data=body)
+    assert resp.status_code == 400 and "error" in resp.json()
+
+
+def test_record_and_rows(url):
+    assert requests.post(f"{url}/predict", data=json.dumps({"overall": 80})).json() == \
+        {"predictions": [{"goals": 80.0, "assists": 0.0}]}
+    resp = requests.post(f"{url}/predict", data=json.dumps({"rows": [{"overall": 1}, {"overall": 2}]}))
+    assert [p["goals"] for p in resp.json()["predictions"]] == [1.0, 2.0]
+
+
+def test_model_errors_get_500():
+    server, base = serve(BrokenService())
+    try:
+        resp = requests.post(f"{base}/predict", data=json.dumps({"overall": 80}))
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert resp.status_code == 500 and "RuntimeError" in resp.json()["error"]
+
+
+def test_batcher_coalesces_concurrent_submits():
+    sizes = []
+    batcher = ps.MicroBatcher(lambda X: (sizes.append(len(X)), X * 2)[1], max_batch=4, max_wait=5.0)
+    futures = [batcher.submit(np.full((1, 2), i, dtype=np.float32)) for i in range(4)]
+    results = [f.result(timeout=5) for f in futures]
+    batcher.close()
+    assert sizes == [4] and (batcher.batches, batcher.rows) == (1, 4)
+    assert [r.tolist() for r in results] == [[[2 * i, 2 * i]] for i in range(4)]
+
+
+def test_batcher_close_runs_queued_items_and_rejects_new_ones():
+    batcher = ps.MicroBatcher(lambda X: X + 1, max_batch=100, max_wait=60.0)
+    pending = batcher.submit(np.zeros((1, 2)))
+    time.sleep(0.05)                            # the loop is now waiting out max_wait
+    batcher.close()
+    assert pending.result(timeout=0).tolist() == [[1.0, 1.0]]
+    with pytest.raises(RuntimeError):
+        batcher.submit(np.zeros((1, 2))).result(timeout=0)
+
+
+def test_batcher_hands_forward_errors_to_callers():
+    def forward(X):
+        raise RuntimeError("boom")
+    batcher = ps.MicroBatcher(forward, max_wait=0.0)
+    with pytest.raises(RuntimeError, match="boom"):
+        batcher.submit(np.zeros((1, 2))).result(timeout=5)
+    batcher.close()
+
+
+def test_lru_cache_hits_and_evicts_least_recent():
+    cache = ps.LRUCache(maxsize=2)
+    cache.put("a", 1)
+    cache.put("b", 2)
+    assert cache.get("a") == 1                  # "b" is now least recently used
+    cache.put("c", 3)
+    assert cache.get("b") is None and cache.get("a") == 1 and cache.get("c") == 3
+    assert (cache.hits, cache.misses) == (3, 1)
+
+
+def test_unknown_ids_use_mean_embedding():
+    torch = pytest.importorskip("torch")
+    from training import EmbeddedModel
+
+    model = EmbeddedModel(3, 3, embed_dim=2, in_features=1)
+    with torch.no_grad():                       # row 0 is the mean, row 2 the last
+        model.player_emb.weight.copy_(torch.tensor([[2., 2.], [1., 1.], [3., 3.]]))
+        model.club_emb.weight.copy_(torch.tensor([[1., 1.], [0., 0.], [2., 2.]]))
+    pipeline = SimpleNamespace(columns=['x', 'player_id', 'club_team_id'])
+    predictor = ps.Predictor(model, {'feature_columns': ['x']}, pipeline)
+
+    out = predictor.forward(np.array([[0.5, -1, -1], [0.5, 7, 9], [0.5, 0, 0], [0.5, 2, 2]]))
+    np.testing.assert_allclose(out[0], out[2], rtol=1e-6)
+    np.testing.assert_allclose(out[1], out[2], rtol=1e-6)
+    assert not np.allclose(out[0], out[3])
+
+
+def test_load_test_counts_refused_connections():
+    result = load_test.run_load("http://127.0.0.1:9", [{"overall": 80}], clients=2, requests_per_client=3)
+    assert result["errors"] == 6 and result["requests"] == 0 and result["server"] is None
+
+
+def test_load_test_does_not_import_torch():
+    code = "import sys, load_test; print('torch' in sys.modules)"
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True,
+                         cwd=os.path.dirname(load_test.__file__))
+    assert out.stdout.strip() == "False"
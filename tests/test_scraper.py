@@ -0,0 +1,85 @@
+import pathlib
+import sqlite3
+
+import pytest
+
+import scraper_with_adjustments as scraper
+import transfer_markt_scraper
+
+ROWS_PER_PAGE = 25
+FIXTURES = sorted((pathlib.Path(__file__).parent / "fixtures" / "transfermarkt").glob("*.html"))
+
+
+def list_page(page: int, n_pages: int) -> str:
+    """Minimal Transfermarkt goals list page: ranked rows + pager."""
+    rows = "".join(
+        f'<tr><td class="zentriert">{rank}</td><td class="hauptlink"><a title="Player {rank}">Player {rank}</a></td>'
+        f'<td class="zentriert"><img title="England"></td><td class="zentriert">25</td>'
+        f'<td class="zentriert"></td><td class="zentriert">30</td><td class="zentriert">{rank % 20}</td></tr>'
+        for rank in range((page - 1) * ROWS_PER_PAGE + 1, page * ROWS_PER_PAGE + 1))
+    pager = '<li class="tm-pagination__list-item"><a href="#">1</a></li>' + "".join(
+        f'<li class="tm-pagination__list-item"><a href="/page/{p}">{p}</a></li>'
+        for p in range(2, n_pages + 1))
+    return (f'<html><body><table class="items"><thead><tr><th>#</th></tr></thead><tbody>{rows}'
+            f'</tbody></table><ul class="tm-pagination">{pager}</ul></body></html>')
+
+
+@pytest.fixture
+def season_crashing_on_page_9(monkeypatch):
+    def fetch(url, timeout=15, limiter=None):
+        page = int(url.rsplit("/page/", 1)[1]) if "/page/" in url else 1
+        if page == 9:
+            raise ConnectionError("connection reset")
+        return list_page(page, n_pages=20)
+    monkeypatch.setattr(scraper, "fetch", fetch)
+
+
+def stored_names(db):
+    return {name for name, in sqlite3.connect(db).execute("SELECT name FROM goals_plus")}
+
+
+def test_crash_mid_season_keeps_earlier_pages(tmp_path, season_crashing_on_page_9):
+    db = str(tmp_path / "tm.db")
+    scraper.scrape_and_save("goals", 2014, 2014, db)
+    assert stored_names(db) == {f"Player {rank}" for rank in range(1, 8 * ROWS_PER_PAGE + 1)}
+
+
+def test_original_entry_point_keywords(tmp_path, season_crashing_on_page_9):
+    db = str(tmp_path / "tm.db")
+    transfer_markt_scraper.scrape_and_save("goals", start=2014, end=2014, db_path=db,
+                                           table_suffix="_plus")
+    assert len(stored_names(db)) == 8 * ROWS_PER_PAGE
+
+
+@pytest.mark.parametrize("path", FIXTURES, ids=lambda p: p.stem)
+def test_fast_parse_matches_full_parse(path):
+    html = path.read_text(encoding="utf-8")
+    page_url = scraper.build_url("goals", 2022)
+    full, fast = scraper.parse_page(html, "full"), scraper.parse_page(html, "fast")
+    stats = scraper.extract_stats_from_page(full, 2022)
+    assert stats.equals(scraper.extract_stats_from_page(fast, 2022))
+    assert scraper.get_paginated_urls(full, page_url) == scraper.get_paginated_urls(fast, page_url)
+    if "empty" not in path.stem:
+        assert len(stats) and scraper.get_paginated_urls(full, page_url)
+
+
+@pytest.mark.parametrize("tag, found", [
+    ('<table class="items">', True), ("<table class='items'>", True), ("<table class=items>", True),
+    ('<table id="yw1" class="items striped">', True), ('<table class="items-legend">', False),
+    ('<table class="line-items">', False), ('<table data-class="items">', False)])
+def test_items_table_is_matched_by_whole_class_token(tag, found):
+    assert bool(scraper.ITEMS_OPEN_RE.search(tag)) is found
+
+
+def test_cache_counts_from_many_threads(tmp_path):
+    from concurrent.futures import ThreadPoolExecutor
+
+    cache = scraper.ResponseCache(tmp_path / "http.db")
+    urls = [f"https://example.test/?saison_id=2014&page={p}" for p in range(8)]
+    for url in urls:
+        cache.store(url, "<html></html>")
+    with ThreadPoolExecutor(8) as pool:
+        list(pool.map(cache.lookup, urls * 50))
+        list(pool.map(cache.touch, urls * 5))
+    cache.close()
+    assert (cache.hits, cache.revalidated, cache.misses) == (400, 40, 8)
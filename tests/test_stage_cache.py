@@ -0,0 +1,25 @@
+import preprocessing
+from preprocessing import STAGE_NAMES, stage_keys
+
+
+def test_keys_follow_constants(monkeypatch):
+    before = stage_keys("source")
+    monkeypatch.setattr(preprocessing, "POSITION_MAP", {**preprocessing.POSITION_MAP, 'XX': 99})
+    after = stage_keys("source")
+    first = STAGE_NAMES.index('features')
+    assert before[:first] == after[:first]
+    assert all(a != b for a, b in zip(before[first:], after[first:]))
+
+
+def test_keys_follow_select_columns(monkeypatch):
+    before = stage_keys("source")
+    monkeypatch.setattr(preprocessing, "USE_COLUMNS", preprocessing.USE_COLUMNS[:-1])
+    after = stage_keys("source")
+    assert before[:-1] == after[:-1] and before[-1] != after[-1]
+
+
+def test_keys_follow_params():
+    before = stage_keys("source")
+    after = stage_keys("source", {'normalize': {'columns': ['age']}})
+    i = STAGE_NAMES.index('normalize')
+    assert before[:i] == after[:i] and before[i] != after[i]
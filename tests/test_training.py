@@ -0,0 +1,26 @@
+import pytest
+
+torch = pytest.importorskip("torch")
+
+import training
+
+
+def test_split_cores_never_oversubscribes():
+    assert training.split_cores(4, cores=16) == (4, 4)
+    assert training.split_cores(32, cores=8) == (8, 1)
+    assert training.split_cores(1, cores=8) == (1, 8)
+
+
+def test_sweep_uses_no_more_processes_than_configs(monkeypatch):
+    seen = {}
+
+    def fake_init(arrays_dir, split_version, threads):
+        seen['threads'] = threads
+
+    monkeypatch.setattr(training.os, "cpu_count", lambda: 16)
+    monkeypatch.setattr(training, "_init_worker", fake_init)
+    monkeypatch.setattr(training, "_run_config", lambda config: {'config': config, 'test_loss': 0.0,
+                                                                 'wall_s': 0.0})
+    training.run_sweep([{'model': 'plain', 'lr': 0.1, 'gamma': 1.0, 'epochs': 1}],
+                       workers=8, results_db=None)
+    assert seen['threads'] == 16           # one config: in-process, every core